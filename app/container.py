@@ -0,0 +1,45 @@
+from typing import Optional
+
+from .repositories import DrawRepository, InstrumentedDrawRepository, create_draw_repository
+from .services.lottery_service import LotteryService
+from .controllers.lottery_controller import LotteryController
+
+class ServiceContainer:
+    """Application-lifetime owner of the draw repository, services and controllers"""
+
+    def __init__(self, repository: Optional[DrawRepository] = None):
+        # Every storage call made while serving is timed for /metrics
+        self.repository: DrawRepository = InstrumentedDrawRepository(repository or create_draw_repository())
+        self.lottery_service = LotteryService(self.repository)
+        self.lottery_controller = LotteryController(self.lottery_service)
+
+    async def warm_up(self):
+        """Load the draw cache before the first request needs it"""
+        try:
+            await self.lottery_service.warm_up()
+        except Exception as e:
+            # A cold cache only costs the first request a reload
+            print(f"⚠️  Draw cache warm-up failed: {e}")
+
+    async def close(self):
+        """Release the repository's database connections"""
+        await self.repository.close()
+
+_container: Optional[ServiceContainer] = None
+
+def get_container() -> ServiceContainer:
+    """Get the service container instance (singleton)"""
+    global _container
+
+    if _container is None:
+        _container = ServiceContainer()
+
+    return _container
+
+async def shutdown_container():
+    """Close and forget the service container"""
+    global _container
+
+    if _container is not None:
+        await _container.close()
+        _container = None
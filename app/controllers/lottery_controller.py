@@ -1,72 +1,218 @@
-from fastapi import HTTPException, Query
-from typing import List, Optional
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Sequence
 from datetime import date
+import csv
+import io
+import re
 
+from config.config import get_response_cache_max_bytes
+from ..core.http_cache import make_etag, etag_matches, latest_cache_control, draw_cache_control
+from ..core.response_cache import ResponseCache, CachedResponse
+from ..core.responses import APIJSONResponse, json_bytes
 from ..services.lottery_service import LotteryService
 from ..models.lottery import (
-    LotteryDraw, 
     LotteryCheckRequest, 
+    LotteryBulkCheckRequest,
     LotteryCheckResponse,
-    LotteryCheckResult,
-    APIResponse,
-    PaginatedResponse
+    APIResponse
 )
 
+# Digits only, at least 2 of them
+VALID_NUMBER = re.compile(r"\d{2,}", re.ASCII)
+
+def invalid_numbers(numbers: Sequence[str]) -> List[int]:
+    """Positions of the numbers VALID_NUMBER rejects.
+
+    A valid batch is confirmed by scanning all the numbers joined together
+    once, plus their shortest length; only a batch with invalid numbers is
+    matched number by number to find them.
+    """
+    joined = "".join(numbers)
+    if joined.isascii() and joined.isdigit() and min(map(len, numbers)) >= 2:
+        return []
+    return [i for i, number in enumerate(numbers) if not VALID_NUMBER.fullmatch(number)]
+
+# Column order of the dataset CSVs, so exports can be uploaded again
+EXPORT_CSV_COLUMNS = [
+    "date",
+    "prize_1st",
+    "prize_pre_3digit",
+    "prize_sub_3digits",
+    "prize_2digits",
+    "nearby_1st",
+    "prize_2nd",
+    "prize_3rd",
+    "prize_4th",
+    "prize_5th"
+]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"  # Starlette adds "; charset=utf-8" to text types
+}
+
 class LotteryController:
     """Controller for lottery-related endpoints"""
     
-    def __init__(self):
-        self.lottery_service = LotteryService()
+    def __init__(
+        self,
+        lottery_service: Optional[LotteryService] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        self.lottery_service = lottery_service or LotteryService()
+        # Serialized /draws pages and /draws/{date} bodies, keyed by data version
+        self.response_cache = response_cache or ResponseCache(get_response_cache_max_bytes())
     
     async def get_all_lottery_draws(
         self, 
         page: int = Query(1, ge=1, description="Page number"),
-        size: int = Query(50, ge=1, le=100, description="Items per page")
-    ) -> APIResponse:
+        size: int = Query(50, ge=1, le=100, description="Items per page"),
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page"),
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """Get all lottery draws with pagination"""
         try:
-            result = await self.lottery_service.get_all_draws(page=page, size=size)
+            # A page only changes when the table does
+            version = await self.lottery_service.get_draws_version()
+            etag = make_etag("draws", version, page, size, cursor)
+            cache_control = await self._latest_cache_control()
+            not_modified = self._not_modified(if_none_match, etag, cache_control)
+            if not_modified:
+                return not_modified
             
-            return APIResponse(
-                success=True,
-                message=f"Retrieved {len(result.items)} lottery draws",
-                data={
-                    "draws": [draw.dict() for draw in result.items],
-                    "pagination": {
-                        "total": result.total,
-                        "page": result.page,
-                        "size": result.size,
-                        "pages": result.pages
+            key = ("draws", version, page, size, cursor)
+            cached = self.response_cache.get(key)
+            if cached is None:
+                result = await self.lottery_service.get_all_draws(page=page, size=size, cursor=cursor)
+                
+                body = json_bytes(APIResponse(
+                    success=True,
+                    message=f"Retrieved {len(result.items)} lottery draws",
+                    data={
+                        "draws": result.items,
+                        "pagination": {
+                            "total": result.total,
+                            "page": result.page,
+                            "size": result.size,
+                            "pages": result.pages,
+                            "next_cursor": result.next_cursor
+                        }
                     }
-                }
-            )
+                ))
+                cached = CachedResponse(body, etag)
+                self.response_cache.put(key, cached)
+            
+            return self._cached_response(cached, cache_control)
             
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving lottery draws: {str(e)}")
     
-    async def get_lottery_draw_by_date(self, draw_date: date) -> APIResponse:
+    async def _latest_cache_control(self) -> str:
+        """Cache-Control for responses that change with the next draw"""
+        latest = await self.lottery_service.get_latest_draw()
+        return latest_cache_control(latest.date if latest else None)
+    
+    @staticmethod
+    def _not_modified(if_none_match: Optional[str], etag: str, cache_control: str) -> Optional[Response]:
+        """A 304 response if the client is up to date, otherwise None"""
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+        return None
+    
+    @staticmethod
+    def _cached_response(cached: CachedResponse, cache_control: str) -> Response:
+        """Send a pre-serialized JSON body as is"""
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers={"ETag": cached.etag, "Cache-Control": cache_control}
+        )
+    
+    async def export_lottery_draws(self, format: str = "ndjson", if_none_match: Optional[str] = None) -> Response:
+        """Stream every lottery draw as NDJSON or CSV"""
+        try:
+            version = await self.lottery_service.get_draws_version()
+            etag = make_etag("export", format, version)
+            headers = {"ETag": etag}
+            
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            
+            rows = self._export_ndjson() if format == "ndjson" else self._export_csv()
+            headers["Content-Disposition"] = f'attachment; filename="lottery_draws.{format}"'
+            return StreamingResponse(rows, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error exporting lottery draws: {str(e)}")
+    
+    async def _export_ndjson(self) -> AsyncIterator[bytes]:
+        async for draw in self.lottery_service.iter_draws():
+            yield json_bytes(draw) + b"\n"
+    
+    async def _export_csv(self) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        
+        async for draw in self.lottery_service.iter_draws():
+            row = [getattr(draw, column) for column in EXPORT_CSV_COLUMNS]
+            if draw.prize_2digits is not None:
+                row[EXPORT_CSV_COLUMNS.index("prize_2digits")] = str(draw.prize_2digits).zfill(2)
+            writer.writerow([
+                # Lists keep the dataset's "['097862', '097864']" form
+                str(list(value)) if isinstance(value, tuple) else value
+                for value in row
+            ])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    async def get_lottery_draw_by_date(
+        self,
+        draw_date: date,
+        if_none_match: Optional[str] = None
+    ) -> Response:
         """Get specific lottery draw by date"""
         try:
-            draw = await self.lottery_service.get_draw_by_date(draw_date)
+            # Published draws rarely change, so their serialized body is
+            # reused until the data version moves on
+            version = await self.lottery_service.get_draws_version()
+            key = ("draw", draw_date, version)
+            cached = self.response_cache.get(key)
+            if cached is None:
+                draw = await self.lottery_service.get_draw_by_date(draw_date)
+                
+                if not draw:
+                    raise HTTPException(
+                        status_code=404, 
+                        detail=f"No lottery draw found for date {draw_date}"
+                    )
+                
+                body = json_bytes(APIResponse(
+                    success=True,
+                    message=f"Lottery draw found for {draw_date}",
+                    data={"draw": draw}
+                ))
+                cached = CachedResponse(body, make_etag("draw", draw.to_dict()))
+                self.response_cache.put(key, cached)
             
-            if not draw:
-                raise HTTPException(
-                    status_code=404, 
-                    detail=f"No lottery draw found for date {draw_date}"
-                )
+            latest = await self.lottery_service.get_latest_draw()
+            cache_control = draw_cache_control(draw_date, latest.date if latest else None)
+            not_modified = self._not_modified(if_none_match, cached.etag, cache_control)
+            if not_modified:
+                return not_modified
             
-            return APIResponse(
-                success=True,
-                message=f"Lottery draw found for {draw_date}",
-                data={"draw": draw.dict()}
-            )
+            return self._cached_response(cached, cache_control)
             
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving lottery draw: {str(e)}")
     
-    async def get_latest_lottery_draw(self) -> APIResponse:
+    async def get_latest_lottery_draw(self, if_none_match: Optional[str] = None) -> Response:
         """Get the most recent lottery draw"""
         try:
             draw = await self.lottery_service.get_latest_draw()
@@ -77,10 +223,19 @@ class LotteryController:
                     detail="No lottery draws found"
                 )
             
-            return APIResponse(
-                success=True,
-                message="Latest lottery draw retrieved",
-                data={"draw": draw.dict()}
+            etag = make_etag("draw", draw.to_dict())
+            cache_control = latest_cache_control(draw.date)
+            not_modified = self._not_modified(if_none_match, etag, cache_control)
+            if not_modified:
+                return not_modified
+            
+            return APIJSONResponse(
+                APIResponse(
+                    success=True,
+                    message="Latest lottery draw retrieved",
+                    data={"draw": draw}
+                ),
+                headers={"ETag": etag, "Cache-Control": cache_control}
             )
             
         except HTTPException:
@@ -88,7 +243,7 @@ class LotteryController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving latest lottery draw: {str(e)}")
     
-    async def check_lottery_numbers(self, request: LotteryCheckRequest) -> APIResponse:
+    async def check_lottery_numbers(self, request: LotteryCheckRequest) -> Response:
         """Check lottery numbers for winnings"""
         try:
             # Validate numbers format
@@ -98,11 +253,21 @@ class LotteryController:
                         status_code=400,
                         detail=f"Invalid lottery number format: {number}. Numbers must contain only digits and be at least 2 digits long."
                     )
-            
+
+            check_date = None
+            if request.date:
+                try:
+                    check_date = date.fromisoformat(request.date)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid date format: {request.date}. Use YYYY-MM-DD."
+                    )
+
             # Check the numbers
             results = await self.lottery_service.check_numbers(
-                request.numbers, 
-                request.date
+                request.numbers,
+                check_date
             )
             
             # Calculate summary
@@ -116,55 +281,133 @@ class LotteryController:
                 winning_count=len(winning_results)
             )
             
-            return APIResponse(
+            return APIJSONResponse(APIResponse(
                 success=True,
                 message=f"Checked {len(request.numbers)} numbers. Found {len(winning_results)} winners.",
-                data=response_data.dict()
-            )
+                data=response_data
+            ))
             
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error checking lottery numbers: {str(e)}")
     
+    async def check_lottery_tickets(self, request: LotteryBulkCheckRequest) -> Response:
+        """Check a large batch of tickets in one pass"""
+        try:
+            default_dates = (request.date,) if request.date else None
+            tickets = []
+            for ticket in request.tickets:
+                if isinstance(ticket, str):
+                    tickets.append((ticket, default_dates))
+                    continue
+                dates = set(ticket.dates or ())
+                if ticket.date:
+                    dates.add(ticket.date)
+                tickets.append((ticket.number, frozenset(dates) if dates else default_dates))
+            
+            # Validate every number in one pass before any matching
+            invalid = invalid_numbers([number for number, _ in tickets])
+            if invalid:
+                shown = ", ".join(f"#{i} ({tickets[i][0]!r})" for i in invalid[:10])
+                more = f" and {len(invalid) - 10} more" if len(invalid) > 10 else ""
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid lottery number format for {len(invalid)} tickets: {shown}{more}. Numbers must contain only digits and be at least 2 digits long."
+                )
+            
+            summary = await self.lottery_service.check_tickets(tickets)
+            
+            return APIJSONResponse(APIResponse(
+                success=True,
+                message=f"Checked {summary['checked_count']} tickets. Found {summary['winning_count']} winners.",
+                data=summary
+            ))
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error checking lottery tickets: {str(e)}")
+    
+    async def get_win_history(self, number: str, if_none_match: Optional[str] = None) -> Response:
+        """Get every prize a number has ever won"""
+        try:
+            if not VALID_NUMBER.fullmatch(number):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid lottery number format: {number}. Numbers must contain only digits and be at least 2 digits long."
+                )
+            
+            # The history only grows when a draw is added or edited
+            version = await self.lottery_service.get_draws_version()
+            etag = make_etag("wins", version, number)
+            cache_control = await self._latest_cache_control()
+            not_modified = self._not_modified(if_none_match, etag, cache_control)
+            if not_modified:
+                return not_modified
+            
+            history = await self.lottery_service.get_win_history(number)
+            
+            return APIJSONResponse(
+                APIResponse(
+                    success=True,
+                    message=f"{number} won {history['win_count']} prizes in {history['draws_won']} draws",
+                    data=history
+                ),
+                headers={"ETag": etag, "Cache-Control": cache_control}
+            )
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error retrieving win history: {str(e)}")
+    
     async def search_lottery_draws(
         self,
         start_date: Optional[date] = Query(None, description="Start date filter"),
         end_date: Optional[date] = Query(None, description="End date filter"),
         page: int = Query(1, ge=1, description="Page number"),
-        size: int = Query(50, ge=1, le=100, description="Items per page")
-    ) -> APIResponse:
+        size: int = Query(50, ge=1, le=100, description="Items per page"),
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page")
+    ) -> Response:
         """Search lottery draws with date filters"""
         try:
-            # This would need additional implementation in the service
-            # For now, return all draws with basic filtering
-            result = await self.lottery_service.get_all_draws(page=page, size=size)
-            
-            # Filter by date range if provided
-            filtered_items = result.items
-            if start_date or end_date:
-                filtered_items = [
-                    draw for draw in result.items
-                    if (not start_date or draw.date >= start_date) and
-                       (not end_date or draw.date <= end_date)
-                ]
-            
-            return APIResponse(
+            if start_date and end_date and start_date > end_date:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"start_date {start_date} is after end_date {end_date}"
+                )
+            
+            result = await self.lottery_service.search_draws(
+                start_date=start_date,
+                end_date=end_date,
+                cursor=cursor,
+                size=size,
+                page=page
+            )
+            
+            return APIJSONResponse(APIResponse(
                 success=True,
-                message=f"Found {len(filtered_items)} lottery draws",
+                message=f"Found {result.total if result.total is not None else len(result.items)} lottery draws",
                 data={
-                    "draws": [draw.dict() for draw in filtered_items],
+                    "draws": result.items,
                     "filters": {
                         "start_date": start_date.isoformat() if start_date else None,
                         "end_date": end_date.isoformat() if end_date else None
                     },
                     "pagination": {
-                        "total": len(filtered_items),
-                        "page": page,
-                        "size": size
+                        "total": result.total,
+                        "page": result.page,
+                        "size": result.size,
+                        "pages": result.pages,
+                        "next_cursor": result.next_cursor
                     }
                 }
-            )
+            ))
             
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error searching lottery draws: {str(e)}") 
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Error searching lottery draws: {str(e)}")
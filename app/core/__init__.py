@@ -1,3 +1,26 @@
-from .database import get_supabase_client
+from .database import get_supabase_client, get_async_db_client, close_async_db_client
+from .http_cache import make_etag, etag_matches, latest_cache_control, draw_cache_control, HISTORICAL_CACHE_CONTROL
+from .response_cache import ResponseCache, CachedResponse
+from .responses import APIJSONResponse, json_bytes
+from .metrics import REGISTRY, TimingMiddleware, render_metrics, timed
+from .profiling import ProfilingMiddleware
 
-__all__ = ["get_supabase_client"] 
\ No newline at end of file
+__all__ = [
+    "get_supabase_client",
+    "get_async_db_client",
+    "close_async_db_client",
+    "make_etag",
+    "etag_matches",
+    "latest_cache_control",
+    "draw_cache_control",
+    "HISTORICAL_CACHE_CONTROL",
+    "ResponseCache",
+    "CachedResponse",
+    "APIJSONResponse",
+    "json_bytes",
+    "REGISTRY",
+    "TimingMiddleware",
+    "render_metrics",
+    "timed",
+    "ProfilingMiddleware"
+]
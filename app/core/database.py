@@ -1,7 +1,9 @@
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from config.config import get_supabase_config
 
 _supabase_client: Client = None
+_async_db_client: AsyncPostgrestClient = None
 
 def get_supabase_client() -> Client:
     """Get Supabase client instance (singleton)"""
@@ -11,4 +13,34 @@ def get_supabase_client() -> Client:
         url, key = get_supabase_config()
         _supabase_client = create_client(url, key)
     
-    return _supabase_client 
\ No newline at end of file
+    return _supabase_client
+
+def get_async_db_client() -> AsyncPostgrestClient:
+    """Get async PostgREST client instance (singleton).
+
+    Talks to the same Supabase REST endpoint as the sync client, but over a
+    pooled, keep-alive httpx.AsyncClient so queries never block the event loop.
+    """
+    global _async_db_client
+    
+    if _async_db_client is None:
+        url, key = get_supabase_config()
+        _async_db_client = AsyncPostgrestClient(
+            f"{url}/rest/v1",
+            headers={
+                "apiKey": key,
+                "Authorization": f"Bearer {key}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+        )
+    
+    return _async_db_client
+
+async def close_async_db_client():
+    """Close the pooled connections of the async client"""
+    global _async_db_client
+    
+    if _async_db_client is not None:
+        await _async_db_client.aclose()
+        _async_db_client = None
@@ -0,0 +1,75 @@
+from typing import Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+import hashlib
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a response identified by ``parts`` (data version, format, ...)"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header already names ``etag``"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+# Thai draws are scheduled for the 1st and 16th, but move to nearby days around
+# holidays (the 30th, 2nd, 17th, ...). Any day this close to a scheduled one
+# may bring a draw, at any time of day Bangkok time.
+BANGKOK = timezone(timedelta(hours=7))
+DRAW_DAYS = (1, 16)
+DRAW_WINDOW_DAYS = 2
+
+# Published historical draws only change on corrections
+HISTORICAL_MAX_AGE = 7 * 24 * 3600
+# Latest data is cached until the next draw window, but never shorter or longer than this
+LATEST_MIN_MAX_AGE = 60
+LATEST_MAX_MAX_AGE = 24 * 3600
+
+HISTORICAL_CACHE_CONTROL = f"public, max-age={HISTORICAL_MAX_AGE}"
+
+def draw_window(day: date) -> Optional[Tuple[date, date]]:
+    """First and last day of the draw window around ``day``, or None between windows"""
+    for offset in range(-DRAW_WINDOW_DAYS, DRAW_WINDOW_DAYS + 1):
+        scheduled = day + timedelta(days=offset)
+        if scheduled.day in DRAW_DAYS:
+            return scheduled - timedelta(days=DRAW_WINDOW_DAYS), scheduled + timedelta(days=DRAW_WINDOW_DAYS)
+    return None
+
+def next_draw_window(day: date) -> date:
+    """First day of the next draw window opening after ``day``"""
+    candidate = day + timedelta(days=1)
+    while True:
+        window = draw_window(candidate)
+        if window is not None and window[0] == candidate:
+            return candidate
+        candidate += timedelta(days=1)
+
+def latest_cache_control(newest_draw: Optional[date] = None, now: Optional[datetime] = None) -> str:
+    """Cache-Control for data that changes when the next draw is published.
+
+    ``newest_draw`` is the date of the newest draw served. Within a draw
+    window that has no draw yet, or on the day of the draw itself while its
+    results arrive, responses are cached only briefly.
+    """
+    now = (now or datetime.now(BANGKOK)).astimezone(BANGKOK)
+    today = now.date()
+    
+    window = draw_window(today)
+    if window is not None and not (newest_draw is not None and window[0] <= newest_draw < today):
+        return f"public, max-age={LATEST_MIN_MAX_AGE}"
+    
+    opens = datetime.combine(next_draw_window(today), time(0), tzinfo=BANGKOK)
+    seconds = (opens - now).total_seconds()
+    max_age = int(max(LATEST_MIN_MAX_AGE, min(LATEST_MAX_MAX_AGE, seconds)))
+    return f"public, max-age={max_age}"
+
+def draw_cache_control(draw_date: date, newest_draw: Optional[date] = None, now: Optional[datetime] = None) -> str:
+    """Cache-Control for a single draw: long once a later draw has been published"""
+    if newest_draw is not None and draw_date < newest_draw:
+        return HISTORICAL_CACHE_CONTROL
+    return latest_cache_control(newest_draw, now)
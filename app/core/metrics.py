@@ -0,0 +1,230 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from functools import wraps
+import bisect
+import time
+
+# Seconds; spans in-memory lookups (tens of µs) to slow Supabase round-trips
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic counter, one series per combination of label values"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+class _Timer:
+    """Context manager observing the time spent inside it; ``seconds`` holds the result"""
+
+    __slots__ = ("_histogram", "_labels", "_started", "seconds")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self._histogram = histogram
+        self._labels = labels
+        self.seconds = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._started
+        self._histogram.observe(self.seconds, *self._labels)
+
+class Histogram:
+    """Latency histogram with fixed buckets, one series per combination of label values"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+
+    def time(self, *labels: str) -> _Timer:
+        """``with histogram.time(...) as timer:`` observes the block's duration"""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def collect(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series_labels} {total!r}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """The metrics of one process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ("method", "route", "status")
+))
+SERVICE_CALL_DURATION = REGISTRY.register(Histogram(
+    "lottery_service_call_duration_seconds",
+    "Time spent in LotteryService calls, database and matching included",
+    ("call",)
+))
+DB_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "draw_repository_request_duration_seconds",
+    "Duration of draw storage round-trips (the _count series is the round-trip count)",
+    ("backend", "operation")
+))
+DB_REQUEST_ERRORS = REGISTRY.register(Counter(
+    "draw_repository_errors_total",
+    "Draw storage requests that raised",
+    ("backend", "operation")
+))
+SERIALIZATION_DURATION = REGISTRY.register(Histogram(
+    "response_serialization_duration_seconds",
+    "Time spent encoding JSON response bodies and export lines",
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ("cache", "result")
+))
+TICKETS_CHECKED = REGISTRY.register(Counter(
+    "lottery_tickets_checked_total",
+    "Lottery numbers checked, by service call",
+    ("call",)
+))
+HEALTH_CHECK_DURATION = REGISTRY.register(Histogram(
+    "health_check_database_duration_seconds",
+    "Duration of the database probe made by /health",
+))
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+def timed(histogram: Histogram, label: Optional[str] = None) -> Callable:
+    """Decorator observing the duration of an async function, labelled with its name by default"""
+    def decorator(fn):
+        name = label or fn.__name__
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorator
+
+class TimingMiddleware:
+    """ASGI middleware recording HTTP_REQUEST_DURATION for every request.
+
+    Requests are labelled with their route template (``/api/th/v1/lottery/draws/{draw_date}``),
+    not the raw path, so the number of series stays bounded. Streaming
+    responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status)
+            )
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    return REGISTRY.render()
@@ -0,0 +1,71 @@
+from typing import Optional
+from datetime import datetime, timezone
+import cProfile
+import hmac
+import os
+import random
+import re
+
+# Request header that forces profiling of one request when it carries PROFILE_ADMIN_TOKEN
+PROFILE_HEADER = b"x-profile-token"
+
+# Response header naming the stats file a profiled request was written to
+PROFILE_ID_HEADER = b"x-profile-id"
+
+class ProfilingMiddleware:
+    """ASGI middleware running sampled requests under cProfile.
+
+    A request is profiled when it wins the ``sample_rate`` draw or sends
+    ``X-Profile-Token: <admin_token>``. Its stats are written as a pstats file
+    to ``output_dir``, named ``<X-Profile-Id>.prof`` after the time, method
+    and path.
+
+    cProfile sees the whole event loop thread, so other requests served while
+    a profiled one is awaiting can show up in its stats. Only one request is
+    profiled at a time; others are served normally meanwhile. main.py only
+    installs this middleware when profiling is configured, so it costs nothing
+    when off.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0, admin_token: Optional[str] = None, output_dir: str = "profiles"):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token.encode() if admin_token else None
+        self.output_dir = output_dir
+        self._active = False
+
+    def _wanted(self, scope) -> bool:
+        if self.admin_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.admin_token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = self._profile_id(scope)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self._active = False
+            os.makedirs(self.output_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.output_dir, f"{profile_id}.prof"))
+
+    @staticmethod
+    def _profile_id(scope) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        return f"{stamp}-{scope['method']}-{path[:80]}"
@@ -0,0 +1,48 @@
+from typing import Hashable, NamedTuple, Optional
+from collections import OrderedDict
+
+from .metrics import record_cache_lookup
+
+class CachedResponse(NamedTuple):
+    """A fully serialized JSON response body and the validators sent with it"""
+    body: bytes
+    etag: str
+
+class ResponseCache:
+    """Size-bounded LRU cache of serialized response bodies.
+
+    Keys include the data version, so entries for older versions are never
+    hit again and simply age out. ``max_bytes`` bounds the total body size;
+    0 disables the cache.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        record_cache_lookup("response", entry is not None)
+        return entry
+
+    def put(self, key: Hashable, entry: CachedResponse):
+        if len(entry.body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous.body)
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,35 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from ..models.draw_record import DrawRecord
+from .metrics import SERIALIZATION_DURATION
+
+def _encode_default(value: Any) -> Any:
+    """Turn the objects orjson does not know natively into ones it does"""
+    if isinstance(value, DrawRecord):
+        return value.to_dict()
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_bytes(content: Any) -> bytes:
+    """Serialize response content with orjson (dates, tuples, pydantic models and draw records included)"""
+    with SERIALIZATION_DURATION.time():
+        return orjson.dumps(
+            content,
+            default=_encode_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+class APIJSONResponse(ORJSONResponse):
+    """Default response class of the API.
+
+    Renders with orjson and accepts response models and draw records as
+    content, so controllers can return them without converting to dicts.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
@@ -1,17 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
+from .container import get_container, shutdown_container
+from config.config import get_profiling_config
+from .core.profiling import ProfilingMiddleware
+from .core.metrics import TimingMiddleware, HEALTH_CHECK_DURATION, CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from .core.responses import APIJSONResponse
 from .routes.lottery_routes import router as lottery_router
 from .models.lottery import APIResponse
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the service container once and warm its caches before serving"""
+    container = get_container()
+    await container.warm_up()
+    app.state.container = container
+    yield
+    app.state.container = None
+    await shutdown_container()
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=APIJSONResponse,
     title="Lottery Checker API",
     description="Multi-country lottery number checking and historical data API. Check lottery numbers against historical draws and get prize information.",
     version="1.0.0",
@@ -57,6 +74,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; not installed at all unless configured
+profile_sample_rate, profile_admin_token, profile_output_dir = get_profiling_config()
+if profile_sample_rate > 0 or profile_admin_token:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=profile_sample_rate,
+        admin_token=profile_admin_token,
+        output_dir=profile_output_dir
+    )
+
+# Time every request by route for /metrics (added last, so it wraps CORS too)
+app.add_middleware(TimingMiddleware)
+
 # Include routers
 app.include_router(lottery_router, prefix="/api")
 
@@ -84,6 +114,11 @@ async def root():
                     "method": "POST",
                     "description": "Check your lottery numbers for winnings"
                 },
+                "bulk_check_lottery_tickets": {
+                    "url": "/api/th/v1/lottery/check/bulk",
+                    "method": "POST",
+                    "description": "Check up to 50,000 tickets in one request"
+                },
                 "latest_draw": {
                     "url": "/api/th/v1/lottery/draws/latest", 
                     "method": "GET",
@@ -94,11 +129,21 @@ async def root():
                     "method": "GET", 
                     "description": "Get all lottery draws (paginated)"
                 },
+                "export_draws": {
+                    "url": "/api/th/v1/lottery/draws/export",
+                    "method": "GET",
+                    "description": "Stream all lottery draws as NDJSON or CSV"
+                },
                 "draw_by_date": {
                     "url": "/api/th/v1/lottery/draws/{date}",
                     "method": "GET",
                     "description": "Get lottery draw for specific date"
                 },
+                "win_history": {
+                    "url": "/api/th/v1/lottery/numbers/{number}/wins",
+                    "method": "GET",
+                    "description": "Every prize a number has ever won"
+                },
                 "search_draws": {
                     "url": "/api/th/v1/lottery/search",
                     "method": "GET",
@@ -124,26 +169,23 @@ async def root():
     )
 
 @app.get("/health", response_model=APIResponse, tags=["system"])
-async def health_check():
+async def health_check(request: Request):
     """Check API health and database connectivity."""
     from datetime import datetime
-    import time
     
-    start_time = time.time()
+    # The container serving requests, as resolved by the routes
+    container = getattr(request.app.state, "container", None) or get_container()
     
     # Test database connectivity
-    try:
-        from app.core.database import get_supabase_client
-        client = get_supabase_client()
-        # Simple query to test connection
-        client.table("lottery_draws").select("*").limit(1).execute()
-        db_status = "Connected"
-        db_healthy = True
-    except Exception as e:
-        db_status = f"Error: {str(e)[:50]}..."
-        db_healthy = False
-    
-    response_time = round((time.time() - start_time) * 1000, 2)
+    with HEALTH_CHECK_DURATION.time() as timer:
+        try:
+            # Simple query to test connection
+            await container.repository.ping()
+            db_status = "Connected"
+            db_healthy = True
+        except Exception as e:
+            db_status = f"Error: {str(e)[:50]}..."
+            db_healthy = False
     
     return APIResponse(
         success=True,
@@ -156,8 +198,9 @@ async def health_check():
                 "healthy": db_healthy
             },
             "performance": {
-                "response_time_ms": response_time,
-                "status": "Fast" if response_time < 1000 else "Slow"
+                # Latency percentiles and trends are on /metrics
+                "response_time_ms": round(timer.seconds * 1000, 2),
+                "status": "Fast" if timer.seconds < 1 else "Slow"
             },
             "api": {
                 "version": "1.0.0",
@@ -166,11 +209,16 @@ async def health_check():
         }
     )
 
+@app.get("/metrics", tags=["system"], response_class=Response)
+async def metrics():
+    """Request latency, service call, database, cache and ticket metrics in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled errors"""
-    return JSONResponse(
+    return APIJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -184,7 +232,7 @@ async def global_exception_handler(request, exc):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return APIJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -2,18 +2,24 @@ from .lottery import (
     LotteryDraw,
     LotteryDrawBase,
     LotteryCheckRequest,
+    LotteryBulkTicket,
+    LotteryBulkCheckRequest,
     LotteryCheckResult,
     LotteryCheckResponse,
     APIResponse,
     PaginatedResponse
 )
+from .draw_record import DrawRecord
 
 __all__ = [
     "LotteryDraw",
     "LotteryDrawBase", 
     "LotteryCheckRequest",
+    "LotteryBulkTicket",
+    "LotteryBulkCheckRequest",
     "LotteryCheckResult",
     "LotteryCheckResponse",
     "APIResponse",
-    "PaginatedResponse"
+    "PaginatedResponse",
+    "DrawRecord"
 ] 
\ No newline at end of file
@@ -0,0 +1,106 @@
+from typing import Any, Dict, Mapping, Optional, Tuple
+from datetime import date
+
+# List tiers of a draw, in the field order of LotteryDraw
+LIST_FIELDS = (
+    "prize_pre_3digit",
+    "prize_sub_3digits",
+    "nearby_1st",
+    "prize_2nd",
+    "prize_3rd",
+    "prize_4th",
+    "prize_5th",
+)
+
+
+class DrawRecord:
+    """Compact, read-only form of a stored lottery draw.
+
+    Used for everything the service caches and matches against. Rows coming
+    out of draw storage were validated when they were ingested, so building
+    a record only normalizes types (ISO date to ``date``, lists to tuples)
+    instead of running pydantic validation for every draw on every read.
+    Responses are serialized straight from ``to_dict``, which has the same
+    fields as ``LotteryDraw``.
+    """
+
+    __slots__ = (
+        "id",
+        "date",
+        "prize_1st",
+        "prize_pre_3digit",
+        "prize_sub_3digits",
+        "prize_2digits",
+        "nearby_1st",
+        "prize_2nd",
+        "prize_3rd",
+        "prize_4th",
+        "prize_5th",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        date: date,
+        prize_1st: str,
+        prize_pre_3digit: Tuple[str, ...] = (),
+        prize_sub_3digits: Tuple[str, ...] = (),
+        prize_2digits: Optional[int] = None,
+        nearby_1st: Tuple[str, ...] = (),
+        prize_2nd: Tuple[str, ...] = (),
+        prize_3rd: Tuple[str, ...] = (),
+        prize_4th: Tuple[str, ...] = (),
+        prize_5th: Tuple[str, ...] = (),
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None
+    ):
+        self.id = id
+        self.date = date
+        self.prize_1st = prize_1st
+        self.prize_pre_3digit = prize_pre_3digit
+        self.prize_sub_3digits = prize_sub_3digits
+        self.prize_2digits = prize_2digits
+        self.nearby_1st = nearby_1st
+        self.prize_2nd = prize_2nd
+        self.prize_3rd = prize_3rd
+        self.prize_4th = prize_4th
+        self.prize_5th = prize_5th
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "DrawRecord":
+        """Build a record from a lottery_draws row as returned by draw storage"""
+        draw_date = row["date"]
+        return cls(
+            id=row["id"],
+            date=date.fromisoformat(draw_date) if isinstance(draw_date, str) else draw_date,
+            prize_1st=row["prize_1st"],
+            prize_2digits=row.get("prize_2digits"),
+            created_at=row.get("created_at"),
+            updated_at=row.get("updated_at"),
+            **{field: tuple(row.get(field) or ()) for field in LIST_FIELDS}
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict with the fields of LotteryDraw, ready for the orjson response encoder"""
+        return {
+            "date": self.date,
+            "prize_1st": self.prize_1st,
+            "prize_pre_3digit": self.prize_pre_3digit,
+            "prize_sub_3digits": self.prize_sub_3digits,
+            "prize_2digits": self.prize_2digits,
+            "nearby_1st": self.nearby_1st,
+            "prize_2nd": self.prize_2nd,
+            "prize_3rd": self.prize_3rd,
+            "prize_4th": self.prize_4th,
+            "prize_5th": self.prize_5th,
+            "id": self.id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def __repr__(self) -> str:
+        return f"DrawRecord(id={self.id!r}, date={self.date!r}, prize_1st={self.prize_1st!r})"
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Optional, Union
 from datetime import date
+import datetime
+
+from .draw_record import DrawRecord
 
 class LotteryDrawBase(BaseModel):
     """Base lottery draw model"""
@@ -29,6 +32,17 @@ class LotteryCheckRequest(BaseModel):
     numbers: List[str] = Field(..., min_items=1, max_items=10, description="List of lottery numbers to check")
     date: Union[str, None] = None
 
+class LotteryBulkTicket(BaseModel):
+    """A ticket in a bulk check, optionally pinned to one or more draw dates"""
+    number: str
+    date: Optional[datetime.date] = None
+    dates: Optional[List[datetime.date]] = None
+
+class LotteryBulkCheckRequest(BaseModel):
+    """Request model for checking a large batch of tickets"""
+    tickets: List[Union[str, LotteryBulkTicket]] = Field(..., min_items=1, max_items=50000, description="Ticket numbers, or objects with a number and draw date(s)")
+    date: Optional[datetime.date] = Field(None, description="Draw date for tickets that do not give their own")
+
 class LotteryCheckResult(BaseModel):
     """Result of lottery number checking"""
     number: str
@@ -48,13 +62,16 @@ class APIResponse(BaseModel):
     """Standard API response wrapper"""
     success: bool = True
     message: str = "OK"
-    data: Optional[dict] = None
+    data: Optional[Any] = None
     error: Optional[str] = None
 
 class PaginatedResponse(BaseModel):
-    """Paginated response model"""
-    items: List[LotteryDraw]
-    total: int
-    page: int
+    """Paginated response model; items are the service's draw records, serialized like LotteryDraw"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    items: List[DrawRecord]
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int 
\ No newline at end of file
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None 
\ No newline at end of file
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Mapping, Sequence
+
+from .prize_tiers import TIER_FIELDS
+
+def number_win_rows(draws: Sequence[Mapping[str, Any]]) -> List[Dict[str, str]]:
+    """lottery_number_wins rows for draws given as lottery_draws rows.
+
+    One row per distinct (winning key, draw date, tier). The 2-digit prize is
+    keyed zero-padded, as tickets end in it; a stored 0 means no 2-digit
+    prize, as in every other check.
+    """
+    rows = {}
+    for draw in draws:
+        draw_date = str(draw["date"])
+        for tier, field in TIER_FIELDS:
+            values = draw.get(field)
+            if not values:
+                continue
+            if tier == "2digits":
+                values = (str(values).zfill(2),)
+            elif isinstance(values, str):
+                values = (values,)
+            for number in values:
+                rows[(number, draw_date, tier)] = {"number": number, "date": draw_date, "tier": tier}
+    return list(rows.values())
+
+def ticket_keys(number: str) -> List[str]:
+    """Every winning key a ticket can match: itself, its 3-digit parts and its last 2 digits"""
+    keys = {number}
+    if len(number) >= 3:
+        keys.update(number[i:i + 3] for i in range(len(number) - 2))
+    if len(number) >= 2:
+        keys.add(number[-2:])
+    return sorted(keys)
+
+def key_wins(number: str, key: str, tier: str) -> bool:
+    """Whether a lottery_number_wins row for ``key`` in ``tier`` is a win for ticket ``number``.
+
+    Same rules as PrizeIndex: full-number tiers need the exact number, first/last
+    3 digits the ticket's first or last 3, sub 3 digits any 3 consecutive
+    digits, and the 2-digit prize the ticket's last 2.
+    """
+    if tier == "pre_3digit":
+        return len(number) >= 3 and key in (number[:3], number[-3:])
+    if tier == "sub_3digits":
+        return len(key) == 3 and key in number
+    if tier == "2digits":
+        return len(number) >= 2 and number[-2:] == key
+    return key == number
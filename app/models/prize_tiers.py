@@ -0,0 +1,42 @@
+# Prize tiers in the order a single draw is checked (first match wins)
+TIER_ORDER = (
+    "1st_prize",
+    "nearby_1st",
+    "2nd_prize",
+    "3rd_prize",
+    "4th_prize",
+    "5th_prize",
+    "pre_3digit",
+    "sub_3digits",
+    "2digits",
+)
+
+TIER_LABELS = {
+    "1st_prize": "1st Prize",
+    "nearby_1st": "Around 1st Prize",
+    "2nd_prize": "2nd Prize",
+    "3rd_prize": "3rd Prize",
+    "4th_prize": "4th Prize",
+    "5th_prize": "5th Prize",
+    "pre_3digit": "First/Last 3 Digits",
+    "sub_3digits": "Sub 3 Digits",
+    "2digits": "Last 2 Digits",
+}
+
+TIER_RANK = {tier: rank for rank, tier in enumerate(TIER_ORDER)}
+
+# Draw field holding the winning keys of each tier, in check order
+TIER_FIELDS = (
+    ("1st_prize", "prize_1st"),
+    ("nearby_1st", "nearby_1st"),
+    ("2nd_prize", "prize_2nd"),
+    ("3rd_prize", "prize_3rd"),
+    ("4th_prize", "prize_4th"),
+    ("5th_prize", "prize_5th"),
+    ("pre_3digit", "prize_pre_3digit"),
+    ("sub_3digits", "prize_sub_3digits"),
+    ("2digits", "prize_2digits"),
+)
+
+# Full-number tiers, matched on the exact prize number
+EXACT_TIER_FIELDS = TIER_FIELDS[:6]
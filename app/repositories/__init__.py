@@ -0,0 +1,27 @@
+from typing import Optional
+
+from postgrest import AsyncPostgrestClient
+from config.config import get_draw_storage_config, get_draw_count_method
+
+from .base import DrawRepository, DrawRow, LIST_TIER_COLUMNS
+from .supabase_repository import SupabaseDrawRepository
+from .sqlite_repository import SqliteDrawRepository
+from .instrumented import InstrumentedDrawRepository
+
+def create_draw_repository(db: Optional[AsyncPostgrestClient] = None) -> DrawRepository:
+    """Build the draw repository selected by DRAW_STORAGE_BACKEND"""
+    backend, sqlite_path = get_draw_storage_config()
+
+    if backend == "sqlite":
+        return SqliteDrawRepository(sqlite_path)
+    return SupabaseDrawRepository(db, count_method=get_draw_count_method())
+
+__all__ = [
+    "DrawRepository",
+    "DrawRow",
+    "LIST_TIER_COLUMNS",
+    "SupabaseDrawRepository",
+    "SqliteDrawRepository",
+    "InstrumentedDrawRepository",
+    "create_draw_repository"
+]
@@ -0,0 +1,83 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import date
+
+from ..models.draw_record import LIST_FIELDS
+
+# A lottery_draws row as returned by PostgREST: dates and timestamps as ISO
+# strings, list tiers as lists of strings
+DrawRow = Dict[str, Any]
+
+# Columns of lottery_draws that hold lists of prize numbers
+LIST_TIER_COLUMNS = LIST_FIELDS
+
+class DrawRepository(ABC):
+    """Storage for lottery draws, independent of the database behind it"""
+
+    # Name of the backend in metrics labels
+    backend = "unknown"
+
+    @abstractmethod
+    async def get_latest_draw(self) -> Optional[DrawRow]:
+        """The most recent draw, or None when there are no draws"""
+
+    @abstractmethod
+    async def get_draw_by_date(self, draw_date: date) -> Optional[DrawRow]:
+        """The draw held on ``draw_date``, or None"""
+
+    @abstractmethod
+    async def get_draws_page(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        before: Optional[date] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count: bool = True
+    ) -> Tuple[List[DrawRow], Optional[int]]:
+        """Draws dated within [start_date, end_date], newest first.
+
+        ``before`` keeps only draws strictly older than a date (keyset
+        pagination), otherwise the first ``offset`` draws are skipped. Returns
+        up to ``limit`` rows and, when ``count`` is set, the number of draws
+        matching the filters (None if the backend cannot tell cheaply).
+        """
+
+    @abstractmethod
+    async def get_all_draws(self) -> List[DrawRow]:
+        """Every draw, newest first"""
+
+    @abstractmethod
+    async def get_draws_updated_since(self, updated_at: str) -> List[DrawRow]:
+        """Draws written after ``updated_at`` (the second part of a version), newest first"""
+
+    @abstractmethod
+    def iter_draws(self, chunk_size: int = 500) -> AsyncIterator[DrawRow]:
+        """Yield every draw, newest first, fetching ``chunk_size`` rows at a time"""
+
+    @abstractmethod
+    async def get_number_wins(self, keys: Sequence[str]) -> List[DrawRow]:
+        """lottery_number_wins rows (number, date, tier) for any of ``keys``, newest first.
+
+        Rows are per winning key, so callers keep the ones that are a win for
+        their ticket (see ``app.models.number_wins.key_wins``).
+        """
+
+    @abstractmethod
+    async def get_version(self) -> tuple:
+        """Cheap probe identifying the current contents of the draws.
+
+        A new draw is a new row, so the row count and the newest updated_at
+        change whenever draws are added or edited.
+        """
+
+    @abstractmethod
+    async def upsert_draws(self, records: Sequence[DrawRow]) -> int:
+        """Insert draws or update the ones whose date already exists, returning how many were written"""
+
+    @abstractmethod
+    async def ping(self):
+        """Run the cheapest possible query, raising if the storage is unreachable"""
+
+    async def close(self):
+        """Release connections held by the repository"""
@@ -0,0 +1,87 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from datetime import date
+import time
+
+from ..core.metrics import DB_REQUEST_DURATION, DB_REQUEST_ERRORS
+from .base import DrawRepository, DrawRow
+
+class InstrumentedDrawRepository(DrawRepository):
+    """Wraps another repository and records the duration and errors of every call.
+
+    Each call is one round-trip for the Supabase backend. A full iter_draws
+    walk is recorded once, with only the time spent waiting on the backend.
+    """
+
+    def __init__(self, repository: DrawRepository):
+        self.repository = repository
+        self.backend = repository.backend
+
+    async def _call(self, operation: str, call, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await call(*args, **kwargs)
+        except Exception:
+            DB_REQUEST_ERRORS.inc(self.backend, operation)
+            raise
+        finally:
+            DB_REQUEST_DURATION.observe(time.perf_counter() - started, self.backend, operation)
+
+    async def get_latest_draw(self) -> Optional[DrawRow]:
+        return await self._call("get_latest_draw", self.repository.get_latest_draw)
+
+    async def get_draw_by_date(self, draw_date: date) -> Optional[DrawRow]:
+        return await self._call("get_draw_by_date", self.repository.get_draw_by_date, draw_date)
+
+    async def get_draws_page(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        before: Optional[date] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count: bool = True
+    ) -> Tuple[List[DrawRow], Optional[int]]:
+        return await self._call(
+            "get_draws_page", self.repository.get_draws_page,
+            start_date, end_date, before=before, limit=limit, offset=offset, count=count
+        )
+
+    async def get_all_draws(self) -> List[DrawRow]:
+        return await self._call("get_all_draws", self.repository.get_all_draws)
+
+    async def get_draws_updated_since(self, updated_at: str) -> List[DrawRow]:
+        return await self._call("get_draws_updated_since", self.repository.get_draws_updated_since, updated_at)
+
+    async def iter_draws(self, chunk_size: int = 500) -> AsyncIterator[DrawRow]:
+        rows = self.repository.iter_draws(chunk_size).__aiter__()
+        waited = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception:
+                    DB_REQUEST_ERRORS.inc(self.backend, "iter_draws")
+                    raise
+                finally:
+                    waited += time.perf_counter() - started
+                yield row
+        finally:
+            DB_REQUEST_DURATION.observe(waited, self.backend, "iter_draws")
+
+    async def get_number_wins(self, keys: Sequence[str]) -> List[DrawRow]:
+        return await self._call("get_number_wins", self.repository.get_number_wins, keys)
+
+    async def get_version(self) -> tuple:
+        return await self._call("get_version", self.repository.get_version)
+
+    async def upsert_draws(self, records: Sequence[DrawRow]) -> int:
+        return await self._call("upsert_draws", self.repository.upsert_draws, records)
+
+    async def ping(self):
+        return await self._call("ping", self.repository.ping)
+
+    async def close(self):
+        await self.repository.close()
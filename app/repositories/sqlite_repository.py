@@ -0,0 +1,255 @@
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import asyncio
+import os
+import sqlite3
+
+from ..models.number_wins import number_win_rows
+from .base import DrawRepository, DrawRow, LIST_TIER_COLUMNS
+
+# Scalar columns of lottery_draws, in row order
+_DRAW_COLUMNS = ("id", "date", "prize_1st", "prize_2digits", "created_at", "updated_at")
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+# Draws read per query by full scans, and draw ids bound per IN list
+# (SQLite before 3.32 allows at most 999 parameters in a statement)
+_CHUNK_SIZE = 500
+
+# List tiers live in their own table, one row per prize number. Lookups by
+# number go through lottery_number_wins, so the prize tables carry no
+# number indexes (replicas created with them drop them).
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS lottery_draws (
+    id INTEGER PRIMARY KEY,
+    date TEXT UNIQUE NOT NULL,
+    prize_1st TEXT,
+    prize_2digits INTEGER,
+    created_at TEXT NOT NULL DEFAULT ({_NOW}),
+    updated_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+
+CREATE INDEX IF NOT EXISTS idx_lottery_draws_updated_at ON lottery_draws(updated_at);
+DROP INDEX IF EXISTS idx_lottery_draws_prize_1st;
+
+CREATE TABLE IF NOT EXISTS lottery_prize_numbers (
+    draw_id INTEGER NOT NULL REFERENCES lottery_draws(id) ON DELETE CASCADE,
+    tier TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    PRIMARY KEY (draw_id, tier, position)
+) WITHOUT ROWID;
+
+DROP INDEX IF EXISTS idx_lottery_prize_numbers_number;
+
+-- Every (winning key, draw, tier), derived from the tables above on write
+CREATE TABLE IF NOT EXISTS lottery_number_wins (
+    number TEXT NOT NULL,
+    date TEXT NOT NULL REFERENCES lottery_draws(date) ON DELETE CASCADE,
+    tier TEXT NOT NULL,
+    PRIMARY KEY (number, date, tier)
+) WITHOUT ROWID;
+"""
+
+class SqliteDrawRepository(DrawRepository):
+    """Draws stored in a local SQLite database file.
+
+    Meant as an in-pod read replica and for running the service offline.
+    ``sqlite3`` blocks, so every query runs on one dedicated thread: a slow
+    query or a sync holding the write lock never stalls the event loop, and
+    the connection is only ever used by one thread at a time.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # WAL lets a replica sync write while requests keep reading
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        self._backfill_number_wins()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-draws")
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking call on the connection's thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _backfill_number_wins(self):
+        """Derive lottery_number_wins for replicas synced before the table existed"""
+        if self.connection.execute("SELECT 1 FROM lottery_number_wins LIMIT 1").fetchone():
+            return
+        after = None
+        with self.connection:
+            while True:
+                draws = self._select_draw_chunk(after, _CHUNK_SIZE)
+                self._insert_number_wins(draws)
+                if len(draws) < _CHUNK_SIZE:
+                    return
+                after = draws[-1]["date"]
+
+    def _insert_number_wins(self, draws: Sequence[DrawRow]):
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO lottery_number_wins (number, date, tier) VALUES (:number, :date, :tier)",
+            number_win_rows(draws),
+        )
+
+    def _select_draws(self, where: str = "", params: Sequence = (), tail: str = "") -> List[DrawRow]:
+        """Draw rows matching ``where``, newest first, with their list tiers attached"""
+        draws = self.connection.execute(
+            f"SELECT {', '.join(_DRAW_COLUMNS)} FROM lottery_draws {where} ORDER BY date DESC {tail}",
+            params,
+        ).fetchall()
+        if not draws:
+            return []
+
+        rows: Dict[int, DrawRow] = {}
+        for draw in draws:
+            row = dict(draw)
+            row.update({column: [] for column in LIST_TIER_COLUMNS})
+            rows[row["id"]] = row
+
+        draw_ids = list(rows)
+        for start in range(0, len(draw_ids), _CHUNK_SIZE):
+            chunk = draw_ids[start:start + _CHUNK_SIZE]
+            prizes = self.connection.execute(
+                "SELECT draw_id, tier, number FROM lottery_prize_numbers "
+                f"WHERE draw_id IN ({', '.join('?' * len(chunk))}) ORDER BY draw_id, tier, position",
+                chunk,
+            )
+            for draw_id, tier, number in prizes:
+                rows[draw_id][tier].append(number)
+
+        return list(rows.values())
+
+    def _select_draw_chunk(self, after: Optional[str], chunk_size: int) -> List[DrawRow]:
+        """Up to ``chunk_size`` draws dated before ``after`` (from the newest when None), newest first"""
+        if after:
+            return self._select_draws("WHERE date < ?", (after, chunk_size), "LIMIT ?")
+        return self._select_draws("", (chunk_size,), "LIMIT ?")
+
+    async def get_latest_draw(self) -> Optional[DrawRow]:
+        rows = await self._run(self._select_draws, "", (), "LIMIT 1")
+        return rows[0] if rows else None
+
+    async def get_draw_by_date(self, draw_date: date) -> Optional[DrawRow]:
+        rows = await self._run(self._select_draws, "WHERE date = ?", (draw_date.isoformat(),))
+        return rows[0] if rows else None
+
+    async def get_draws_page(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        before: Optional[date] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count: bool = True
+    ) -> Tuple[List[DrawRow], Optional[int]]:
+        conditions, params = [], []
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date.isoformat())
+        if before:
+            conditions.append("date < ?")
+            params.append(before.isoformat())
+            offset = 0
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        def select() -> Tuple[List[DrawRow], Optional[int]]:
+            total = None
+            if count:
+                (total,) = self.connection.execute(f"SELECT COUNT(*) FROM lottery_draws {where}", params).fetchone()
+            return self._select_draws(where, params + [limit, offset], "LIMIT ? OFFSET ?"), total
+
+        return await self._run(select)
+
+    async def get_all_draws(self) -> List[DrawRow]:
+        return [row async for row in self.iter_draws()]
+
+    async def get_draws_updated_since(self, updated_at: str) -> List[DrawRow]:
+        return await self._run(self._select_draws, "WHERE updated_at > ?", (updated_at,))
+
+    async def iter_draws(self, chunk_size: int = 500) -> AsyncIterator[DrawRow]:
+        after = None
+        while True:
+            rows = await self._run(self._select_draw_chunk, after, chunk_size)
+            for row in rows:
+                yield row
+
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1]["date"]
+
+    async def get_number_wins(self, keys: Sequence[str]) -> List[DrawRow]:
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ", ".join("?" * len(keys))
+
+        def select() -> List[DrawRow]:
+            rows = self.connection.execute(
+                f"SELECT number, date, tier FROM lottery_number_wins WHERE number IN ({placeholders}) ORDER BY date DESC",
+                keys,
+            )
+            return [dict(row) for row in rows]
+
+        return await self._run(select)
+
+    async def get_version(self) -> tuple:
+        return await self._run(self._get_version)
+
+    def _get_version(self) -> tuple:
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM lottery_draws").fetchone()
+        # date breaks ties between draws written in the same upsert
+        newest = self.connection.execute(
+            "SELECT date, updated_at FROM lottery_draws ORDER BY updated_at DESC, date DESC LIMIT 1"
+        ).fetchone()
+        return (count, newest["updated_at"], newest["date"]) if newest else (count, None, None)
+
+    async def upsert_draws(self, records: Sequence[DrawRow]) -> int:
+        return await self._run(self._upsert_draws, records)
+
+    def _upsert_draws(self, records: Sequence[DrawRow]) -> int:
+        with self.connection:
+            for record in records:
+                draw_id = self.connection.execute(
+                    f"""
+                    INSERT INTO lottery_draws (date, prize_1st, prize_2digits)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (date) DO UPDATE SET
+                        prize_1st = excluded.prize_1st,
+                        prize_2digits = excluded.prize_2digits,
+                        updated_at = {_NOW}
+                    RETURNING id
+                    """,
+                    (str(record["date"]), record.get("prize_1st"), record.get("prize_2digits")),
+                ).fetchone()[0]
+
+                self.connection.execute("DELETE FROM lottery_prize_numbers WHERE draw_id = ?", (draw_id,))
+                self.connection.execute("DELETE FROM lottery_number_wins WHERE date = ?", (str(record["date"]),))
+                self._insert_number_wins([record])
+                self.connection.executemany(
+                    "INSERT INTO lottery_prize_numbers (draw_id, tier, position, number) VALUES (?, ?, ?, ?)",
+                    [
+                        (draw_id, tier, position, number)
+                        for tier in LIST_TIER_COLUMNS
+                        for position, number in enumerate(record.get(tier) or ())
+                    ],
+                )
+        return len(records)
+
+    async def ping(self):
+        await self._run(lambda: self.connection.execute("SELECT 1 FROM lottery_draws LIMIT 1").fetchone())
+
+    async def close(self):
+        await self._run(self.connection.close)
+        self._executor.shutdown()
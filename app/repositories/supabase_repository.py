@@ -0,0 +1,135 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from datetime import date
+
+from postgrest import AsyncPostgrestClient
+from postgrest.types import ReturnMethod
+
+from ..core.database import get_async_db_client, close_async_db_client
+from .base import DrawRepository, DrawRow
+
+class SupabaseDrawRepository(DrawRepository):
+    """Draws stored in the Supabase lottery_draws table, read over PostgREST"""
+
+    backend = "supabase"
+
+    def __init__(self, db: Optional[AsyncPostgrestClient] = None, count_method: str = "exact"):
+        self.db: AsyncPostgrestClient = db or get_async_db_client()
+        self.count_method = count_method
+
+    async def get_latest_draw(self) -> Optional[DrawRow]:
+        result = await self.db.table('lottery_draws')\
+            .select('*')\
+            .order('date', desc=True)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    async def get_draw_by_date(self, draw_date: date) -> Optional[DrawRow]:
+        result = await self.db.table('lottery_draws')\
+            .select('*')\
+            .eq('date', draw_date.isoformat())\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    async def get_draws_page(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        before: Optional[date] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count: bool = True
+    ) -> Tuple[List[DrawRow], Optional[int]]:
+        # One round-trip, with the total taken from PostgREST's Content-Range
+        # count and the range answered from idx_lottery_draws_date
+        query = self.db.table('lottery_draws')\
+            .select('*', count=self.count_method if count else None)\
+            .order('date', desc=True)\
+            .limit(limit)
+        if start_date:
+            query = query.gte('date', start_date.isoformat())
+        if end_date:
+            query = query.lte('date', end_date.isoformat())
+        if before:
+            query = query.lt('date', before.isoformat())
+        else:
+            query = query.offset(offset)
+        result = await query.execute()
+
+        return result.data, result.count
+
+    async def get_all_draws(self) -> List[DrawRow]:
+        result = await self.db.table('lottery_draws')\
+            .select('*')\
+            .order('date', desc=True)\
+            .execute()
+
+        return result.data
+
+    async def get_draws_updated_since(self, updated_at: str) -> List[DrawRow]:
+        result = await self.db.table('lottery_draws')\
+            .select('*')\
+            .gt('updated_at', updated_at)\
+            .order('date', desc=True)\
+            .execute()
+
+        return result.data
+
+    async def iter_draws(self, chunk_size: int = 500) -> AsyncIterator[DrawRow]:
+        after = None
+        while True:
+            query = self.db.table('lottery_draws')\
+                .select('*')\
+                .order('date', desc=True)\
+                .limit(chunk_size)
+            if after:
+                query = query.lt('date', after)
+            result = await query.execute()
+
+            for row in result.data:
+                yield row
+
+            if len(result.data) < chunk_size:
+                return
+            after = result.data[-1]['date']
+
+    async def get_number_wins(self, keys: Sequence[str]) -> List[DrawRow]:
+        # Answered from the (number, date, tier) primary key of the derived table
+        result = await self.db.table('lottery_number_wins')\
+            .select('number,date,tier')\
+            .in_('number', list(keys))\
+            .order('date', desc=True)\
+            .execute()
+
+        return result.data
+
+    async def get_version(self) -> tuple:
+        # Descending puts NULLs first in Postgres, and rows from before the
+        # updated_at default have none; date breaks ties within one upsert.
+        # postgrest-py cannot ask for nullslast (nullsfirst=False adds nothing),
+        # and each order() call adds its own order parameter where PostgREST
+        # reads one comma-separated list, so the whole order goes in one call.
+        result = await self.db.table('lottery_draws')\
+            .select('date,updated_at', count='exact')\
+            .order('updated_at.desc.nullslast,date.desc')\
+            .limit(1)\
+            .execute()
+
+        newest = result.data[0] if result.data else {}
+        return (result.count, newest.get('updated_at'), newest.get('date'))
+
+    async def upsert_draws(self, records: Sequence[DrawRow]) -> int:
+        if not records:
+            return 0
+        await self.db.table('lottery_draws')\
+            .upsert(list(records), on_conflict='date', returning=ReturnMethod.minimal)\
+            .execute()
+        return len(records)
+
+    async def ping(self):
+        await self.db.table('lottery_draws').select('date').limit(1).execute()
+
+    async def close(self):
+        await close_async_db_client()
@@ -1,40 +1,71 @@
-from fastapi import APIRouter, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Request
+from typing import Literal, Optional
 from datetime import date
 
+from ..container import get_container
 from ..controllers.lottery_controller import LotteryController
-from ..models.lottery import LotteryCheckRequest, APIResponse
+from ..models.lottery import LotteryCheckRequest, LotteryBulkCheckRequest, APIResponse
 
 # Create router
 router = APIRouter(prefix="/th/v1/lottery", tags=["Thailand Lottery"])
 
-# Dependency to get controller
-def get_lottery_controller() -> LotteryController:
-    return LotteryController()
+# Dependency to get the application-lifetime controller
+def get_lottery_controller(request: Request) -> LotteryController:
+    container = getattr(request.app.state, "container", None) or get_container()
+    return container.lottery_controller
 
 @router.get("/draws", response_model=APIResponse, summary="Get All Lottery Draws")
 async def get_all_lottery_draws(
     page: int = Query(1, ge=1, description="Page number", example=1),
     size: int = Query(50, ge=1, le=100, description="Items per page (max 100)", example=10),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from `next_cursor` of the previous page; replaces `page`"),
+    if_none_match: Optional[str] = Header(None),
     controller: LotteryController = Depends(get_lottery_controller)
 ):
-    """Get all lottery draws with pagination support."""
-    return await controller.get_all_lottery_draws(page=page, size=size)
+    """
+    Get all lottery draws with pagination support.
+    
+    Use `page`/`size` for numbered pages, or follow `next_cursor` to walk the
+    full history without offset scans.
+    """
+    return await controller.get_all_lottery_draws(
+        page=page,
+        size=size,
+        cursor=cursor,
+        if_none_match=if_none_match
+    )
+
+@router.get("/draws/export", summary="Export All Lottery Draws")
+async def export_lottery_draws(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Export format"),
+    if_none_match: Optional[str] = Header(None),
+    controller: LotteryController = Depends(get_lottery_controller)
+):
+    """
+    Stream the full draw history, newest first, as NDJSON (one draw per line)
+    or CSV in the upload dataset format.
+    
+    Responses carry an ETag tied to the data version; send it back in
+    `If-None-Match` to get `304 Not Modified` while nothing has changed.
+    """
+    return await controller.export_lottery_draws(format=format, if_none_match=if_none_match)
 
 @router.get("/draws/latest", response_model=APIResponse, summary="Get Latest Lottery Draw")
 async def get_latest_lottery_draw(
+    if_none_match: Optional[str] = Header(None),
     controller: LotteryController = Depends(get_lottery_controller)
 ):
     """Get the most recent lottery draw results."""
-    return await controller.get_latest_lottery_draw()
+    return await controller.get_latest_lottery_draw(if_none_match=if_none_match)
 
 @router.get("/draws/{draw_date}", response_model=APIResponse, summary="Get Lottery Draw by Date")
 async def get_lottery_draw_by_date(
     draw_date: date,
+    if_none_match: Optional[str] = Header(None),
     controller: LotteryController = Depends(get_lottery_controller)
 ):
     """Get lottery draw results for a specific date (YYYY-MM-DD format)."""
-    return await controller.get_lottery_draw_by_date(draw_date)
+    return await controller.get_lottery_draw_by_date(draw_date, if_none_match=if_none_match)
 
 @router.post("/check", response_model=APIResponse, summary="Check Lottery Numbers")
 async def check_lottery_numbers(
@@ -49,12 +80,42 @@ async def check_lottery_numbers(
     """
     return await controller.check_lottery_numbers(request)
 
+@router.post("/check/bulk", response_model=APIResponse, summary="Bulk Check Lottery Tickets")
+async def check_lottery_tickets(
+    request: LotteryBulkCheckRequest,
+    controller: LotteryController = Depends(get_lottery_controller)
+):
+    """
+    Check up to 50,000 tickets in one request.
+    
+    Each ticket is either a number or an object with a `number` and an optional
+    `date` or `dates` list. Tickets without dates use the request `date`, or all
+    historical draws if that is missing too. Only winning tickets are listed
+    (with their position in `tickets`), followed by aggregate totals.
+    """
+    return await controller.check_lottery_tickets(request)
+
+@router.get("/numbers/{number}/wins", response_model=APIResponse, summary="Get Win History of a Number")
+async def get_win_history(
+    number: str,
+    if_none_match: Optional[str] = Header(None),
+    controller: LotteryController = Depends(get_lottery_controller)
+):
+    """
+    Get every prize a lottery number has won across all draws, newest first.
+    
+    A draw is listed once per prize tier the number wins in it (e.g. the 1st
+    prize and the last 2 digits), with the total winnings over all of them.
+    """
+    return await controller.get_win_history(number, if_none_match=if_none_match)
+
 @router.get("/search", response_model=APIResponse, summary="Search Lottery Draws")
 async def search_lottery_draws(
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)", example="2024-01-01"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)", example="2024-12-31"),
     page: int = Query(1, ge=1, description="Page number", example=1),
     size: int = Query(50, ge=1, le=100, description="Items per page (max 100)", example=20),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from `next_cursor` of the previous page; replaces `page`"),
     controller: LotteryController = Depends(get_lottery_controller)
 ):
     """Search lottery draws with optional date range filters."""
@@ -62,5 +123,6 @@ async def search_lottery_draws(
         start_date=start_date,
         end_date=end_date,
         page=page,
-        size=size
+        size=size,
+        cursor=cursor
     ) 
\ No newline at end of file
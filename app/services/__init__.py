@@ -1,3 +1,3 @@
-from .lottery_service import LotteryService
+from .lottery_service import LotteryService, invalidate_draw_cache
 
-__all__ = ["LotteryService"] 
\ No newline at end of file
+__all__ = ["LotteryService", "invalidate_draw_cache"]
\ No newline at end of file
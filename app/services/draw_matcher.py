@@ -0,0 +1,50 @@
+from typing import Dict, FrozenSet, Optional
+from datetime import date
+
+from ..models.prize_tiers import EXACT_TIER_FIELDS
+
+
+class DrawMatcher:
+    """One draw compiled for checking tickets against it.
+
+    Full numbers of every tier go into a single dict holding the tier each
+    number wins first, 3-digit tiers into frozensets and the 2-digit prize is
+    padded once, so a ticket costs a few hash lookups whatever the tier sizes.
+    """
+
+    __slots__ = ("date", "exact", "pre_3digit", "sub_3digits", "last_2digits")
+
+    def __init__(self, draw):
+        self.date: date = draw.date
+        self.exact: Dict[str, str] = {}
+        for tier, field in EXACT_TIER_FIELDS:
+            values = getattr(draw, field)
+            if isinstance(values, str):
+                values = (values,)
+            for value in values or ():
+                # A number listed in two tiers wins the first one checked
+                self.exact.setdefault(value, tier)
+
+        self.pre_3digit: FrozenSet[str] = frozenset(draw.prize_pre_3digit or ())
+        self.sub_3digits: FrozenSet[str] = frozenset(draw.prize_sub_3digits or ())
+        # A 0 prize means "no 2-digit prize"
+        self.last_2digits: Optional[str] = str(draw.prize_2digits).zfill(2) if draw.prize_2digits else None
+
+    def match(self, number: str) -> Optional[str]:
+        """Tier ``number`` wins in this draw, or None"""
+        tier = self.exact.get(number)
+        if tier is not None:
+            return tier
+
+        if len(number) >= 3:
+            if number[:3] in self.pre_3digit or number[-3:] in self.pre_3digit:
+                return "pre_3digit"
+            sub_3digits = self.sub_3digits
+            for i in range(len(number) - 2):
+                if number[i:i + 3] in sub_3digits:
+                    return "sub_3digits"
+
+        if len(number) >= 2 and number[-2:] == self.last_2digits:
+            return "2digits"
+
+        return None
@@ -0,0 +1,125 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+import os
+import time
+
+import numpy as np
+
+from ..models.draw_record import DrawRecord
+from .prize_index import PackedPrizeIndex
+from .snapshot_file import MappedDraws, map_snapshot, write_snapshot_file
+from .vector_matcher import VectorMatcher
+
+# Array name prefixes of the prebuilt indexes inside the store file
+_INDEX_PREFIX = "index."
+_VECTOR_PREFIX = "vector."
+
+
+class SharedDrawStore:
+    """Draw snapshot with prebuilt indexes, shared by every worker process on a host.
+
+    One process at a time holds the loader lock. It polls the database and
+    publishes each new version of the draws as a snapshot file with the prize
+    index and NumPy matcher arrays. Publishing writes a new file and renames
+    it over the old one, so readers see either version whole, never a mix.
+    Every other process memory-maps the published file read-only. It notices
+    a new version with a ``stat`` call instead of a database query. Put the
+    directory on tmpfs (e.g. ``/dev/shm``) to keep the pages in shared memory.
+
+    Every database check touches the lock file, so a loader that gets no
+    requests (and so never polls) shows up as a stale lock file; a follower
+    then checks the database and publishes in its place.
+    """
+
+    FILE_NAME = "draws.snap"
+    LOCK_NAME = "loader.lock"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.lock_path = os.path.join(directory, self.LOCK_NAME)
+        self._lock_fd: Optional[int] = None
+
+    def try_lead(self) -> bool:
+        """Take the loader lock if no other process holds it; True while this process holds it"""
+        return self._lock(blocking=False)
+
+    def lead(self):
+        """Wait until this process holds the loader lock"""
+        self._lock(blocking=True)
+
+    def _lock(self, blocking: bool) -> bool:
+        import fcntl
+
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Released by the kernel when the process exits, so a crashed
+            # loader is replaced on another worker's next poll
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        # A new loader counts as polling until its first check
+        os.utime(fd)
+        return True
+
+    def mark_polled(self):
+        """Record that the database was just checked for a new version"""
+        os.makedirs(self.directory, exist_ok=True)
+        os.close(os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644))
+        os.utime(self.lock_path)
+
+    def polled_within(self, seconds: float) -> bool:
+        """Whether any process checked the database in the last ``seconds``"""
+        try:
+            return time.time() - os.stat(self.lock_path).st_mtime < seconds
+        except FileNotFoundError:
+            return False
+
+    def stamp(self) -> Optional[tuple]:
+        """Identity of the published file, None before anything is published"""
+        try:
+            return self._stamp(os.stat(self.path))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> tuple:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def publish(self, draws: Sequence[DrawRecord], version: tuple):
+        """Write ``draws`` and their indexes, replacing the published file atomically"""
+        index_arrays, unpacked = PackedPrizeIndex.pack(draws)
+        arrays = {_INDEX_PREFIX + name: array for name, array in index_arrays.items()}
+        arrays.update(
+            (_VECTOR_PREFIX + name, array) for name, array in VectorMatcher.build_arrays(draws).items()
+        )
+        write_snapshot_file(self.path, draws, version, extra_arrays=arrays, extra_header={"unpacked_index": unpacked})
+
+    def load(self) -> Tuple[tuple, MappedDraws, Optional[tuple], PackedPrizeIndex, Dict[str, np.ndarray]]:
+        """Map the published file: its stamp, draws, version, prize index and matcher arrays.
+
+        The index and matcher arrays are views of the shared mapping, and the
+        draws are decoded from it one record at a time as they are read. Only
+        the draw dates and the file's JSON header live in this process.
+        """
+        with open(self.path, "rb") as snapshot_file:
+            stamp = self._stamp(os.fstat(snapshot_file.fileno()))
+            header, arrays = map_snapshot(snapshot_file)
+
+        draws = MappedDraws(header, arrays)
+        version = draws.version
+        index = PackedPrizeIndex(
+            draws.dates,
+            self._prefixed(arrays, _INDEX_PREFIX),
+            header["unpacked_index"],
+            version=version
+        )
+        return stamp, draws, version, index, self._prefixed(arrays, _VECTOR_PREFIX)
+
+    @staticmethod
+    def _prefixed(arrays: Dict[str, Any], prefix: str) -> Dict[str, np.ndarray]:
+        return {name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)}
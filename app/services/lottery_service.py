@@ -1,124 +1,425 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Collection, Iterator, Mapping, Sequence, Tuple, Union
 from datetime import date
+import asyncio
+import bisect
 import math
+import os
+import time
 
-from supabase import Client
-from ..models.lottery import LotteryDraw, LotteryCheckResult, PaginatedResponse
-from ..core.database import get_supabase_client
+from config.config import get_draw_cache_config, get_draw_snapshot_path, get_shared_draw_store_dir
+from ..core.metrics import SERVICE_CALL_DURATION, TICKETS_CHECKED, record_cache_lookup, timed
+from ..models.lottery import LotteryCheckResult, PaginatedResponse
+from ..models.draw_record import DrawRecord
+from ..models.number_wins import key_wins, ticket_keys
+from ..repositories import DrawRepository, create_draw_repository
+from .prize_index import PackedPrizeIndex, PrizeIndex, TIER_LABELS, TIER_ORDER, TIER_RANK
+from .pagination import decode_cursor, next_cursor
+from .vector_matcher import VectorMatcher
+from .snapshot_file import MappedDraws, read_snapshot_file, write_snapshot_file
+from .draw_store import SharedDrawStore
+from .single_flight import SingleFlight
+from .draw_matcher import DrawMatcher
+
+class DrawsByDate(Mapping[date, DrawRecord]):
+    """Draws looked up by date through their positions, without holding the records.
+
+    Reads go through ``draws``, so a mapped shared-store snapshot decodes only
+    the draws asked for.
+    """
+    
+    def __init__(self, draws: Sequence[DrawRecord], dates: Sequence[date]):
+        self._draws = draws
+        self._positions: Dict[date, int] = {draw_date: i for i, draw_date in enumerate(dates)}
+    
+    def __getitem__(self, draw_date: date) -> DrawRecord:
+        return self._draws[self._positions[draw_date]]
+    
+    def __contains__(self, draw_date: object) -> bool:
+        return draw_date in self._positions
+    
+    def __iter__(self) -> Iterator[date]:
+        return iter(self._positions)
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+
+class DrawSnapshot:
+    """Every lottery draw at one version of the lottery_draws table"""
+    
+    def __init__(
+        self,
+        draws: Sequence[DrawRecord],
+        version: tuple,
+        from_file: bool = False,
+        index: Optional[Union[PrizeIndex, PackedPrizeIndex]] = None,
+        vector_arrays: Optional[Dict[str, Any]] = None,
+        shared: bool = False,
+        draw_matchers: Optional[Dict[date, DrawMatcher]] = None
+    ):
+        self.version = version
+        self.from_file = from_file  # loaded from the local snapshot file, not the database
+        self.shared = shared  # indexes mapped from the shared draw store
+        self.draws = draws  # newest first; a MappedDraws when shared
+        self.dates: List[date] = draws.dates if isinstance(draws, MappedDraws) else [draw.date for draw in draws]
+        self.by_date = DrawsByDate(draws, self.dates)
+        self.index = index if index is not None else PrizeIndex(draws, version=version)
+        self._descending_ordinals = [-draw_date.toordinal() for draw_date in self.dates]
+        self._vector_arrays = vector_arrays
+        self._vector_matcher: Optional[VectorMatcher] = None
+        self._draw_matchers: Dict[date, DrawMatcher] = draw_matchers or {}
+    
+    def draw_matcher(self, draw_date: date) -> Optional[DrawMatcher]:
+        """Compiled matcher of the draw on ``draw_date``, built on first use"""
+        matcher = self._draw_matchers.get(draw_date)
+        record_cache_lookup("draw_matcher", matcher is not None)
+        if matcher is None:
+            draw = self.by_date.get(draw_date)
+            if draw is None:
+                return None
+            matcher = self._draw_matchers[draw_date] = DrawMatcher(draw)
+        return matcher
+    
+    def vector_matcher(self, prize_amounts: Dict[str, int]) -> VectorMatcher:
+        """NumPy matcher over these draws, built on first use"""
+        if self._vector_matcher is None:
+            self._vector_matcher = VectorMatcher(
+                self.draws, prize_amounts, arrays=self._vector_arrays, dates=self.dates
+            )
+        return self._vector_matcher
+    
+    def position_after(self, after: date) -> int:
+        """Position of the first draw older than ``after``"""
+        return bisect.bisect_right(self._descending_ordinals, -after.toordinal())
+    
+    def date_window(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> tuple:
+        """Slice bounds of the draws dated within [start_date, end_date]"""
+        first = bisect.bisect_left(self._descending_ordinals, -end_date.toordinal()) if end_date else 0
+        stop = self.position_after(start_date) if start_date else len(self.draws)
+        return first, max(first, stop)
+
+class DrawCache:
+    """Process-wide draw cache, reloaded only when the table version changes.
+
+    With a shared draw store only the process holding its loader lock polls
+    the database; the others follow the snapshots it publishes, and stand in
+    for it when it has not polled for ``poll_seconds``.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        poll_seconds: float = 30,
+        snapshot_path: Optional[str] = None,
+        shared_store: Optional[SharedDrawStore] = None
+    ):
+        self.enabled = enabled
+        self.poll_seconds = poll_seconds
+        self.snapshot_path = snapshot_path
+        self.shared_store = shared_store
+        self.snapshot: Optional[DrawSnapshot] = None
+        self._polled_at = 0.0
+        self._seeded = False
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._store_stamp: Optional[tuple] = None
+    
+    def seed_from_file(self):
+        """Load the local snapshot file once per process, before the first database read"""
+        if self._seeded:
+            return
+        self._seeded = True
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        
+        try:
+            draws, version = read_snapshot_file(self.snapshot_path)
+        except Exception as e:
+            print(f"⚠️  Could not load draw snapshot file {self.snapshot_path}: {e}")
+            return
+        # Served immediately; the version check runs on the first read
+        self.snapshot = DrawSnapshot(draws, version, from_file=True)
+        self._polled_at = 0.0
+    
+    def refresh_in_background(self, refresh: Callable[[], Awaitable[Any]]):
+        """Run ``refresh`` as a background task unless one is already running"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # Count the attempt as a poll so a failing database is not hammered
+        self.mark_polled()
+        self._refresh_task = asyncio.ensure_future(self._run_refresh(refresh))
+    
+    @staticmethod
+    async def _run_refresh(refresh: Callable[[], Awaitable[Any]]):
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"⚠️  Background draw refresh failed: {e}")
+    
+    def poll_due(self) -> bool:
+        """Whether the table version should be checked again"""
+        return self.snapshot is None or time.monotonic() - self._polled_at >= self.poll_seconds
+    
+    def mark_polled(self):
+        self._polled_at = time.monotonic()
+    
+    def store(self, snapshot: DrawSnapshot):
+        """Swap in a freshly loaded snapshot"""
+        self.snapshot = snapshot
+        self.mark_polled()
+    
+    def invalidate(self):
+        """Drop the cached draws so the next read reloads them"""
+        self.snapshot = None
+        self._polled_at = 0.0
+        self._store_stamp = None
+    
+    def follow_store(self) -> Optional[DrawSnapshot]:
+        """Swap in the shared store's snapshot if a new one was published.
+
+        Returns None while nothing usable is published, so the caller can
+        load the draws itself.
+        """
+        stamp = self.shared_store.stamp()
+        if stamp is None:
+            return None
+        if stamp != self._store_stamp:
+            try:
+                stamp, draws, version, index, vector_arrays = self.shared_store.load()
+            except Exception as e:
+                print(f"⚠️  Could not load shared draw store {self.shared_store.path}: {e}")
+                return None
+            self.snapshot = DrawSnapshot(draws, version, index=index, vector_arrays=vector_arrays, shared=True)
+            self._store_stamp = stamp
+        self.mark_polled()
+        return self.snapshot
+    
+    async def publish(self, snapshot: DrawSnapshot) -> DrawSnapshot:
+        """Publish ``snapshot`` to the shared store and return the store's mapped copy.
+
+        Packing and writing the store takes a while, so it runs off the event loop.
+        """
+        await asyncio.to_thread(self.shared_store.publish, snapshot.draws, snapshot.version)
+        return self.follow_store() or snapshot
+
+_shared_store_dir = get_shared_draw_store_dir()
+_draw_cache = DrawCache(
+    *get_draw_cache_config(),
+    snapshot_path=get_draw_snapshot_path(),
+    shared_store=SharedDrawStore(_shared_store_dir) if _shared_store_dir else None
+)
+
+def invalidate_draw_cache():
+    """Invalidate hook for anything that writes lottery draws (e.g. the uploader)"""
+    _draw_cache.invalidate()
+
+def get_shared_draw_store() -> Optional[SharedDrawStore]:
+    """The draw store shared by this host's workers, None when DRAW_SHARED_STORE_DIR is unset"""
+    return _draw_cache.shared_store
+
+# Batches at least this large are matched with the NumPy engine
+VECTOR_MATCH_MIN_BATCH = 256
+
+# Prize amounts mapping
+PRIZE_AMOUNTS = {
+    "1st_prize": 6000000,
+    "nearby_1st": 100000,
+    "2nd_prize": 200000,
+    "3rd_prize": 80000,
+    "4th_prize": 40000,
+    "5th_prize": 20000,
+    "pre_3digit": 4000,
+    "sub_3digits": 4000,
+    "2digits": 2000
+}
 
 class LotteryService:
     """Service class for lottery-related business logic"""
     
-    def __init__(self):
-        self.supabase: Client = get_supabase_client()
-        
-        # Prize amounts mapping
-        self.prize_amounts = {
-            "1st_prize": 6000000,
-            "nearby_1st": 100000,
-            "2nd_prize": 200000,
-            "3rd_prize": 80000,
-            "4th_prize": 40000,
-            "5th_prize": 20000,
-            "pre_3digit": 4000,
-            "sub_3digits": 4000,
-            "2digits": 2000
-        }
-    
-    async def get_all_draws(self, page: int = 1, size: int = 50) -> PaginatedResponse:
-        """Get all lottery draws with pagination"""
+    def __init__(self, repository: Optional[DrawRepository] = None):
+        self.repository: DrawRepository = repository or create_draw_repository()
+        self.prize_amounts = PRIZE_AMOUNTS
+        # Concurrent identical reads (e.g. everyone asking for the latest
+        # draw right after it is published) share one database fetch
+        self._flights = SingleFlight()
+    
+    async def warm_up(self):
+        """Load the draw cache ahead of the first read"""
+        await self._get_snapshot()
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def refresh_draws(self) -> tuple:
+        """Check the table version now and reload the draws if they changed.
+
+        Returns the version now cached. While this process holds the shared
+        draw store's loader lock, new versions are also published to it.
+        """
+        try:
+            snapshot = await self._refresh_snapshot()
+            return snapshot.version
+        except Exception as e:
+            raise Exception(f"Error refreshing lottery draws: {str(e)}")
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def write_snapshot(self, path: Optional[str] = None) -> int:
+        """Write every draw from the database to a local snapshot file.
+
+        Returns the number of draws written to ``path`` (DRAW_SNAPSHOT_PATH by default).
+        """
+        try:
+            version = await self._fetch_draws_version()
+            draws = await self._fetch_all_draws()
+            await asyncio.to_thread(write_snapshot_file, path or get_draw_snapshot_path(), draws, version)
+            return len(draws)
+        except Exception as e:
+            raise Exception(f"Error writing draw snapshot: {str(e)}")
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def get_all_draws(self, page: int = 1, size: int = 50, cursor: Optional[str] = None) -> PaginatedResponse:
+        """Get all lottery draws with page/size or keyset (cursor) pagination"""
         try:
+            return await self.search_draws(page=page, size=size, cursor=cursor)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error fetching lottery draws: {str(e)}")
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def search_draws(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        size: int = 50,
+        page: int = 1
+    ) -> PaginatedResponse:
+        """Get draws within an inclusive date range, newest first.
+
+        The range is applied by the repository on the indexed ``date`` column.
+        With a cursor, the page starts right after the draw the cursor names
+        and ``total``/``pages`` are only reported when they come for free.
+        """
+        try:
+            after = decode_cursor(cursor) if cursor else None
             # Calculate offset
             offset = (page - 1) * size
             
-            # Get total count
-            count_result = self.supabase.table('lottery_draws').select('count').execute()
-            total = len(count_result.data)
-            
-            # Get paginated data
-            result = self.supabase.table('lottery_draws')\
-                .select('*')\
-                .order('date', desc=True)\
-                .range(offset, offset + size - 1)\
-                .execute()
-            
-            # Convert to models
-            draws = [LotteryDraw(**draw) for draw in result.data]
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                first, stop = snapshot.date_window(start_date, end_date)
+                total = stop - first
+                start = max(first, snapshot.position_after(after)) if after else first + offset
+                draws = snapshot.draws[start:min(start + size, stop)]
+                has_more = start + size < stop
+            else:
+                # The page plus one lookahead row
+                rows, total = await self.repository.get_draws_page(
+                    start_date, end_date,
+                    before=after,
+                    limit=size + 1,
+                    offset=offset,
+                    count=not after
+                )
+                
+                draws = [DrawRecord.from_row(draw) for draw in rows[:size]]
+                has_more = len(rows) > size
             
             # Calculate pagination info
-            pages = math.ceil(total / size)
+            pages = math.ceil(total / size) if total is not None else None
             
+            # Draw records are only type-checked, not revalidated field by field
             return PaginatedResponse(
                 items=draws,
                 total=total,
-                page=page,
+                page=None if after else page,
                 size=size,
-                pages=pages
+                pages=pages,
+                next_cursor=next_cursor(draws, has_more)
             )
             
+        except ValueError:
+            raise
         except Exception as e:
-            raise Exception(f"Error fetching lottery draws: {str(e)}")
+            raise Exception(f"Error searching lottery draws: {str(e)}")
     
-    async def get_draw_by_date(self, draw_date: date) -> Optional[LotteryDraw]:
+    @timed(SERVICE_CALL_DURATION)
+    async def get_draws_version(self) -> tuple:
+        """Version of the lottery_draws table, from the cache when it is warm"""
+        try:
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                return snapshot.version
+            return await self._fetch_draws_version()
+        except Exception as e:
+            raise Exception(f"Error fetching lottery draws version: {str(e)}")
+    
+    async def iter_draws(self, chunk_size: int = 500) -> AsyncIterator[DrawRecord]:
+        """Yield every draw, newest first, without building the full list.
+
+        Served from the cached snapshot when it is warm, otherwise fetched in
+        keyset-paginated chunks of ``chunk_size`` rows.
+        """
+        snapshot = await self._get_snapshot()
+        if snapshot is not None:
+            for draw in snapshot.draws:
+                yield draw
+            return
+        
+        async for draw_data in self.repository.iter_draws(chunk_size):
+            yield DrawRecord.from_row(draw_data)
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def get_draw_by_date(self, draw_date: date) -> Optional[DrawRecord]:
         """Get specific lottery draw by date"""
         try:
-            result = self.supabase.table('lottery_draws')\
-                .select('*')\
-                .eq('date', draw_date.isoformat())\
-                .execute()
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                return snapshot.by_date.get(draw_date)
             
-            if result.data:
-                return LotteryDraw(**result.data[0])
-            return None
+            draw_data = await self._flights.do(
+                ("draw", draw_date), lambda: self.repository.get_draw_by_date(draw_date)
+            )
+            return DrawRecord.from_row(draw_data) if draw_data else None
             
         except Exception as e:
             raise Exception(f"Error fetching lottery draw for {draw_date}: {str(e)}")
     
-    async def get_latest_draw(self) -> Optional[LotteryDraw]:
+    @timed(SERVICE_CALL_DURATION)
+    async def get_latest_draw(self) -> Optional[DrawRecord]:
         """Get the most recent lottery draw"""
         try:
-            result = self.supabase.table('lottery_draws')\
-                .select('*')\
-                .order('date', desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if result.data:
-                return LotteryDraw(**result.data[0])
-            return None
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                return snapshot.draws[0] if snapshot.draws else None
+            
+            draw_data = await self._flights.do("latest", self.repository.get_latest_draw)
+            return DrawRecord.from_row(draw_data) if draw_data else None
             
         except Exception as e:
             raise Exception(f"Error fetching latest lottery draw: {str(e)}")
     
+    @timed(SERVICE_CALL_DURATION)
     async def check_numbers(self, numbers: List[str], check_date: Optional[date] = None) -> List[LotteryCheckResult]:
         """Check lottery numbers against draws"""
+        TICKETS_CHECKED.inc("check_numbers", amount=len(numbers))
         try:
             results = []
             
             if check_date:
                 # Check against specific date
-                draw = await self.get_draw_by_date(check_date)
-                if draw:
+                matcher = await self._get_draw_matcher(check_date)
+                if matcher:
                     for number in numbers:
-                        result = self._check_number_against_draw(number, draw)
+                        result = self._check_number_against_draw(number, matcher)
                         results.append(result)
             else:
-                # Check against all draws
-                all_draws_result = self.supabase.table('lottery_draws')\
-                    .select('*')\
-                    .order('date', desc=True)\
-                    .execute()
+                # Check against all draws through the prize index
+                snapshot = await self._get_snapshot()
+                if snapshot is not None:
+                    index = snapshot.index
+                else:
+                    index = PrizeIndex(await self._fetch_all_draws())
                 
                 for number in numbers:
-                    best_result = None
-                    for draw_data in all_draws_result.data:
-                        draw = LotteryDraw(**draw_data)
-                        result = self._check_number_against_draw(number, draw)
-                        
-                        # Keep the best result (highest prize)
-                        if result.matched and (not best_result or 
-                                             (result.prize_amount or 0) > (best_result.prize_amount or 0)):
-                            best_result = result
+                    best_result = self._best_indexed_result(number, index)
                     
                     if best_result:
                         results.append(best_result)
@@ -135,112 +436,310 @@ class LotteryService:
         except Exception as e:
             raise Exception(f"Error checking lottery numbers: {str(e)}")
     
-    def _check_number_against_draw(self, number: str, draw: LotteryDraw) -> LotteryCheckResult:
-        """Check a single number against a single draw"""
-        number = number.strip()
+    @timed(SERVICE_CALL_DURATION)
+    async def check_tickets(self, tickets: Sequence[Tuple[str, Optional[Collection[date]]]]) -> Dict[str, Any]:
+        """Check a batch of tickets against one snapshot of the draws.
+
+        Each ticket is a number plus the draw dates to check it against, or
+        None for every draw. A ticket reports its single best win, with the
+        same tier precedence and tie-breaking as check_numbers. Only winning
+        tickets are listed; every ticket counts towards the totals.
+        """
+        TICKETS_CHECKED.inc("check_tickets", amount=len(tickets))
+        try:
+            snapshot = await self._get_snapshot()
+            if snapshot is None:
+                snapshot = DrawSnapshot(await self._fetch_all_draws(), version=None)
+            numbers = [number.strip() for number, _ in tickets]
+            best_matches = self._best_ticket_matches(snapshot, numbers, [dates for _, dates in tickets])
+            
+            results = []
+            prize_counts: Dict[str, int] = {}
+            missing_dates = set()
+            total_winnings = 0
+            
+            for position, (_, dates) in enumerate(tickets):
+                if dates is not None:
+                    missing_dates.update(d for d in dates if d not in snapshot.by_date)
+                
+                best = best_matches[position]
+                if not best:
+                    continue
+                
+                prize_amount, draw_date, tier = best
+                prize_type = TIER_LABELS[tier]
+                results.append({
+                    "index": position,
+                    "number": numbers[position],
+                    "date": draw_date.isoformat(),
+                    "prize_type": prize_type,
+                    "prize_amount": prize_amount
+                })
+                prize_counts[prize_type] = prize_counts.get(prize_type, 0) + 1
+                total_winnings += prize_amount
+            
+            return {
+                "results": results,
+                "checked_count": len(tickets),
+                "winning_count": len(results),
+                "total_winnings": total_winnings,
+                "prize_counts": prize_counts,
+                "missing_dates": sorted(d.isoformat() for d in missing_dates),
+                "draws_checked": len(snapshot.draws)
+            }
+            
+        except Exception as e:
+            raise Exception(f"Error checking lottery tickets: {str(e)}")
+    
+    @timed(SERVICE_CALL_DURATION)
+    async def get_win_history(self, number: str) -> Dict[str, Any]:
+        """Every prize a number has won, newest draw first.
+
+        A draw appears once per tier it is won in. Served from the prize index
+        of the cached snapshot when it is warm, otherwise with one indexed
+        lookup of the ticket's keys in the lottery_number_wins table.
+        """
+        TICKETS_CHECKED.inc("get_win_history")
+        try:
+            snapshot = await self._get_snapshot()
+            if snapshot is not None:
+                wins = snapshot.index.all_matches(number)
+            else:
+                rows = await self.repository.get_number_wins(ticket_keys(number))
+                wins = sorted(
+                    {
+                        (date.fromisoformat(str(row["date"])), row["tier"])
+                        for row in rows
+                        if key_wins(number, row["number"], row["tier"])
+                    },
+                    key=lambda win: (-win[0].toordinal(), TIER_RANK[win[1]])
+                )
+            
+            results = [
+                {
+                    "date": draw_date.isoformat(),
+                    "prize_type": TIER_LABELS[tier],
+                    "prize_amount": self.prize_amounts[tier]
+                }
+                for draw_date, tier in wins
+            ]
+            
+            return {
+                "number": number,
+                "wins": results,
+                "win_count": len(results),
+                "draws_won": len({draw_date for draw_date, _ in wins}),
+                "total_winnings": sum(result["prize_amount"] for result in results)
+            }
+            
+        except Exception as e:
+            raise Exception(f"Error fetching win history for {number}: {str(e)}")
+    
+    def _best_ticket_matches(
+        self,
+        snapshot: DrawSnapshot,
+        numbers: List[str],
+        dates: List[Optional[Collection[date]]]
+    ) -> List[Optional[tuple]]:
+        """Best (prize amount, draw date, tier) of every ticket in a batch.
+
+        Large batches send their 6-digit tickets through the NumPy engine;
+        other tickets and small batches use the prize index. Both give the
+        same result for any ticket.
+        """
+        best: List[Optional[tuple]] = [None] * len(numbers)
+        vector_positions = []
+        if len(numbers) >= VECTOR_MATCH_MIN_BATCH:
+            vector_positions = [i for i, number in enumerate(numbers) if len(number) == 6 and number.isascii() and number.isdigit()]
         
-        # Check 1st prize
-        if number == draw.prize_1st:
-            return LotteryCheckResult(
-                number=number,
-                date=draw.date,
-                prize_type="1st Prize",
-                prize_amount=self.prize_amounts["1st_prize"],
-                matched=True
+        if vector_positions:
+            matcher = snapshot.vector_matcher(self.prize_amounts)
+            draw_ids, ranks = matcher.best_matches(
+                [numbers[i] for i in vector_positions],
+                [dates[i] for i in vector_positions]
             )
+            for position, draw_id, rank in zip(vector_positions, draw_ids.tolist(), ranks.tolist()):
+                if draw_id >= 0:
+                    tier = TIER_ORDER[rank]
+                    best[position] = (self.prize_amounts[tier], matcher.dates[draw_id], tier)
         
-        # Check nearby 1st prize
-        if number in draw.nearby_1st:
-            return LotteryCheckResult(
-                number=number,
-                date=draw.date,
-                prize_type="Around 1st Prize",
-                prize_amount=self.prize_amounts["nearby_1st"],
-                matched=True
-            )
+        vectorized = set(vector_positions)
+        for position, number in enumerate(numbers):
+            if position not in vectorized:
+                best[position] = self._best_match(number, snapshot.index, dates[position])
         
-        # Check 2nd prize
-        if number in draw.prize_2nd:
-            return LotteryCheckResult(
-                number=number,
-                date=draw.date,
-                prize_type="2nd Prize",
-                prize_amount=self.prize_amounts["2nd_prize"],
-                matched=True
-            )
+        return best
+    
+    async def _fetch_draws_version(self) -> tuple:
+        """Cheap probe identifying the current contents of the draw storage"""
+        return await self._flights.do("version", self.repository.get_version)
+    
+    async def _fetch_all_draws(self) -> List[DrawRecord]:
+        """Fetch every draw, newest first, shared by concurrent callers"""
+        return await self._flights.do("all", self._load_all_draws)
+    
+    async def _load_all_draws(self) -> List[DrawRecord]:
+        return [DrawRecord.from_row(draw_data) for draw_data in await self.repository.get_all_draws()]
+    
+    async def _get_snapshot(self) -> Optional[DrawSnapshot]:
+        """Current draw snapshot, or None when the draw cache is disabled"""
+        cache = _draw_cache
+        if not cache.enabled:
+            return None
         
-        # Check 3rd prize
-        if number in draw.prize_3rd:
-            return LotteryCheckResult(
-                number=number,
-                date=draw.date,
-                prize_type="3rd Prize",
-                prize_amount=self.prize_amounts["3rd_prize"],
-                matched=True
-            )
+        cache.seed_from_file()
+        if not cache.poll_due():
+            record_cache_lookup("draw_snapshot", True)
+            return cache.snapshot
         
-        # Check 4th prize
-        if number in draw.prize_4th:
-            return LotteryCheckResult(
-                number=number,
-                date=draw.date,
-                prize_type="4th Prize",
-                prize_amount=self.prize_amounts["4th_prize"],
-                matched=True
-            )
+        if cache.shared_store is not None and not cache.shared_store.try_lead():
+            # Another process polls the database and publishes the draws,
+            # unless it has gone quiet (e.g. it gets no requests)
+            previous = cache.snapshot
+            snapshot = cache.follow_store()
+            if snapshot is not None and cache.shared_store.polled_within(cache.poll_seconds):
+                record_cache_lookup("draw_snapshot", snapshot is previous)
+                return snapshot
+        
+        if cache.snapshot is not None and cache.snapshot.from_file:
+            # Keep answering from the file while the database is checked
+            cache.refresh_in_background(self._refresh_snapshot)
+            record_cache_lookup("draw_snapshot", True)
+            return cache.snapshot
+        
+        # A poll that finds the version unchanged still counts as a hit
+        previous = cache.snapshot
+        snapshot = await self._refresh_snapshot()
+        record_cache_lookup("draw_snapshot", snapshot is previous)
+        return snapshot
+    
+    async def _refresh_snapshot(self) -> DrawSnapshot:
+        """Check the table version and reload the draws if they changed.
+
+        Requests that find the poll due at the same time wait on one refresh
+        instead of each reloading the table.
+        """
+        return await self._flights.do("snapshot", self._reload_snapshot)
+    
+    async def _reload_snapshot(self) -> DrawSnapshot:
+        cache = _draw_cache
+        store = cache.shared_store
+        # A follower publishes too while the loader is not polling
+        publishing = store is not None and (store.try_lead() or not store.polled_within(cache.poll_seconds))
+        if publishing:
+            # Build on what an earlier loader published instead of reloading
+            cache.follow_store()
+        
+        version = await self._fetch_draws_version()
+        if publishing:
+            store.mark_polled()
+        snapshot = cache.snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = await self._load_snapshot(snapshot, version)
+            if publishing:
+                snapshot = await cache.publish(snapshot)
+            cache.store(snapshot)
+        elif publishing and not snapshot.shared:
+            # Current, but loaded before this process became the loader
+            snapshot = await cache.publish(snapshot)
+            cache.store(snapshot)
+        elif snapshot.from_file:
+            # The file is current; later polls can block on the database as usual
+            snapshot.from_file = False
+            cache.mark_polled()
+        else:
+            cache.mark_polled()
+        
+        return snapshot
+    
+    async def _load_snapshot(self, previous: Optional[DrawSnapshot], version: tuple) -> DrawSnapshot:
+        """Snapshot at ``version``, built from ``previous`` plus the draws written since when possible.
+
+        New draws are one small query instead of a reload of the whole table,
+        and when they are all new dates they extend a copy of the previous
+        index instead of re-indexing every draw. Falls back to a full reload
+        when there is nothing to build on or the merged draws do not add up to
+        the new row count (e.g. after a delete).
+        """
+        since = previous.version[1] if previous is not None and previous.version else None
+        if since is not None:
+            changed = [DrawRecord.from_row(row) for row in await self.repository.get_draws_updated_since(since)]
+            changed_dates = {draw.date for draw in changed}
+            by_date = dict(previous.by_date)
+            by_date.update((draw.date, draw) for draw in changed)
+            if len(by_date) == version[0]:
+                draws = sorted(by_date.values(), key=lambda draw: draw.date, reverse=True)
+                index = None
+                # An edited draw would leave its old keys behind, so only appends extend the index
+                if isinstance(previous.index, PrizeIndex) and changed_dates.isdisjoint(previous.by_date):
+                    index = previous.index.copy(version)
+                    for draw in changed:
+                        index.add_draw(draw)
+                draw_matchers = {
+                    draw_date: matcher
+                    for draw_date, matcher in previous._draw_matchers.items()
+                    if draw_date not in changed_dates
+                }
+                return DrawSnapshot(draws, version, index=index, draw_matchers=draw_matchers)
+        
+        return DrawSnapshot(await self._fetch_all_draws(), version)
+    
+    async def _get_draw_matcher(self, draw_date: date) -> Optional[DrawMatcher]:
+        """Compiled matcher for one draw, cached with the snapshot when it is warm"""
+        snapshot = await self._get_snapshot()
+        if snapshot is not None:
+            return snapshot.draw_matcher(draw_date)
         
-        # Check 5th prize
-        if number in draw.prize_5th:
+        draw = await self.get_draw_by_date(draw_date)
+        return DrawMatcher(draw) if draw else None
+    
+    def _best_match(self, number: str, index: PrizeIndex, dates: Optional[Collection[date]] = None) -> Optional[tuple]:
+        """Best (prize amount, draw date, tier) for a number, optionally limited to some draws"""
+        best = None
+        
+        # Highest prize wins, ties go to the most recent draw
+        for draw_date, tier in index.matches(number).items():
+            if dates is not None and draw_date not in dates:
+                continue
+            candidate = (self.prize_amounts[tier], draw_date, tier)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        
+        return best
+    
+    def _best_indexed_result(self, number: str, index: PrizeIndex) -> Optional[LotteryCheckResult]:
+        """Best winning result for a number across every indexed draw"""
+        number = number.strip()
+        best = self._best_match(number, index)
+        
+        if not best:
+            return None
+        
+        prize_amount, draw_date, tier = best
+        return LotteryCheckResult(
+            number=number,
+            date=draw_date,
+            prize_type=TIER_LABELS[tier],
+            prize_amount=prize_amount,
+            matched=True
+        )
+    
+    def _check_number_against_draw(self, number: str, matcher: DrawMatcher) -> LotteryCheckResult:
+        """Check a single number against a single compiled draw"""
+        number = number.strip()
+        tier = matcher.match(number)
+        
+        if tier is None:
             return LotteryCheckResult(
                 number=number,
-                date=draw.date,
-                prize_type="5th Prize",
-                prize_amount=self.prize_amounts["5th_prize"],
-                matched=True
+                date=matcher.date,
+                matched=False
             )
         
-        # Check first/last 3 digits
-        if len(number) >= 3:
-            first_3 = number[:3]
-            last_3 = number[-3:]
-            
-            if first_3 in draw.prize_pre_3digit or last_3 in draw.prize_pre_3digit:
-                return LotteryCheckResult(
-                    number=number,
-                    date=draw.date,
-                    prize_type="First/Last 3 Digits",
-                    prize_amount=self.prize_amounts["pre_3digit"],
-                    matched=True
-                )
-        
-        # Check sub 3 digits
-        if len(number) >= 3:
-            for i in range(len(number) - 2):
-                sub_3 = number[i:i+3]
-                if sub_3 in draw.prize_sub_3digits:
-                    return LotteryCheckResult(
-                        number=number,
-                        date=draw.date,
-                        prize_type="Sub 3 Digits",
-                        prize_amount=self.prize_amounts["sub_3digits"],
-                        matched=True
-                    )
-        
-        # Check last 2 digits
-        if len(number) >= 2 and draw.prize_2digits:
-            last_2 = number[-2:]
-            if last_2 == str(draw.prize_2digits).zfill(2):
-                return LotteryCheckResult(
-                    number=number,
-                    date=draw.date,
-                    prize_type="Last 2 Digits",
-                    prize_amount=self.prize_amounts["2digits"],
-                    matched=True
-                )
-        
-        # No match
         return LotteryCheckResult(
             number=number,
-            date=draw.date,
-            matched=False
-        ) 
\ No newline at end of file
+            date=matcher.date,
+            prize_type=TIER_LABELS[tier],
+            prize_amount=self.prize_amounts[tier],
+            matched=True
+        )
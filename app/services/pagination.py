@@ -0,0 +1,25 @@
+from typing import Optional
+from datetime import date
+import base64
+import binascii
+
+# Opaque keyset cursors over lottery_draws.date, newest first.
+# A cursor names the last draw of a page; the next page starts strictly after it.
+
+def encode_cursor(draw_date: date) -> str:
+    """Encode the date of the last draw on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(draw_date.isoformat().encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> date:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return date.fromisoformat(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid pagination cursor: {cursor}")
+
+def next_cursor(items: list, has_more: bool) -> Optional[str]:
+    """Cursor for the page after ``items``, or None on the last page"""
+    if not has_more or not items:
+        return None
+    return encode_cursor(items[-1].date)
@@ -0,0 +1,238 @@
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+from datetime import date
+
+import numpy as np
+
+from ..models.prize_tiers import EXACT_TIER_FIELDS, TIER_LABELS, TIER_ORDER, TIER_RANK
+
+# Key groups of PackedPrizeIndex. A key is stored as int("1" + key), so its
+# leading zeros and length survive, offset by its group's span.
+_EXACT, _PRE_3DIGIT, _SUB_3DIGITS, _LAST_2DIGITS = range(4)
+_GROUP_SPAN = 10 ** 16
+
+# A PackedPrizeIndex entry is the draw position shifted left of the tier rank
+_RANK_BITS = 4
+_RANK_MASK = (1 << _RANK_BITS) - 1
+
+
+def _encode_key(group: int, key: str) -> Optional[int]:
+    if len(key) < 16 and key.isascii() and key.isdigit():
+        return group * _GROUP_SPAN + int("1" + key)
+    return None
+
+
+class PrizeIndex:
+    """Inverted index from winning keys to the draws they win.
+
+    Full numbers map to (draw date, tier) pairs, 3-digit and 2-digit keys map
+    to the draw dates they win in, so checking a number against the whole
+    history is a handful of dictionary lookups instead of a scan over draws.
+    """
+
+    def __init__(self, draws: Iterable, version: Optional[Hashable] = None):
+        self.version = version
+        self.draw_count = 0
+        # Hit tuples are never mutated, so copies can share them
+        self._exact: Dict[str, Tuple[Tuple[date, int], ...]] = {}
+        self._pre_3digit: Dict[str, Tuple[date, ...]] = {}
+        self._sub_3digits: Dict[str, Tuple[date, ...]] = {}
+        self._last_2digits: Dict[str, Tuple[date, ...]] = {}
+
+        for draw in draws:
+            self.add_draw(draw)
+
+    def add_draw(self, draw) -> None:
+        """Index every winning key of a single draw"""
+        self.draw_count += 1
+        draw_date = draw.date
+
+        for tier, field in EXACT_TIER_FIELDS:
+            values = getattr(draw, field)
+            if isinstance(values, str):
+                values = (values,)
+            rank = TIER_RANK[tier]
+            for value in values or ():
+                self._exact[value] = self._exact.get(value, ()) + ((draw_date, rank),)
+
+        for value in draw.prize_pre_3digit or ():
+            self._pre_3digit[value] = self._pre_3digit.get(value, ()) + (draw_date,)
+
+        for value in draw.prize_sub_3digits or ():
+            self._sub_3digits[value] = self._sub_3digits.get(value, ()) + (draw_date,)
+
+        if draw.prize_2digits:
+            key = str(draw.prize_2digits).zfill(2)
+            self._last_2digits[key] = self._last_2digits.get(key, ()) + (draw_date,)
+
+    def copy(self, version: Optional[Hashable] = None) -> "PrizeIndex":
+        """Copy at ``version`` to extend with ``add_draw``, without re-indexing every draw"""
+        index = PrizeIndex((), version=version)
+        index.draw_count = self.draw_count
+        index._exact = dict(self._exact)
+        index._pre_3digit = dict(self._pre_3digit)
+        index._sub_3digits = dict(self._sub_3digits)
+        index._last_2digits = dict(self._last_2digits)
+        return index
+
+    def matches(self, number: str) -> Dict[date, str]:
+        """Return the winning tier of ``number`` for every draw it wins.
+
+        Per draw the tier follows the same precedence as a single-draw check.
+        """
+        hits: Dict[date, int] = {}
+
+        def hit(draw_date: date, rank: int) -> None:
+            if rank < hits.get(draw_date, len(TIER_ORDER)):
+                hits[draw_date] = rank
+
+        for draw_date, rank in self._exact.get(number, ()):
+            hit(draw_date, rank)
+
+        if len(number) >= 3:
+            rank = TIER_RANK["pre_3digit"]
+            for key in {number[:3], number[-3:]}:
+                for draw_date in self._pre_3digit.get(key, ()):
+                    hit(draw_date, rank)
+
+            rank = TIER_RANK["sub_3digits"]
+            for key in {number[i:i + 3] for i in range(len(number) - 2)}:
+                for draw_date in self._sub_3digits.get(key, ()):
+                    hit(draw_date, rank)
+
+        if len(number) >= 2:
+            rank = TIER_RANK["2digits"]
+            for draw_date in self._last_2digits.get(number[-2:], ()):
+                hit(draw_date, rank)
+
+        return {draw_date: TIER_ORDER[rank] for draw_date, rank in hits.items()}
+
+    def all_matches(self, number: str) -> List[Tuple[date, str]]:
+        """Every (draw date, tier) ``number`` wins, newest draw first.
+
+        Unlike ``matches`` a draw is listed once per tier it is won in, e.g.
+        the 1st prize and the last 2 digits of the same draw.
+        """
+        hits = set(self._exact.get(number, ()))
+
+        if len(number) >= 3:
+            rank = TIER_RANK["pre_3digit"]
+            for key in {number[:3], number[-3:]}:
+                hits.update((draw_date, rank) for draw_date in self._pre_3digit.get(key, ()))
+
+            rank = TIER_RANK["sub_3digits"]
+            for key in {number[i:i + 3] for i in range(len(number) - 2)}:
+                hits.update((draw_date, rank) for draw_date in self._sub_3digits.get(key, ()))
+
+        if len(number) >= 2:
+            rank = TIER_RANK["2digits"]
+            hits.update((draw_date, rank) for draw_date in self._last_2digits.get(number[-2:], ()))
+
+        return [
+            (draw_date, TIER_ORDER[rank])
+            for draw_date, rank in sorted(hits, key=lambda hit: (-hit[0].toordinal(), hit[1]))
+        ]
+
+
+class PackedPrizeIndex:
+    """PrizeIndex laid out as flat NumPy arrays, so processes can share one copy.
+
+    Every (key, draw, tier) entry is one row of two parallel arrays: the
+    encoded key (sorted) and the draw position (newest first) packed with the
+    tier rank. The arrays can be read-only views of a memory-mapped file. Keys that
+    cannot be encoded (not all digits, or too long) are kept in a small
+    ``unpacked`` mapping instead. Lookups give the same results as PrizeIndex.
+    """
+
+    def __init__(
+        self,
+        dates: Sequence[date],
+        arrays: Mapping[str, np.ndarray],
+        unpacked: Optional[Mapping[str, List[int]]] = None,
+        version: Optional[Hashable] = None
+    ):
+        self.version = version
+        self.draw_count = len(dates)
+        self._dates = list(dates)
+        self._keys = arrays["keys"]
+        self._entries = arrays["entries"]
+        self._unpacked = unpacked or {}
+
+    @staticmethod
+    def pack(draws: Sequence) -> Tuple[Dict[str, np.ndarray], Dict[str, List[int]]]:
+        """Arrays and unpacked entries indexing ``draws``, in the form ``__init__`` takes"""
+        entries = set()
+        unpacked: Dict[str, set] = {}
+
+        def add(group: int, key: str, position: int, rank: int) -> None:
+            code = _encode_key(group, key)
+            if code is None:
+                unpacked.setdefault(f"{group}:{key}", set()).add(position << _RANK_BITS | rank)
+            else:
+                entries.add((code, position << _RANK_BITS | rank))
+
+        for position, draw in enumerate(draws):
+            for tier, field in EXACT_TIER_FIELDS:
+                values = getattr(draw, field)
+                if isinstance(values, str):
+                    values = (values,)
+                for value in values or ():
+                    add(_EXACT, value, position, TIER_RANK[tier])
+
+            for value in draw.prize_pre_3digit or ():
+                add(_PRE_3DIGIT, value, position, TIER_RANK["pre_3digit"])
+
+            for value in draw.prize_sub_3digits or ():
+                add(_SUB_3DIGITS, value, position, TIER_RANK["sub_3digits"])
+
+            if draw.prize_2digits:
+                add(_LAST_2DIGITS, str(draw.prize_2digits).zfill(2), position, TIER_RANK["2digits"])
+
+        rows = sorted(entries)
+        arrays = {
+            "keys": np.array([code for code, _ in rows], dtype="<i8"),
+            "entries": np.array([entry for _, entry in rows], dtype="<i4"),
+        }
+        return arrays, {key: sorted(hits) for key, hits in unpacked.items()}
+
+    def _hits(self, number: str) -> List[int]:
+        """Every entry ``number`` wins; a key looked up twice repeats its entries"""
+        keys = [(_EXACT, number)]
+        if len(number) >= 3:
+            keys += [(_PRE_3DIGIT, number[:3]), (_PRE_3DIGIT, number[-3:])]
+            keys += [(_SUB_3DIGITS, number[i:i + 3]) for i in range(len(number) - 2)]
+        if len(number) >= 2:
+            keys.append((_LAST_2DIGITS, number[-2:]))
+
+        hits: List[int] = []
+        codes = []
+        for group, key in keys:
+            code = _encode_key(group, key)
+            if code is None:
+                hits.extend(self._unpacked.get(f"{group}:{key}", ()))
+            else:
+                codes.append(code)
+
+        if codes:
+            # Keys are integers, so a key's run ends where the next integer's begins
+            bounds = np.searchsorted(self._keys, codes + [code + 1 for code in codes]).tolist()
+            for start, stop in zip(bounds[:len(codes)], bounds[len(codes):]):
+                if start < stop:
+                    hits.extend(self._entries[start:stop].tolist())
+        return hits
+
+    def matches(self, number: str) -> Dict[date, str]:
+        """Return the winning tier of ``number`` for every draw it wins, as PrizeIndex.matches"""
+        best: Dict[int, int] = {}
+        for entry in self._hits(number):
+            position, rank = entry >> _RANK_BITS, entry & _RANK_MASK
+            if rank < best.get(position, len(TIER_ORDER)):
+                best[position] = rank
+        return {self._dates[position]: TIER_ORDER[rank] for position, rank in best.items()}
+
+    def all_matches(self, number: str) -> List[Tuple[date, str]]:
+        """Every (draw date, tier) ``number`` wins, newest draw first, as PrizeIndex.all_matches"""
+        hits = {(self._dates[entry >> _RANK_BITS], entry & _RANK_MASK) for entry in self._hits(number)}
+        return [
+            (draw_date, TIER_ORDER[rank])
+            for draw_date, rank in sorted(hits, key=lambda hit: (-hit[0].toordinal(), hit[1]))
+        ]
@@ -0,0 +1,210 @@
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+import struct
+import tempfile
+from datetime import date
+
+import numpy as np
+
+from ..models.draw_record import DrawRecord
+
+# File layout: magic, header length (uint32 LE), JSON header, then 8-byte
+# aligned little-endian arrays described by the header. Prize tiers are
+# fixed-width integer matrices (one row per draw, -1 padding), so the file
+# can be memory-mapped and read without parsing.
+MAGIC = b"LOTSNAP1"
+_ALIGN = 8
+
+# List tiers as (field, key digits, dtype)
+_LIST_TIERS = (
+    ("nearby_1st", 6, "<i4"),
+    ("prize_2nd", 6, "<i4"),
+    ("prize_3rd", 6, "<i4"),
+    ("prize_4th", 6, "<i4"),
+    ("prize_5th", 6, "<i4"),
+    ("prize_pre_3digit", 3, "<i2"),
+    ("prize_sub_3digits", 3, "<i2"),
+)
+
+
+def _encodable(value: Any, digits: int) -> bool:
+    return isinstance(value, str) and len(value) == digits and value.isascii() and value.isdigit()
+
+
+def write_snapshot_file(
+    path: str,
+    draws: Sequence[DrawRecord],
+    version: tuple,
+    extra_arrays: Optional[Dict[str, np.ndarray]] = None,
+    extra_header: Optional[Dict[str, Any]] = None
+) -> None:
+    """Write draws to a snapshot file, replacing ``path`` atomically.
+
+    ``extra_arrays`` and ``extra_header`` store more data alongside the draws
+    (e.g. prebuilt indexes); readers that do not know them skip them.
+    """
+    count = len(draws)
+    arrays: Dict[str, np.ndarray] = {
+        "date": np.array([draw.date.toordinal() for draw in draws], dtype="<i4"),
+        "id": np.array([draw.id for draw in draws], dtype="<i8"),
+        "prize_1st": np.full(count, -1, dtype="<i4"),
+        "prize_2digits": np.array(
+            [-1 if draw.prize_2digits is None else draw.prize_2digits for draw in draws], dtype="<i4"
+        ),
+    }
+    # Values the integer columns cannot hold exactly, kept verbatim per draw
+    overrides: Dict[str, Dict[str, Any]] = {}
+
+    for row, draw in enumerate(draws):
+        if _encodable(draw.prize_1st, 6):
+            arrays["prize_1st"][row] = int(draw.prize_1st)
+        else:
+            overrides.setdefault(str(row), {})["prize_1st"] = draw.prize_1st
+
+    for field, digits, dtype in _LIST_TIERS:
+        width = max((len(getattr(draw, field)) for draw in draws), default=0)
+        matrix = np.full((count, width), -1, dtype=dtype)
+        for row, draw in enumerate(draws):
+            values = getattr(draw, field)
+            if all(_encodable(value, digits) for value in values):
+                matrix[row, :len(values)] = [int(value) for value in values]
+            else:
+                overrides.setdefault(str(row), {})[field] = list(values)
+        arrays[field] = matrix
+    arrays.update(extra_arrays or {})
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset += -offset % _ALIGN
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = json.dumps({
+        "version": list(version) if version is not None else None,
+        "count": count,
+        "arrays": layout,
+        "timestamps": [[draw.created_at, draw.updated_at] for draw in draws],
+        "overrides": overrides,
+        **(extra_header or {}),
+    }).encode()
+    data_start = len(MAGIC) + 4 + len(header)
+    data_start += -data_start % _ALIGN
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(MAGIC)
+            out.write(struct.pack("<I", len(header)))
+            out.write(header)
+            for name, array in arrays.items():
+                out.seek(data_start + layout[name]["offset"])
+                out.write(array.tobytes())
+        # mkstemp creates the file owner-only; workers may run as other users
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def map_snapshot_file(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Memory-map a snapshot file and return its header and array views"""
+    with open(path, "rb") as snapshot_file:
+        return map_snapshot(snapshot_file)
+
+
+def map_snapshot(snapshot_file: BinaryIO) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Memory-map an open snapshot file read-only and return its header and array views.
+
+    The views share the page cache with every other process mapping the same
+    file, and stay valid after the file is replaced or closed.
+    """
+    mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{snapshot_file.name} is not a lottery draw snapshot")
+    (header_length,) = struct.unpack_from("<I", mapped, len(MAGIC))
+    header_start = len(MAGIC) + 4
+    header = json.loads(mapped[header_start:header_start + header_length])
+    data_start = header_start + header_length
+    data_start += -data_start % _ALIGN
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape))
+        if not count:
+            # Empty arrays at the end may point past the end of the file
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(shape)
+    return header, arrays
+
+
+def read_snapshot_file(path: str) -> Tuple[List[DrawRecord], Optional[tuple]]:
+    """Load every draw and the table version from a snapshot file"""
+    return decode_draws(*map_snapshot_file(path))
+
+
+def decode_draws(header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Tuple[List[DrawRecord], Optional[tuple]]:
+    """Every draw and the table version of a mapped snapshot"""
+    draws = MappedDraws(header, arrays)
+    return list(draws), draws.version
+
+
+class MappedDraws(Sequence[DrawRecord]):
+    """Draws of a mapped snapshot, newest first, decoded one at a time on access.
+
+    Only the dates are held in this process; every record is built from the
+    shared arrays when it is read and dropped with the response using it.
+    """
+
+    def __init__(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self._header = header
+        self._arrays = arrays
+        self._overrides = header["overrides"]
+        self.dates: List[date] = [date.fromordinal(ordinal) for ordinal in arrays["date"].tolist()]
+        self.version = tuple(header["version"]) if header["version"] is not None else None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._decode(row) for row in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("draw position out of range")
+        return self._decode(position)
+
+    def __iter__(self) -> Iterator[DrawRecord]:
+        for row in range(len(self)):
+            yield self._decode(row)
+
+    def _decode(self, row: int) -> DrawRecord:
+        arrays = self._arrays
+        row_overrides = self._overrides.get(str(row), {})
+        prize_2digits = int(arrays["prize_2digits"][row])
+        fields: Dict[str, Any] = {
+            "id": int(arrays["id"][row]),
+            "date": self.dates[row],
+            "prize_2digits": None if prize_2digits < 0 else prize_2digits,
+            "created_at": self._header["timestamps"][row][0],
+            "updated_at": self._header["timestamps"][row][1],
+        }
+        fields["prize_1st"] = row_overrides.get("prize_1st", f"{int(arrays['prize_1st'][row]):06d}")
+        for field, digits, _ in _LIST_TIERS:
+            if field in row_overrides:
+                fields[field] = tuple(row_overrides[field])
+            else:
+                fields[field] = tuple(f"{value:0{digits}d}" for value in arrays[field][row].tolist() if value >= 0)
+        return DrawRecord(**fields)
@@ -0,0 +1,280 @@
+from typing import Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+from datetime import date
+
+import numpy as np
+
+from ..models.prize_tiers import EXACT_TIER_FIELDS, TIER_FIELDS, TIER_ORDER, TIER_RANK
+
+# Short-key tiers as (tier, draw field, key width, ticket digit slices)
+_SHORT_TIERS = tuple(
+    (tier, dict(TIER_FIELDS)[tier], width, slices)
+    for tier, width, slices in (
+        ("pre_3digit", 3, ((0, 3), (3, 6))),
+        ("sub_3digits", 3, ((0, 3), (1, 4), (2, 5), (3, 6))),
+        ("2digits", 2, ((4, 6),)),
+    )
+)
+
+# Bit layout of a hit score: prize amount, then draw date, then inverted tier rank
+_RANK_BITS = 4
+_ORDINAL_BITS = 24
+
+
+class VectorMatcher:
+    """NumPy matching engine for checking large batches of 6-digit tickets.
+
+    Tickets are encoded as integer digit arrays and looked up per tier with
+    array operations: full numbers by ``np.searchsorted`` over the sorted
+    prize numbers of all six full-number tiers, 3-digit and 2-digit keys by
+    direct offsets into their small key spaces. Per draw the lowest tier rank
+    wins, across draws the highest prize and then the most recent draw,
+    matching ``PrizeIndex`` and ``DrawMatcher``.
+
+    The lookup arrays come from ``build_arrays``; passing them in as
+    ``arrays`` (e.g. views of a shared memory-mapped store) skips building,
+    and with ``dates`` as well the draws themselves are never read.
+    """
+
+    def __init__(
+        self,
+        draws: Sequence,
+        prize_amounts: Mapping[str, int],
+        arrays: Optional[Mapping[str, np.ndarray]] = None,
+        dates: Optional[Sequence[date]] = None
+    ):
+        self.dates: List[date] = list(dates) if dates is not None else [draw.date for draw in draws]
+        self.draw_positions: Dict[date, int] = {d: i for i, d in enumerate(self.dates)}
+        self.date_ordinals = np.array([d.toordinal() for d in self.dates], dtype=np.int64)
+        self._ordinal_order = np.argsort(self.date_ordinals, kind="stable")
+        self.rank_amounts = np.array([prize_amounts[tier] for tier in TIER_ORDER], dtype=np.int64)
+        self._scored = self._amounts_follow_ranks()
+
+        if arrays is None:
+            arrays = self.build_arrays(draws)
+        self._exact = (arrays["exact_keys"], arrays["exact_positions"], arrays["exact_ranks"])
+        self._short = [
+            (TIER_RANK[tier], slices, arrays[f"{tier}_offsets"], arrays[f"{tier}_positions"])
+            for tier, _, _, slices in _SHORT_TIERS
+        ]
+
+    @classmethod
+    def build_arrays(cls, draws: Sequence) -> Dict[str, np.ndarray]:
+        """Lookup arrays of ``draws``, keyed by name"""
+        arrays = dict(zip(("exact_keys", "exact_positions", "exact_ranks"), cls._build_exact(draws)))
+        for tier, field, width, _ in _SHORT_TIERS:
+            arrays[f"{tier}_offsets"], arrays[f"{tier}_positions"] = cls._build_short(draws, field, width)
+        return arrays
+
+    def _amounts_follow_ranks(self) -> bool:
+        """Whether a hit's prize alone decides between tiers of one draw.
+
+        Full-number tiers of a draw are resolved when they are built, so only
+        a short-key tier paying more than a better-ranked tier breaks this.
+        """
+        first_short = len(EXACT_TIER_FIELDS)
+        amounts = self.rank_amounts.tolist()
+        return all(
+            amounts[better] >= amounts[worse]
+            for worse in range(first_short, len(amounts))
+            for better in range(worse)
+        )
+
+    @staticmethod
+    def _build_exact(draws: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sorted full-number keys with the draw and tier each one wins"""
+        best: Dict[Tuple[int, int], int] = {}
+
+        for position, draw in enumerate(draws):
+            for tier, field in EXACT_TIER_FIELDS:
+                values = getattr(draw, field)
+                if isinstance(values, str):
+                    values = (values,)
+                rank = TIER_RANK[tier]
+                for value in values or ():
+                    # Only 6-digit strings can equal a 6-digit ticket
+                    if len(value) == 6 and value.isascii() and value.isdigit():
+                        # A number listed in two tiers of one draw wins the first
+                        key = (int(value), position)
+                        best[key] = min(rank, best.get(key, rank))
+
+        items = sorted(best.items())
+        keys = np.array([key for (key, _), _ in items], dtype=np.int64)
+        positions = np.array([position for (_, position), _ in items], dtype=np.int64)
+        ranks = np.array([rank for _, rank in items], dtype=np.int64)
+        return keys, positions, ranks
+
+    @staticmethod
+    def _build_short(draws: Sequence, field: str, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Offsets into draw positions grouped by key, for every key of ``width`` digits"""
+        keys: List[int] = []
+        positions: List[int] = []
+
+        for position, draw in enumerate(draws):
+            values = getattr(draw, field)
+            if field == "prize_2digits":
+                # A 0 prize means "no 2-digit prize", as in the per-draw check
+                values = (str(values).zfill(2),) if values else ()
+            for value in set(values or ()):
+                if len(value) == width and value.isascii() and value.isdigit():
+                    keys.append(int(value))
+                    positions.append(position)
+
+        keys_array = np.array(keys, dtype=np.int64)
+        order = np.argsort(keys_array, kind="stable")
+        counts = np.bincount(keys_array, minlength=10 ** width)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return offsets, np.array(positions, dtype=np.int64)[order]
+
+    @staticmethod
+    def encode_tickets(numbers: Sequence[str]) -> np.ndarray:
+        """Encode 6-digit tickets as an (n, 6) array of digit values"""
+        if not numbers:
+            return np.zeros((0, 6), dtype=np.int64)
+        raw = np.frombuffer("".join(numbers).encode("ascii"), dtype=np.uint8)
+        return raw.reshape(len(numbers), 6).astype(np.int64) - ord("0")
+
+    @staticmethod
+    def _keys(digits: np.ndarray, start: int, stop: int) -> np.ndarray:
+        keys = digits[:, start]
+        for column in range(start + 1, stop):
+            keys = keys * 10 + digits[:, column]
+        return keys
+
+    def best_matches(
+        self,
+        numbers: Sequence[str],
+        dates: Optional[Sequence[Optional[Collection[date]]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Best win of every 6-digit ticket.
+
+        ``dates`` optionally limits each ticket to some draw dates (None for
+        every draw). Returns per-ticket draw positions and tier ranks, both -1
+        for tickets that win nothing.
+        """
+        digits = self.encode_tickets(numbers)
+        ticket_ids, draw_ids, ranks = self._hits(digits)
+
+        if dates is not None:
+            ticket_ids, draw_ids, ranks = self._restrict(ticket_ids, draw_ids, ranks, dates)
+
+        if self._scored:
+            return self._best_by_score(len(numbers), ticket_ids, draw_ids, ranks)
+        return self._best_by_sorting(len(numbers), ticket_ids, draw_ids, ranks)
+
+    def _hits(self, digits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every (ticket, draw, tier rank) hit of an encoded batch"""
+        ticket_parts, draw_parts, rank_parts = [], [], []
+
+        keys, positions, ranks = self._exact
+        queries = self._keys(digits, 0, 6)
+        left = np.searchsorted(keys, queries, side="left")
+        right = np.searchsorted(keys, queries, side="right")
+        tickets, entries = self._expand(left, right)
+        ticket_parts.append(tickets)
+        draw_parts.append(positions[entries])
+        rank_parts.append(ranks[entries])
+
+        for rank, slices, offsets, positions in self._short:
+            for start, stop in slices:
+                queries = self._keys(digits, start, stop)
+                tickets, entries = self._expand(offsets[queries], offsets[queries + 1])
+                ticket_parts.append(tickets)
+                draw_parts.append(positions[entries])
+                rank_parts.append(np.full(len(entries), rank, dtype=np.int64))
+
+        return np.concatenate(ticket_parts), np.concatenate(draw_parts), np.concatenate(rank_parts)
+
+    @staticmethod
+    def _expand(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Flatten each ticket's [left, right) run into (ticket, entry) pairs"""
+        counts = right - left
+        total = int(counts.sum())
+        tickets = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+        run_starts = np.cumsum(counts) - counts
+        entries = np.arange(total, dtype=np.int64) + np.repeat(left - run_starts, counts)
+        return tickets, entries
+
+    def _restrict(
+        self,
+        ticket_ids: np.ndarray,
+        draw_ids: np.ndarray,
+        ranks: np.ndarray,
+        dates: Sequence[Optional[Collection[date]]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Drop hits outside the draw dates each ticket asked for"""
+        restricted = np.zeros(len(dates), dtype=bool)
+        allowed: List[int] = []
+        draw_count = len(self.dates)
+
+        for ticket, ticket_dates in enumerate(dates):
+            if ticket_dates is None:
+                continue
+            restricted[ticket] = True
+            for d in ticket_dates:
+                position = self.draw_positions.get(d)
+                if position is not None:
+                    allowed.append(ticket * draw_count + position)
+
+        keep = ~restricted[ticket_ids]
+        if allowed:
+            keep |= np.isin(ticket_ids * draw_count + draw_ids, np.array(allowed, dtype=np.int64))
+        return ticket_ids[keep], draw_ids[keep], ranks[keep]
+
+    def _best_by_score(
+        self,
+        count: int,
+        ticket_ids: np.ndarray,
+        draw_ids: np.ndarray,
+        ranks: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Best hit per ticket as the maximum of one packed integer per hit.
+
+        The score orders hits by prize, then draw date, then better tier, which
+        only equals the per-draw precedence when ``_amounts_follow_ranks``.
+        """
+        scores = (self.rank_amounts[ranks] << _ORDINAL_BITS | self.date_ordinals[draw_ids]) << _RANK_BITS
+        scores |= (1 << _RANK_BITS) - 1 - ranks
+        best = np.full(count, -1, dtype=np.int64)
+        np.maximum.at(best, ticket_ids, scores)
+
+        won = best >= 0
+        best_rank = np.full(count, -1, dtype=np.int64)
+        best_draw = np.full(count, -1, dtype=np.int64)
+        best_rank[won] = (1 << _RANK_BITS) - 1 - (best[won] & ((1 << _RANK_BITS) - 1))
+        ordinals = (best[won] >> _RANK_BITS) & ((1 << _ORDINAL_BITS) - 1)
+        sorted_ordinals = self.date_ordinals[self._ordinal_order]
+        best_draw[won] = self._ordinal_order[np.searchsorted(sorted_ordinals, ordinals)]
+        return best_draw, best_rank
+
+    def _best_by_sorting(
+        self,
+        count: int,
+        ticket_ids: np.ndarray,
+        draw_ids: np.ndarray,
+        ranks: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Best hit per ticket, resolving the tier of every (ticket, draw) pair first"""
+        best_draw = np.full(count, -1, dtype=np.int64)
+        best_rank = np.full(count, -1, dtype=np.int64)
+        if not len(ticket_ids):
+            return best_draw, best_rank
+
+        # Per (ticket, draw) keep the lowest tier rank
+        pair_keys = ticket_ids * len(self.dates) + draw_ids
+        order = np.lexsort((ranks, pair_keys))
+        pair_keys, ranks = pair_keys[order], ranks[order]
+        first = np.ones(len(pair_keys), dtype=bool)
+        first[1:] = pair_keys[1:] != pair_keys[:-1]
+        pair_keys, ranks = pair_keys[first], ranks[first]
+        ticket_ids, draw_ids = np.divmod(pair_keys, len(self.dates))
+
+        # Per ticket keep the highest prize, then the most recent draw
+        amounts = self.rank_amounts[ranks]
+        order = np.lexsort((self.date_ordinals[draw_ids], amounts, ticket_ids))
+        ticket_ids, draw_ids, ranks = ticket_ids[order], draw_ids[order], ranks[order]
+        last = np.ones(len(ticket_ids), dtype=bool)
+        last[:-1] = ticket_ids[:-1] != ticket_ids[1:]
+
+        best_draw[ticket_ids[last]] = draw_ids[last]
+        best_rank[ticket_ids[last]] = ranks[last]
+        return best_draw, best_rank
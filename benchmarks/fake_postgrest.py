@@ -0,0 +1,217 @@
+"""
+In-memory stand-in for the Supabase PostgREST endpoint, seeded from a dataset CSV.
+
+Implements the part of the PostgREST API the app uses on lottery_draws:
+column selection, ordering, limit/offset, eq/neq/gt/gte/lt/lte/in filters,
+Prefer: count=... with Content-Range, and HEAD requests. For the uploader it
+also takes inserts, upserts (on_conflict with merge or ignore) and filtered
+deletes, from async or sync clients. Foreign keys are not enforced.
+"""
+
+import ast
+import asyncio
+import csv
+import json
+import operator
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+
+_FILTERS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+_LIST_COLUMNS = (
+    "prize_pre_3digit",
+    "prize_sub_3digits",
+    "nearby_1st",
+    "prize_2nd",
+    "prize_3rd",
+    "prize_4th",
+    "prize_5th",
+)
+
+def load_draws(csv_path: str) -> List[Dict[str, Any]]:
+    """lottery_draws rows for every draw in a dataset CSV, shaped as PostgREST returns them"""
+    rows = []
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        for row_id, row in enumerate(csv.DictReader(csv_file), 1):
+            draw = {
+                "id": row_id,
+                "date": row["date"],
+                "prize_1st": row["prize_1st"].strip(),
+                "prize_2digits": int(row["prize_2digits"]) if row["prize_2digits"].strip().isdigit() else None,
+                "created_at": "2024-12-17T00:00:00",
+                "updated_at": "2024-12-17T00:00:00",
+            }
+            for column in _LIST_COLUMNS:
+                draw[column] = [str(value).strip() for value in ast.literal_eval(row[column] or "[]")]
+            rows.append(draw)
+    return rows
+
+# Unique key of each table, used to resolve inserts and upserts
+_KEYS = {
+    "lottery_draws": ("date",),
+    "lottery_number_wins": ("number", "date", "tier"),
+}
+
+class FakePostgrest(httpx.AsyncBaseTransport, httpx.BaseTransport):
+    """httpx transport answering PostgREST queries against in-memory tables.
+
+    ``latency`` (seconds) is added to every request to stand in for the
+    network round-trip to Supabase. ``requests`` counts requests served.
+    Requests whose ``(method, table)`` is in ``failing`` get a 500 response.
+    """
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]], latency: float = 0.0):
+        self.tables = tables
+        self.latency = latency
+        self.requests = 0
+        self.failing: Set[Tuple[str, str]] = set()
+        # Sync clients may call from several threads at once
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        table = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if table not in self.tables:
+            return self._json(404, {"message": f'relation "public.{table}" does not exist'})
+        if (request.method, table) in self.failing:
+            return self._json(500, {"message": f"{request.method} on {table} failed", "code": "XX000"})
+        if request.method == "POST":
+            return self._write(request, table)
+        if request.method == "DELETE":
+            return self._delete(request, table)
+        if request.method not in ("GET", "HEAD"):
+            return self._json(405, {"message": f"{request.method} is not supported by the stand-in"})
+
+        rows = self.tables[table]
+        columns = None
+        order = None
+        limit: Optional[int] = None
+        offset = 0
+        for key, value in request.url.params.multi_items():
+            if key == "select":
+                columns = None if value == "*" else value.split(",")
+            elif key == "order":
+                order = value
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            else:
+                rows = self._filter(rows, key, value)
+
+        if order:
+            rows = list(rows)
+            for part in reversed(order.split(",")):
+                column, *modifiers = part.split(".")
+                descending = "desc" in modifiers
+                # Postgres default: NULLs sort as if larger than any value
+                nulls_last = "nullslast" in modifiers or (not descending and "nullsfirst" not in modifiers)
+                rows.sort(
+                    key=lambda row: ((row[column] is None) == (nulls_last != descending), row[column]),
+                    reverse=descending,
+                )
+
+        total = len(rows)
+        page = rows[offset:offset + limit if limit is not None else None]
+        if columns:
+            page = [{column: row.get(column) for column in columns} for row in page]
+
+        headers = {}
+        if "count=" in request.headers.get("prefer", ""):
+            headers["content-range"] = f"{offset}-{offset + len(page) - 1}/{total}" if page else f"*/{total}"
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+        return self._json(200, page, headers)
+
+    def _write(self, request: httpx.Request, table: str) -> httpx.Response:
+        """Insert the request's rows, or upsert them on ``on_conflict``"""
+        body = json.loads(request.content)
+        prefer = request.headers.get("prefer", "")
+        on_conflict = request.url.params.get("on_conflict")
+        key_columns = tuple(on_conflict.split(",")) if on_conflict else _KEYS.get(table, ())
+        rows = self.tables[table]
+        positions = {tuple(str(row.get(column)) for column in key_columns): i for i, row in enumerate(rows)}
+
+        written = []
+        for row in body if isinstance(body, list) else [body]:
+            key = tuple(str(row.get(column)) for column in key_columns)
+            if key_columns and key in positions:
+                if "resolution=ignore-duplicates" in prefer:
+                    continue
+                if "resolution=merge-duplicates" not in prefer:
+                    return self._json(409, {"message": f"duplicate key value violates unique constraint on {table}", "code": "23505"})
+                rows[positions[key]] = dict(rows[positions[key]], **row)
+                written.append(rows[positions[key]])
+            else:
+                positions[key] = len(rows)
+                rows.append(dict(row))
+                written.append(rows[-1])
+
+        if "return=minimal" in prefer:
+            return httpx.Response(201)
+        return self._json(201, written)
+
+    def _delete(self, request: httpx.Request, table: str) -> httpx.Response:
+        """Delete the rows matching every filter of the request"""
+        doomed = self.tables[table]
+        for key, value in request.url.params.multi_items():
+            doomed = self._filter(doomed, key, value)
+        doomed_ids = {id(row) for row in doomed}
+        self.tables[table] = [row for row in self.tables[table] if id(row) not in doomed_ids]
+
+        if "return=minimal" in request.headers.get("prefer", ""):
+            return httpx.Response(204)
+        return self._json(200, doomed)
+
+    @staticmethod
+    def _filter(rows: List[Dict[str, Any]], column: str, expression: str) -> List[Dict[str, Any]]:
+        op, _, operand = expression.partition(".")
+        if op == "in":
+            values = set(operand.strip("()").split(","))
+            return [row for row in rows if str(row.get(column)) in values]
+        compare = _FILTERS[op]
+        return [row for row in rows if row.get(column) is not None and compare(str(row[column]), operand)]
+
+    @staticmethod
+    def _json(status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        headers = dict(headers or {}, **{"content-type": "application/json"})
+        return httpx.Response(status, headers=headers, content=json.dumps(body).encode())
+
+def create_fake_client(transport: FakePostgrest) -> AsyncPostgrestClient:
+    """An AsyncPostgrestClient whose requests are answered by ``transport``"""
+    client = AsyncPostgrestClient("http://postgrest.local/rest/v1")
+    client.session = httpx.AsyncClient(
+        base_url=str(client.session.base_url),
+        headers=client.session.headers,
+        transport=transport,
+    )
+    return client
+
+def create_fake_sync_client(transport: FakePostgrest) -> SyncPostgrestClient:
+    """A SyncPostgrestClient whose requests are answered by ``transport``"""
+    client = SyncPostgrestClient("http://postgrest.local/rest/v1")
+    client.session = httpx.Client(
+        base_url=str(client.session.base_url),
+        headers=client.session.headers,
+        transport=transport,
+    )
+    return client
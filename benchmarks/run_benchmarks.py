@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load/latency benchmarks for the API, run in-process against a PostgREST stand-in
+Usage: python -m benchmarks.run_benchmarks [options]   (from the repository root)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATASET = os.path.join(ROOT, "datasets", "lottery_dataset_until_2024.csv")
+DEFAULT_RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+API = "/api/th/v1/lottery"
+
+# (method, path, JSON body) of one request
+Request = Tuple[str, str, Optional[dict]]
+
+def _ticket(rng: random.Random) -> str:
+    return f"{rng.randrange(10 ** 6):06d}"
+
+def build_scenarios(dates: List[str]) -> Dict[str, Callable[[random.Random], Request]]:
+    """Request generators for every benchmarked endpoint, keyed by scenario name"""
+    years = sorted({d[:4] for d in dates})
+
+    def search(rng: random.Random) -> Request:
+        start = rng.randrange(len(years))
+        end = min(len(years) - 1, start + rng.randrange(3))
+        return "GET", f"{API}/search?start_date={years[start]}-01-01&end_date={years[end]}-12-31&size=20", None
+
+    return {
+        "check": lambda rng: ("POST", f"{API}/check", {"numbers": [_ticket(rng) for _ in range(5)]}),
+        "check_date": lambda rng: (
+            "POST", f"{API}/check", {"numbers": [_ticket(rng) for _ in range(5)], "date": rng.choice(dates)}
+        ),
+        "check_bulk": lambda rng: ("POST", f"{API}/check/bulk", {"tickets": [_ticket(rng) for _ in range(1000)]}),
+        "latest": lambda rng: ("GET", f"{API}/draws/latest", None),
+        "draw_by_date": lambda rng: ("GET", f"{API}/draws/{rng.choice(dates)}", None),
+        "draws_page": lambda rng: ("GET", f"{API}/draws?page={rng.randint(1, 9)}&size=50", None),
+        "search": search,
+        "win_history": lambda rng: ("GET", f"{API}/numbers/{_ticket(rng)}/wins", None),
+    }
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def run_level(
+    client: httpx.AsyncClient,
+    make_request: Callable[[random.Random], Request],
+    concurrency: int,
+    total: int,
+    seed: int
+) -> Dict[str, Any]:
+    """Send ``total`` requests from ``concurrency`` concurrent workers and summarize latencies"""
+    rng = random.Random(seed)
+    requests = [make_request(rng) for _ in range(total)]
+    latencies: List[float] = []
+    errors = 0
+    position = 0
+
+    async def worker():
+        nonlocal position, errors
+        while position < len(requests):
+            method, url, body = requests[position]
+            position += 1
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+def configure_environment(args: argparse.Namespace):
+    """Settings the app reads at import time"""
+    os.environ["DRAW_STORAGE_BACKEND"] = "supabase"
+    os.environ["DRAW_CACHE_ENABLED"] = "true" if args.draw_cache else "false"
+    os.environ["RESPONSE_CACHE_MAX_BYTES"] = str(args.response_cache_bytes)
+    # Always start from the stand-in, never from a local snapshot file
+    os.environ["DRAW_SNAPSHOT_PATH"] = ""
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    configure_environment(args)
+    sys.path.insert(0, ROOT)
+    from app.main import app
+    from app.container import ServiceContainer
+    from app.repositories import SupabaseDrawRepository
+    from app.models.number_wins import number_win_rows
+    from benchmarks.fake_postgrest import FakePostgrest, create_fake_client, load_draws
+
+    draws = load_draws(args.dataset)
+    tables = {"lottery_draws": draws, "lottery_number_wins": number_win_rows(draws)}
+    transport = FakePostgrest(tables, latency=args.db_latency_ms / 1000)
+    db = create_fake_client(transport)
+    container = ServiceContainer(SupabaseDrawRepository(db))
+    await container.warm_up()
+    app.state.container = container
+
+    scenarios = build_scenarios([draw["date"] for draw in draws])
+    selected = args.scenarios or list(scenarios)
+    results = []
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            for name in selected:
+                for concurrency in args.concurrency:
+                    # Warm caches and code paths before measuring
+                    await run_level(client, scenarios[name], concurrency, args.warmup, args.seed + 1)
+                    before = transport.requests
+                    level = await run_level(client, scenarios[name], concurrency, args.requests, args.seed)
+                    level["db_requests"] = transport.requests - before
+                    results.append({"scenario": name, **level})
+                    print(
+                        f"{name:<14} c={concurrency:<4} {level['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {level['p50_ms']:>8.2f} ms  p95 {level['p95_ms']:>8.2f} ms  "
+                        f"p99 {level['p99_ms']:>8.2f} ms  errors {level['errors']}  db {level['db_requests']}"
+                    )
+    finally:
+        app.state.container = None
+        await db.aclose()
+
+    return {"meta": metadata(args, len(draws)), "results": results}
+
+def metadata(args: argparse.Namespace, draw_count: int) -> Dict[str, Any]:
+    def git(*command: str) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *command], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dataset": os.path.relpath(args.dataset, ROOT),
+        "draws": draw_count,
+        "settings": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "db_latency_ms": args.db_latency_ms,
+            "draw_cache": args.draw_cache,
+            "response_cache_bytes": args.response_cache_bytes,
+        },
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print throughput and latency changes against a baseline result file"""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nCompared with {(baseline['meta'].get('commit') or 'unknown')[:10]}:")
+    for result in current["results"]:
+        old = previous.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        changes = "  ".join(
+            f"{metric} {(result[metric] - old[metric]) / old[metric] * 100:+6.1f}%"
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            if old[metric]
+        )
+        print(f"{result['scenario']:<14} c={result['concurrency']:<4} {changes}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="CSV the stand-in database is seeded from")
+    parser.add_argument("--scenarios", nargs="+", help="Scenarios to run (default: all)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 64], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests before each level")
+    parser.add_argument("--seed", type=int, default=2024, help="Seed for generated tickets, dates and pages")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated database round-trip time")
+    parser.add_argument("--no-draw-cache", dest="draw_cache", action="store_false", help="Disable the in-process draw cache")
+    parser.add_argument("--response-cache-bytes", type=int, default=8 * 1024 * 1024, help="Serialized response cache size (0 disables)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run(args))
+
+    output = args.output
+    if not output:
+        commit = (report["meta"]["commit"] or "nogit")[:10]
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"{stamp}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2)
+    print(f"\n📄 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(json.load(baseline_file), report)
+
+if __name__ == "__main__":
+    main()
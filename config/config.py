@@ -71,4 +71,74 @@ def get_supabase_config():
     else:
         print("✓ Using API_KEYS_SUPERBASE")
     
-    return supabase_url, supabase_key 
\ No newline at end of file
+    return supabase_url, supabase_key
+
+def get_draw_cache_config():
+    """Get draw cache settings from environment variables"""
+    
+    enabled = os.getenv("DRAW_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+    poll_seconds = float(os.getenv("DRAW_CACHE_POLL_SECONDS", "30"))
+    
+    return enabled, poll_seconds
+
+def get_draw_count_method():
+    """Get the PostgREST count method used for draw totals (exact, planned or estimated)"""
+    
+    method = os.getenv("DRAW_COUNT_METHOD", "exact").lower()
+    if method not in ("exact", "planned", "estimated"):
+        raise ValueError(f"DRAW_COUNT_METHOD must be exact, planned or estimated, got: {method}")
+    
+    return method
+
+def get_draw_snapshot_path():
+    """Get the path of the local draw snapshot file used for cold starts"""
+    
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "lottery_draws.snap")
+    
+    return os.getenv("DRAW_SNAPSHOT_PATH", default_path)
+
+def get_draw_storage_config():
+    """Get the draw storage backend (supabase or sqlite) and the SQLite database path"""
+    
+    backend = os.getenv("DRAW_STORAGE_BACKEND", "supabase").lower()
+    if backend not in ("supabase", "sqlite"):
+        raise ValueError(f"DRAW_STORAGE_BACKEND must be supabase or sqlite, got: {backend}")
+    
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "lottery_draws.sqlite3")
+    sqlite_path = os.getenv("SQLITE_DB_PATH", default_path)
+    
+    return backend, sqlite_path
+
+def get_shared_draw_store_dir():
+    """Get the directory of the draw store shared by worker processes (None disables it)"""
+    
+    return os.getenv("DRAW_SHARED_STORE_DIR") or None
+
+def get_response_cache_max_bytes():
+    """Get the size limit of the serialized response cache in bytes (0 disables it)"""
+    
+    return int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+def get_profiling_config():
+    """Get the request profiler settings: sample rate, admin token and output directory.
+
+    Profiling is off unless PROFILE_SAMPLE_RATE is above 0 or PROFILE_ADMIN_TOKEN is set.
+    """
+    
+    sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    if not 0 <= sample_rate <= 1:
+        raise ValueError(f"PROFILE_SAMPLE_RATE must be between 0 and 1, got: {sample_rate}")
+    
+    admin_token = os.getenv("PROFILE_ADMIN_TOKEN") or None
+    
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+    output_dir = os.getenv("PROFILE_OUTPUT_DIR", default_dir)
+    
+    return sample_rate, admin_token, output_dir
+
+def get_ingest_state_path():
+    """Get the path of the file recording the high-water mark of incremental uploads"""
+    
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "ingest_state.json")
+    
+    return os.getenv("INGEST_STATE_PATH", default_path)
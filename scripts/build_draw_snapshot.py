@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build or refresh the local draw snapshot file from Supabase
+Usage: python build_draw_snapshot.py [snapshot_path]
+"""
+
+import sys
+import asyncio
+from config.config import get_draw_snapshot_path
+from app.core.database import close_async_db_client
+from app.services.lottery_service import LotteryService
+
+async def build(path: str) -> int:
+    try:
+        return await LotteryService().write_snapshot(path)
+    finally:
+        await close_async_db_client()
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else get_draw_snapshot_path()
+    
+    try:
+        print("📦 Building draw snapshot...")
+        count = asyncio.run(build(path))
+        print(f"✅ Wrote {count} draws to {path}")
+    except Exception as e:
+        print(f"❌ Critical Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Backfill the lottery_number_wins win history table from the draws already in Supabase
+Usage: python build_win_history.py
+"""
+
+import sys
+from lottery_uploader import LotteryUploader
+
+def main():
+    try:
+        print("🏆 Building win history...")
+        draws, rows = LotteryUploader().rebuild_number_wins()
+        print(f"✅ Indexed {rows} winning numbers from {draws} draws")
+    except Exception as e:
+        print(f"❌ Critical Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
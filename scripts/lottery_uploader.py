@@ -1,15 +1,45 @@
 import os
 import csv
-import ast
-import pandas as pd
-from datetime import datetime
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import date, datetime
+from postgrest.types import ReturnMethod
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from config.config import get_supabase_config
+from config.config import get_supabase_config, get_ingest_state_path
+from app.models.number_wins import number_win_rows
 
 # Load environment variables
 load_dotenv()
 
+# Digits of every number in each prize tier
+TIER_DIGITS = {
+    'prize_1st': 6,
+    'nearby_1st': 6,
+    'prize_2nd': 6,
+    'prize_3rd': 6,
+    'prize_4th': 6,
+    'prize_5th': 6,
+    'prize_pre_3digit': 3,
+    'prize_sub_3digits': 3
+}
+
+class _CountingIterator:
+    """Wrap an iterator and count the items taken from it"""
+    
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
+
 class LotteryUploader:
     def __init__(self):
         """Initialize the Supabase client"""
@@ -31,18 +61,32 @@ class LotteryUploader:
                 raise
         
     def parse_array_field(self, field_value):
-        """Parse string representation of Python list into actual list"""
-        try:
-            if isinstance(field_value, str) and field_value.startswith('['):
-                # Use ast.literal_eval to safely evaluate the string as a Python literal
-                return ast.literal_eval(field_value)
-            elif isinstance(field_value, list):
-                return field_value
-            else:
-                return []
-        except (ValueError, SyntaxError):
-            print(f"Error parsing array field: {field_value}")
+        """Parse a "['097862', '097864']" cell into a list of strings.
+
+        Empty cells are empty lists; anything else that is not a list of
+        quoted items raises ValueError.
+        """
+        if isinstance(field_value, list):
+            return field_value
+        if not isinstance(field_value, str):
+            return []
+        
+        text = field_value.strip()
+        if not text:
             return []
+        if not (text.startswith('[') and text.endswith(']')):
+            raise ValueError(f"Error parsing array field: {field_value}")
+        
+        items = []
+        for item in text[1:-1].split(','):
+            item = item.strip()
+            if not item:
+                continue
+            # Every item is quoted: '097862' or "097862"
+            if len(item) < 2 or item[0] != item[-1] or item[0] not in '\'"':
+                raise ValueError(f"Error parsing array field: {field_value}")
+            items.append(item[1:-1].strip())
+        return items
     
     def check_existing_record(self, date_str):
         """Check if a record with the given date already exists"""
@@ -59,8 +103,18 @@ class LotteryUploader:
                 print(f"Error checking existing record for date {date_str}: {e}")
                 raise
     
-    def prepare_record(self, row):
-        """Prepare a single CSV row for database insertion"""
+    @staticmethod
+    def normalize_date(value):
+        """ISO form of a CSV draw date, ignoring surrounding whitespace"""
+        return date.fromisoformat(str(value).strip()).isoformat()
+    
+    def prepare_record(self, row, problems=None):
+        """Prepare a single CSV row for database insertion, validating digit lengths per tier.
+
+        Prize numbers of the wrong length are left out of the record. Each
+        tier that lost any is described in ``problems`` when a list is given,
+        otherwise printed as a warning.
+        """
         
         # Handle prize_2digits - could be string or int
         prize_2digits = row['prize_2digits']
@@ -70,9 +124,11 @@ class LotteryUploader:
             prize_2digits = int(prize_2digits)
         else:
             prize_2digits = None
+        if prize_2digits is not None and not 0 <= prize_2digits <= 99:
+            raise ValueError(f"prize_2digits must have 2 digits, got {row['prize_2digits']}")
             
         record = {
-            'date': row['date'],
+            'date': self.normalize_date(row['date']),
             'prize_1st': str(row['prize_1st']),
             'prize_pre_3digit': self.parse_array_field(row['prize_pre_3digit']),
             'prize_sub_3digits': self.parse_array_field(row['prize_sub_3digits']),
@@ -83,67 +139,242 @@ class LotteryUploader:
             'prize_4th': self.parse_array_field(row['prize_4th']),
             'prize_5th': self.parse_array_field(row['prize_5th'])
         }
+        
+        record['prize_1st'] = record['prize_1st'].strip()
+        if len(record['prize_1st']) != TIER_DIGITS['prize_1st'] or not record['prize_1st'].isdigit():
+            raise ValueError(f"prize_1st must be a 6-digit number, got {row['prize_1st']!r}")
+        
+        # Numbers of the wrong length can never match a ticket, so they are
+        # left out. 'xxxxxx' marks unpublished numbers in older draws and is
+        # dropped without complaint; anything else is a problem with the input.
+        for field, digits in TIER_DIGITS.items():
+            if field == 'prize_1st':
+                continue
+            valid = [value for value in record[field] if len(value) == digits and value.isdigit()]
+            if len(valid) != len(record[field]):
+                dropped = [value for value in record[field] if value not in valid and value != 'x' * digits]
+                record[field] = valid
+                if not dropped:
+                    continue
+                problem = f"ignoring {field} values that are not {digits}-digit numbers: {dropped}"
+                if problems is None:
+                    print(f"⚠️  {record['date']}: {problem}")
+                else:
+                    problems.append(problem)
+        
         return record
     
-    def upload_csv(self, csv_file_path):
-        """Upload lottery data from CSV file to Supabase"""
+    def _prepare_counted(self, row, index):
+        """prepare_record for the upload loops: the record, and 1 error if it lost any values"""
+        problems = []
+        record = self.prepare_record(row, problems)
+        for problem in problems:
+            print(f"✗ Record {index + 1} ({record['date']}): {problem}")
+        return record, int(bool(problems))
+    
+    def iter_rows(self, csv_file_path):
+        """Yield CSV rows one at a time as dicts of text, in file order"""
+        with open(csv_file_path, newline='', encoding='utf-8') as csv_file:
+            yield from csv.DictReader(csv_file)
+    
+    def fetch_existing_dates(self, page_size=1000):
+        """Fetch every date already in lottery_draws, paging past PostgREST's row limit"""
+        existing = set()
+        offset = 0
+        try:
+            while True:
+                result = self.supabase.table('lottery_draws')\
+                    .select('date')\
+                    .order('date')\
+                    .limit(page_size)\
+                    .offset(offset)\
+                    .execute()
+                existing.update(row['date'] for row in result.data)
+                if len(result.data) < page_size:
+                    return existing
+                offset += page_size
+        except Exception as e:
+            if 'does not exist' in str(e):
+                print("⚠️  Table 'lottery_draws' does not exist. Please create it first!")
+                print("Run the SQL from the README in your Supabase SQL editor.")
+                raise Exception("Database table 'lottery_draws' not found. Please create the table first.")
+            raise
+    
+    def write_number_wins(self, records, batch_size=1000):
+        """Replace the lottery_number_wins rows of these draws; returns how many rows were written.
+
+        The delete and the upserts are separate requests, not one transaction,
+        so a failure part way leaves these draws with some of their rows
+        missing until they are written again.
+        """
+        rows = number_win_rows(records)
+        
+        # Edited draws may have lost winning numbers, so their old rows go first
+        self.supabase.table('lottery_number_wins')\
+            .delete(returning=ReturnMethod.minimal)\
+            .in_('date', [record['date'] for record in records])\
+            .execute()
+        for start in range(0, len(rows), batch_size):
+            self.supabase.table('lottery_number_wins')\
+                .upsert(rows[start:start + batch_size], on_conflict='number,date,tier',
+                        ignore_duplicates=True, returning=ReturnMethod.minimal)\
+                .execute()
+        return len(rows)
+    
+    def rebuild_number_wins(self, page_size=200):
+        """Derive lottery_number_wins from every draw already in lottery_draws; returns (draws, rows)"""
+        draw_count = row_count = 0
+        after = None
+        while True:
+            query = self.supabase.table('lottery_draws')\
+                .select('*')\
+                .order('date')\
+                .limit(page_size)
+            if after:
+                query = query.gt('date', after)
+            draws = query.execute().data
+            if draws:
+                row_count += self.write_number_wins(draws)
+                draw_count += len(draws)
+                print(f"✓ Indexed wins of {draw_count} draws ({row_count} rows)")
+            if len(draws) < page_size:
+                return draw_count, row_count
+            after = draws[-1]['date']
+    
+    def fetch_latest_date(self):
+        """Date of the newest draw in lottery_draws, or None when it is empty"""
+        result = self.supabase.table('lottery_draws')\
+            .select('date')\
+            .order('date', desc=True)\
+            .limit(1)\
+            .execute()
+        return result.data[0]['date'] if result.data else None
+    
+    def read_high_water_mark(self, state_path):
+        """Newest draw date recorded by the last incremental upload to this project, or None"""
+        try:
+            with open(state_path, encoding='utf-8') as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return None
+        # A mark recorded against another Supabase project says nothing about this one
+        if state.get('supabase_url') != self.supabase_url:
+            return None
+        return state.get('last_date')
+    
+    def write_high_water_mark(self, state_path, last_date):
+        """Record the newest ingested draw date, replacing the state file atomically"""
+        directory = os.path.dirname(os.path.abspath(state_path))
+        os.makedirs(directory, exist_ok=True)
+        state = {
+            'supabase_url': self.supabase_url,
+            'last_date': last_date,
+            'recorded_at': datetime.now().isoformat(timespec='seconds')
+        }
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as state_file:
+                json.dump(state, state_file, indent=2)
+            os.replace(temp_path, state_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def upload_delta(self, records):
+        """Upsert new draws and their win history; returns how many draws the database returned.
+
+        The written rows come back from the upsert itself, so no separate
+        verification query is needed. The draws are new, so their win rows are
+        inserted without clearing old ones first.
+        """
+        result = self.supabase.table('lottery_draws')\
+            .upsert(records, on_conflict='date')\
+            .execute()
+        self.supabase.table('lottery_number_wins')\
+            .upsert(number_win_rows(records), on_conflict='number,date,tier',
+                    ignore_duplicates=True, returning=ReturnMethod.minimal)\
+            .execute()
+        return len(result.data)
+    
+    def discard_draws(self, dates):
+        """Delete new draws whose win history could not be written.
+
+        Later runs skip dates that are already in lottery_draws, so a draw
+        left behind without its lottery_number_wins rows would never get them.
+        Deleting it (its win rows go with it) has the next run upload it again.
+        """
+        try:
+            self.supabase.table('lottery_draws')\
+                .delete(returning=ReturnMethod.minimal)\
+                .in_('date', dates)\
+                .execute()
+        except Exception as e:
+            print(f"✗ Could not remove draws {min(dates)} .. {max(dates)} without win history: {e}")
+            print("   Run python scripts/build_win_history.py to index their wins.")
+    
+    def upload_chunk(self, records):
+        """Upsert one chunk of records and return how many of them are now in the table"""
+        dates = [record['date'] for record in records]
+        
+        self.supabase.table('lottery_draws')\
+            .upsert(records, on_conflict='date', returning=ReturnMethod.minimal)\
+            .execute()
+        # Keep the derived win history in step with the draws. lottery_number_wins
+        # references lottery_draws, so the draws have to be written first.
+        try:
+            self.write_number_wins(records)
+        except Exception:
+            self.discard_draws(dates)
+            raise
+        
+        # Verify the whole chunk with a single count query
+        verification = self.supabase.table('lottery_draws')\
+            .select('date', count='exact')\
+            .in_('date', dates)\
+            .limit(1)\
+            .execute()
+        return verification.count or 0
+    
+    def upload_csv(self, csv_file_path, bulk=True, chunk_size=100, max_workers=4, incremental=False, state_path=None):
+        """Upload lottery data from CSV file to Supabase.
+
+        In bulk mode existing dates are fetched once, new records are upserted
+        in chunks of ``chunk_size`` on up to ``max_workers`` threads, and each
+        chunk is verified with one count query. Otherwise every row is checked,
+        inserted and verified on its own.
+
+        In incremental mode only rows dated after the high-water mark in
+        ``state_path`` (INGEST_STATE_PATH by default) are read and uploaded,
+        and the mark moves forward once they are all in.
+        """
         if not os.path.exists(csv_file_path):
             print(f"Error: CSV file '{csv_file_path}' not found")
             return
         
         print(f"Starting upload from {csv_file_path}")
         
-        uploaded_count = 0
-        skipped_count = 0
-        error_count = 0
+        # Rows are streamed from the file and counted as they are consumed
+        rows = _CountingIterator(self.iter_rows(csv_file_path))
         
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file_path)
-            
-            print(f"Found {len(df)} records in CSV file")
-            
-            for index, row in df.iterrows():
-                try:
-                    date_str = row['date']
-                    
-                    # Check if record already exists
-                    if self.check_existing_record(date_str):
-                        print(f"Record for {date_str} already exists, skipping...")
-                        skipped_count += 1
-                        continue
-                    
-                    # Prepare record for insertion
-                    record = self.prepare_record(row)
-                    
-                    # Insert into Supabase
-                    result = self.supabase.table('lottery_draws').insert(record).execute()
-                    
-                    if result.data and len(result.data) > 0:
-                        # Verify the record was actually inserted by checking it exists
-                        verification = self.supabase.table('lottery_draws').select('date').eq('date', date_str).execute()
-                        if verification.data and len(verification.data) > 0:
-                            print(f"✓ Successfully uploaded and verified record for {date_str}")
-                            uploaded_count += 1
-                        else:
-                            print(f"✗ Upload appeared successful but verification failed for {date_str}")
-                            error_count += 1
-                    else:
-                        print(f"✗ Failed to upload record for {date_str} - no data returned")
-                        error_count += 1
-                        
-                except Exception as e:
-                    print(f"✗ Error processing record {index + 1}: {e}")
-                    error_count += 1
-                    continue
-        
-        except Exception as e:
+            if incremental:
+                uploaded_count, skipped_count, error_count = self._upload_incremental(
+                    rows, state_path or get_ingest_state_path()
+                )
+            elif bulk:
+                uploaded_count, skipped_count, error_count = self._upload_bulk(rows, chunk_size, max_workers)
+            else:
+                uploaded_count, skipped_count, error_count = self._upload_rows(rows)
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
             print(f"Error reading CSV file: {e}")
             return
+        except Exception as e:
+            print(f"Error uploading CSV file: {e}")
+            return
         
         # Summary
         print(f"\n=== Upload Summary ===")
-        print(f"Total records processed: {len(df)}")
+        print(f"Total records processed: {rows.count}")
         print(f"Successfully uploaded: {uploaded_count}")
         print(f"Skipped (already exists): {skipped_count}")
         print(f"Errors: {error_count}")
@@ -152,12 +383,186 @@ class LotteryUploader:
         success = error_count == 0
         if not success:
             print(f"\n⚠️  Upload completed with {error_count} errors!")
-            print("❌ Data integrity compromised - some records were not uploaded.")
+            print("❌ Data integrity compromised - some records were not uploaded, or not in full.")
         
         return success
+    
+    def _upload_incremental(self, rows, state_path):
+        """Upload the rows dated after the high-water mark; returns (uploaded, skipped, errors)"""
+        mark = self.read_high_water_mark(state_path)
+        if mark is None:
+            # First incremental run: the newest draw in the database is the mark
+            mark = self.fetch_latest_date()
+            print(f"No recorded high-water mark, newest draw in database: {mark}")
+        else:
+            print(f"High-water mark: {mark}")
+        
+        records = {}
+        skipped = errors = incomplete = 0
+        previous = None
+        for index, row in enumerate(rows):
+            try:
+                date_str = self.normalize_date(row['date'])
+            except ValueError as e:
+                print(f"✗ Error processing record {index + 1}: {e}")
+                errors += 1
+                continue
+            if mark and date_str <= mark:
+                skipped += 1
+                # Two old rows in descending order: the rest of a newest-first file is older still
+                if previous is not None and mark >= previous > date_str:
+                    break
+                previous = date_str
+                continue
+            previous = date_str
+            
+            if date_str in records:
+                continue
+            try:
+                records[date_str], lost_values = self._prepare_counted(row, index)
+                incomplete += lost_values
+            except Exception as e:
+                print(f"✗ Error processing record {index + 1}: {e}")
+                errors += 1
+        
+        uploaded = 0
+        if records:
+            span = f"{min(records)} .. {max(records)}"
+            try:
+                uploaded = min(self.upload_delta(list(records.values())), len(records))
+                print(f"✓ Uploaded {uploaded} new records ({span})")
+            except Exception as e:
+                print(f"✗ Failed to upload {len(records)} records ({span}): {e}")
+            errors += len(records) - uploaded
+        else:
+            print("No new records past the high-water mark")
+        
+        # Rows that failed are retried next time, so the mark only moves when all got in.
+        # Rows uploaded without their bad values would fail the same way again, so they do not hold it back.
+        if errors == 0:
+            newest = max([mark] + list(records), key=lambda value: value or '')
+            if newest:
+                self.write_high_water_mark(state_path, newest)
+        else:
+            print(f"⚠️  High-water mark left at {mark}")
+        
+        return uploaded, skipped, errors + incomplete
+    
+    def _upload_bulk(self, rows, chunk_size, max_workers):
+        """Upload new rows in concurrent chunks; returns (uploaded, skipped, errors)"""
+        counts = {'uploaded': 0, 'skipped': 0, 'errors': 0}
+        
+        existing_dates = self.fetch_existing_dates()
+        print(f"Found {len(existing_dates)} existing records in database")
+        
+        def collect(future, chunk):
+            span = f"{chunk[-1]['date']} .. {chunk[0]['date']}"
+            try:
+                verified = future.result()
+            except Exception as e:
+                print(f"✗ Failed to upload {len(chunk)} records ({span}): {e}")
+                counts['errors'] += len(chunk)
+                return
+            
+            if verified == len(chunk):
+                print(f"✓ Successfully uploaded and verified {len(chunk)} records ({span})")
+            else:
+                print(f"✗ Verification found {verified} of {len(chunk)} records ({span})")
+                counts['errors'] += len(chunk) - verified
+            counts['uploaded'] += min(verified, len(chunk))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            
+            def submit(chunk):
+                # Keep at most two chunks per worker in memory
+                while len(pending) >= 2 * max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+                pending[executor.submit(self.upload_chunk, chunk)] = chunk
+            
+            chunk = []
+            for index, row in enumerate(rows):
+                try:
+                    date_str = self.normalize_date(row['date'])
+                    if date_str in existing_dates:
+                        counts['skipped'] += 1
+                        continue
+                    record, lost_values = self._prepare_counted(row, index)
+                    counts['errors'] += lost_values
+                    chunk.append(record)
+                    # Later rows with the same date are duplicates of this one
+                    existing_dates.add(date_str)
+                except Exception as e:
+                    print(f"✗ Error processing record {index + 1}: {e}")
+                    counts['errors'] += 1
+                    continue
+                
+                if len(chunk) == chunk_size:
+                    submit(chunk)
+                    chunk = []
+            
+            if chunk:
+                submit(chunk)
+            for future in as_completed(list(pending)):
+                collect(future, pending.pop(future))
+        
+        if counts['skipped']:
+            print(f"Skipped {counts['skipped']} records that already exist")
+        
+        return counts['uploaded'], counts['skipped'], counts['errors']
+    
+    def _upload_rows(self, rows):
+        """Check, insert and verify one row at a time; returns (uploaded, skipped, errors)"""
+        uploaded_count = 0
+        skipped_count = 0
+        error_count = 0
+        
+        for index, row in enumerate(rows):
+            try:
+                date_str = self.normalize_date(row['date'])
+                
+                # Check if record already exists
+                if self.check_existing_record(date_str):
+                    print(f"Record for {date_str} already exists, skipping...")
+                    skipped_count += 1
+                    continue
+                
+                # Prepare record for insertion
+                record, lost_values = self._prepare_counted(row, index)
+                error_count += lost_values
+                
+                # Insert into Supabase
+                result = self.supabase.table('lottery_draws').insert(record).execute()
+                
+                if result.data and len(result.data) > 0:
+                    # Verify the record was actually inserted by checking it exists
+                    verification = self.supabase.table('lottery_draws').select('date').eq('date', date_str).execute()
+                    if verification.data and len(verification.data) > 0:
+                        try:
+                            self.write_number_wins([record])
+                        except Exception:
+                            self.discard_draws([date_str])
+                            raise
+                        print(f"✓ Successfully uploaded and verified record for {date_str}")
+                        uploaded_count += 1
+                    else:
+                        print(f"✗ Upload appeared successful but verification failed for {date_str}")
+                        error_count += 1
+                else:
+                    print(f"✗ Failed to upload record for {date_str} - no data returned")
+                    error_count += 1
+                    
+            except Exception as e:
+                print(f"✗ Error processing record {index + 1}: {e}")
+                error_count += 1
+                continue
+        
+        return uploaded_count, skipped_count, error_count
         
     def create_table_if_not_exists(self):
-        """Create the lottery_draws table if it doesn't exist (you'll need to run this SQL in Supabase)"""
+        """Create the lottery_draws and lottery_number_wins tables if they don't exist (you'll need to run this SQL in Supabase)"""
         sql = """
         CREATE TABLE IF NOT EXISTS lottery_draws (
             id SERIAL PRIMARY KEY,
@@ -177,6 +582,27 @@ class LotteryUploader:
         
         -- Create index on date for faster lookups
         CREATE INDEX IF NOT EXISTS idx_lottery_draws_date ON lottery_draws(date);
+        
+        -- Keep updated_at current on every update, so API caches notice edited draws
+        CREATE OR REPLACE FUNCTION set_lottery_draws_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS lottery_draws_set_updated_at ON lottery_draws;
+        CREATE TRIGGER lottery_draws_set_updated_at
+            BEFORE UPDATE ON lottery_draws
+            FOR EACH ROW EXECUTE FUNCTION set_lottery_draws_updated_at();
+        
+        -- Derived win history, one row per (winning key, draw, tier)
+        CREATE TABLE IF NOT EXISTS lottery_number_wins (
+            number TEXT NOT NULL,
+            date DATE NOT NULL REFERENCES lottery_draws(date) ON DELETE CASCADE,
+            tier TEXT NOT NULL,
+            PRIMARY KEY (number, date, tier)
+        );
         """
         print("Please run the following SQL in your Supabase SQL editor:")
         print(sql)
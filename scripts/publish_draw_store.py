@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Run as the loader of the shared draw store, so no API worker polls the database
+Usage: python publish_draw_store.py [--once] [--interval seconds]
+"""
+
+import sys
+import asyncio
+import argparse
+from config.config import get_draw_cache_config
+from app.core.database import close_async_db_client
+from app.services.lottery_service import LotteryService, get_shared_draw_store
+
+async def run(once: bool, interval: float):
+    store = get_shared_draw_store()
+    print(f"🔒 Waiting for the loader lock of {store.directory}...")
+    await asyncio.to_thread(store.lead)
+    print("✅ Holding the loader lock")
+
+    service = LotteryService()
+    published = None
+    try:
+        while True:
+            version = await service.refresh_draws()
+            if version != published:
+                print(f"📦 Store holds {version[0]} draws (updated {version[1]})")
+                published = version
+            if once:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await close_async_db_client()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Publish the current draws and exit")
+    parser.add_argument("--interval", type=float, default=get_draw_cache_config()[1], help="Seconds between database polls")
+    args = parser.parse_args()
+
+    if get_shared_draw_store() is None:
+        print("❌ DRAW_SHARED_STORE_DIR is not set")
+        sys.exit(1)
+
+    try:
+        asyncio.run(run(args.once, args.interval))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    except Exception as e:
+        print(f"❌ Critical Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Summarize request profiles written by the API's opt-in profiler
+Usage: python show_profiles.py [profile files or directories] [--match TEXT] [--sort cumulative|tottime|calls] [--limit N]
+"""
+
+import argparse
+import glob
+import os
+import pstats
+import sys
+from config.config import get_profiling_config
+
+def collect(paths, match=None):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.prof"))))
+        else:
+            files.append(path)
+    if match:
+        files = [f for f in files if match in os.path.basename(f)]
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and print profiles of sampled requests")
+    parser.add_argument("paths", nargs="*", help="Profile files or directories (default: PROFILE_OUTPUT_DIR)")
+    parser.add_argument("--match", help="Only profiles whose file name contains this, e.g. POST-api_th_v1_lottery_check")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "calls"], help="Sort order")
+    parser.add_argument("--limit", type=int, default=30, help="Number of functions to print")
+    args = parser.parse_args()
+
+    files = collect(args.paths or [get_profiling_config()[2]], args.match)
+    if not files:
+        print("❌ No profiles found")
+        sys.exit(1)
+
+    print(f"📊 Merging {len(files)} profiles")
+    stats = pstats.Stats(*files)
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+
+if __name__ == "__main__":
+    main()
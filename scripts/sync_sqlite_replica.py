@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Fill the local SQLite draw replica from Supabase, or from a CSV file offline
+Usage: python sync_sqlite_replica.py [--csv csv_file_path] [sqlite_path]
+"""
+
+import sys
+import asyncio
+from config.config import get_draw_storage_config, get_draw_count_method
+from app.repositories import SqliteDrawRepository, SupabaseDrawRepository
+from lottery_uploader import LotteryUploader
+
+CHUNK_SIZE = 500
+
+async def sync_from_supabase(replica: SqliteDrawRepository) -> int:
+    source = SupabaseDrawRepository(count_method=get_draw_count_method())
+    written = 0
+    chunk = []
+    try:
+        async for row in source.iter_draws(CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                written += await replica.upsert_draws(chunk)
+                chunk = []
+        written += await replica.upsert_draws(chunk)
+    finally:
+        await source.close()
+    return written
+
+async def sync_from_csv(replica: SqliteDrawRepository, csv_file: str) -> int:
+    uploader = LotteryUploader()
+    records = []
+    for row_number, row in enumerate(uploader.iter_rows(csv_file), 1):
+        try:
+            records.append(uploader.prepare_record(row))
+        except (KeyError, ValueError) as e:
+            print(f"⚠️  Skipping row {row_number}: {e}")
+    return await replica.upsert_draws(records)
+
+async def sync(sqlite_path: str, csv_file: str = None) -> int:
+    replica = SqliteDrawRepository(sqlite_path)
+    try:
+        if csv_file:
+            return await sync_from_csv(replica, csv_file)
+        return await sync_from_supabase(replica)
+    finally:
+        await replica.close()
+
+def main():
+    args = sys.argv[1:]
+    csv_file = None
+    if "--csv" in args:
+        position = args.index("--csv")
+        if position + 1 >= len(args):
+            print("❌ --csv needs a file path")
+            sys.exit(1)
+        csv_file = args[position + 1]
+        del args[position:position + 2]
+    
+    sqlite_path = args[0] if args else get_draw_storage_config()[1]
+    
+    try:
+        print(f"🔄 Syncing draws into {sqlite_path}...")
+        written = asyncio.run(sync(sqlite_path, csv_file))
+        print(f"✅ Wrote {written} draws")
+    except Exception as e:
+        print(f"❌ Critical Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 """
 Simple script to upload lottery CSV data to Supabase
-Usage: python upload_lottery_data.py [csv_file_path]
+Usage: python upload_lottery_data.py [--row-by-row | --incremental] [csv_file_path]
 """
 
 import sys
 from lottery_uploader import LotteryUploader
 
 def main():
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
+    args = sys.argv[1:]
+    # Bulk upload unless asked to check and insert one row at a time
+    bulk = "--row-by-row" not in args
+    # Only rows newer than the last incremental upload
+    incremental = "--incremental" in args
+    args = [arg for arg in args if arg not in ("--row-by-row", "--incremental")]
+    
+    if args:
+        csv_file = args[0]
     else:
         csv_file = input("Enter the path to your CSV file: ").strip()
     
@@ -29,7 +36,7 @@ def main():
         print("="*50)
         
         # Start upload
-        success = uploader.upload_csv(csv_file)
+        success = uploader.upload_csv(csv_file, bulk=bulk, incremental=incremental)
         
         if success:
             print("\n🎉 Upload process completed successfully!")
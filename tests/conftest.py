@@ -0,0 +1,69 @@
+"""
+Shared pytest fixtures: the API served in-process from the PostgREST stand-in
+Usage: python -m pytest tests   (from the repository root)
+"""
+
+import os
+import sys
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings the app reads at import time: draws only ever come from the stand-in
+os.environ["DRAW_STORAGE_BACKEND"] = "supabase"
+os.environ["DRAW_SNAPSHOT_PATH"] = ""
+os.environ["DRAW_SHARED_STORE_DIR"] = ""
+
+from app.main import app
+from app.container import ServiceContainer
+from app.models.draw_record import DrawRecord
+from app.models.number_wins import number_win_rows
+from app.repositories import SupabaseDrawRepository
+from app.services.lottery_service import invalidate_draw_cache
+from benchmarks.fake_postgrest import FakePostgrest, create_fake_client, load_draws
+
+DATASET = os.path.join(ROOT, "datasets", "lottery_dataset_until_2024.csv")
+API = "/api/th/v1/lottery"
+
+# Scripts for a running server, run directly rather than collected
+collect_ignore = ["test_api.py", "test_api_simple.py", "test_setup.py"]
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(scope="session")
+def draw_rows():
+    """Every draw of the bundled dataset as database rows, newest first"""
+    return load_draws(DATASET)
+
+@pytest.fixture(scope="session")
+def draws(draw_rows):
+    return [DrawRecord.from_row(row) for row in draw_rows]
+
+@pytest.fixture
+def database(draw_rows):
+    """PostgREST stand-in holding the dataset; ``requests`` counts the queries it answers"""
+    return FakePostgrest({
+        "lottery_draws": list(draw_rows),
+        "lottery_number_wins": number_win_rows(draw_rows),
+    })
+
+@pytest.fixture
+async def client(database):
+    """HTTP client for the app, served from a fresh container over ``database``"""
+    db = create_fake_client(database)
+    invalidate_draw_cache()
+    container = ServiceContainer(SupabaseDrawRepository(db))
+    await container.warm_up()
+    app.state.container = container
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.state.container = None
+        invalidate_draw_cache()
+        await db.aclose()
@@ -0,0 +1,140 @@
+"""
+POST /check/bulk against a plain per-draw reference, below and above the NumPy batch size
+Usage: python -m pytest tests/test_bulk_check.py
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from app.controllers.lottery_controller import VALID_NUMBER, invalid_numbers
+from app.services.draw_matcher import DrawMatcher
+from app.services.lottery_service import PRIZE_AMOUNTS, VECTOR_MATCH_MIN_BATCH
+from app.services.prize_index import TIER_LABELS
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+def best_win(draws, number, dates=None):
+    """(prize amount, draw date, tier) of the best win of ``number``: highest prize, then newest draw"""
+    best = None
+    for draw in draws:
+        if dates is not None and draw.date not in dates:
+            continue
+        tier = DrawMatcher(draw).match(number)
+        if tier is not None and (best is None or (PRIZE_AMOUNTS[tier], draw.date) > best[:2]):
+            best = (PRIZE_AMOUNTS[tier], draw.date, tier)
+    return best
+
+def sample_numbers(draws, count, seed=7):
+    """Random 6-digit tickets mixed with numbers that won each tier"""
+    rng = random.Random(seed)
+    numbers = [f"{rng.randrange(10 ** 6):06d}" for _ in range(count)]
+    for draw in draws[:10]:
+        numbers += [draw.prize_1st, draw.nearby_1st[0], draw.prize_2nd[0], draw.prize_5th[-1]]
+    rng.shuffle(numbers)
+    return numbers[:count]
+
+async def check_bulk(client, payload):
+    response = await client.post(f"{API}/check/bulk", json=payload)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+def assert_results(data, expected):
+    """``data`` lists exactly the winning tickets of ``expected``, with consistent totals"""
+    winners = {
+        position: {
+            "index": position,
+            "number": number,
+            "date": best[1].isoformat(),
+            "prize_type": TIER_LABELS[best[2]],
+            "prize_amount": best[0],
+        }
+        for position, (number, best) in enumerate(expected) if best
+    }
+    assert {result["index"]: result for result in data["results"]} == winners
+    assert data["checked_count"] == len(expected)
+    assert data["winning_count"] == len(winners)
+    assert data["total_winnings"] == sum(result["prize_amount"] for result in winners.values())
+    assert sum(data["prize_counts"].values()) == len(winners)
+
+@pytest.mark.parametrize("count", [20, VECTOR_MATCH_MIN_BATCH + 50])
+async def test_bulk_matches_reference(client, draws, count):
+    numbers = sample_numbers(draws, count)
+    data = await check_bulk(client, {"tickets": numbers})
+    assert_results(data, [(number, best_win(draws, number)) for number in numbers])
+    assert data["draws_checked"] == len(draws)
+
+@pytest.mark.parametrize("count", [20, VECTOR_MATCH_MIN_BATCH + 50])
+async def test_bulk_honours_ticket_dates(client, draws, count):
+    rng = random.Random(count)
+    default = draws[3].date
+    tickets, expected = [], []
+    for number in sample_numbers(draws, count):
+        choice = rng.randrange(3)
+        if choice == 0:
+            tickets.append(number)
+            dates = {default}
+        elif choice == 1:
+            pinned = rng.choice(draws[:20]).date
+            tickets.append({"number": number, "date": pinned.isoformat()})
+            dates = {pinned}
+        else:
+            pinned = {draw.date for draw in rng.sample(draws[:20], 3)}
+            tickets.append({"number": number, "dates": [d.isoformat() for d in pinned]})
+            dates = pinned
+        expected.append((number, best_win(draws, number, dates)))
+
+    data = await check_bulk(client, {"tickets": tickets, "date": default.isoformat()})
+    assert_results(data, expected)
+    assert data["missing_dates"] == []
+
+async def test_bulk_reports_missing_dates(client, draws):
+    data = await check_bulk(client, {"tickets": [
+        {"number": draws[0].prize_1st, "date": draws[0].date.isoformat()},
+        {"number": draws[0].prize_1st, "date": "2024-12-02"},
+    ]})
+    assert [result["index"] for result in data["results"]] == [0]
+    assert data["missing_dates"] == ["2024-12-02"]
+
+async def test_bulk_agrees_with_check(client, draws):
+    numbers = sample_numbers(draws, 10, seed=3)
+    single = (await client.post(f"{API}/check", json={"numbers": numbers})).json()["data"]["results"]
+    bulk = (await check_bulk(client, {"tickets": numbers}))["results"]
+    assert [
+        (result["number"], result["date"], result["prize_type"], result["prize_amount"])
+        for result in single if result["matched"]
+    ] == [
+        (result["number"], result["date"], result["prize_type"], result["prize_amount"])
+        for result in bulk
+    ]
+
+async def test_bulk_rejects_an_empty_batch(client):
+    response = await client.post(f"{API}/check/bulk", json={"tickets": []})
+    assert response.status_code == 422
+
+async def test_bulk_reads_the_cache_not_the_database(client, database):
+    before = database.requests
+    await check_bulk(client, {"tickets": sample_numbers([], VECTOR_MATCH_MIN_BATCH)})
+    assert database.requests == before
+
+def test_reference_finds_the_first_prize(draws):
+    latest = draws[0]
+    assert best_win(draws, latest.prize_1st) == (PRIZE_AMOUNTS["1st_prize"], latest.date, "1st_prize")
+    assert best_win(draws, latest.prize_1st, {date(1990, 1, 1)}) is None
+
+@pytest.mark.parametrize("numbers, invalid", [
+    (["123456", "12", "0000000"], []),
+    (["123456", "1", "12a456", "", "１２３４５６", "123456"], [1, 2, 3, 4]),
+    (["12 34"], [0]),
+])
+def test_invalid_numbers_match_the_pattern(numbers, invalid):
+    assert invalid_numbers(numbers) == invalid
+    assert invalid == [i for i, number in enumerate(numbers) if not VALID_NUMBER.fullmatch(number)]
+
+async def test_bulk_rejects_invalid_numbers(client):
+    response = await client.post(f"{API}/check/bulk", json={"tickets": ["123456", "12x456", {"number": "7"}]})
+    assert response.status_code == 400
+    detail = response.json()["message"]
+    assert "2 tickets" in detail and "#1 ('12x456')" in detail and "#2 ('7')" in detail
@@ -0,0 +1,85 @@
+"""
+Delta refresh of the draw cache: only draws written since the cached version are fetched
+Usage: python -m pytest tests/test_delta_refresh.py
+"""
+
+import random
+
+import pytest
+
+from app.core.metrics import DB_REQUEST_DURATION
+from app.main import app
+from app.models.draw_record import DrawRecord
+from app.services import lottery_service
+from app.repositories import SupabaseDrawRepository
+from app.services.prize_index import PrizeIndex
+from benchmarks.fake_postgrest import create_fake_client
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+def assert_index_matches(snapshot, rows):
+    expected = PrizeIndex([DrawRecord.from_row(row) for row in rows])
+    rng = random.Random(3)
+    numbers = [f"{rng.randrange(10 ** 6):06d}" for _ in range(2000)] + [row["prize_1st"] for row in rows]
+    for number in numbers:
+        assert snapshot.index.all_matches(number) == expected.all_matches(number), number
+
+async def refresh():
+    await app.state.container.lottery_service.refresh_draws()
+    return lottery_service._draw_cache.snapshot
+
+@pytest.fixture
+def table(database, draw_rows):
+    """The stand-in's lottery_draws rows, missing the two newest draws until a test adds them"""
+    rows = database.tables["lottery_draws"]
+    del rows[:2]
+    return rows
+
+async def test_new_draws_extend_the_previous_index(table, client, draw_rows):
+    previous = lottery_service._draw_cache.snapshot
+    full_loads = DB_REQUEST_DURATION.count("supabase", "get_all_draws")
+
+    table[:0] = [dict(row, updated_at="2024-12-17T10:00:00") for row in draw_rows[:2]]
+    snapshot = await refresh()
+
+    assert DB_REQUEST_DURATION.count("supabase", "get_all_draws") == full_loads
+    assert [draw.date for draw in snapshot.draws] == [DrawRecord.from_row(row).date for row in table]
+    assert snapshot.index is not previous.index
+    assert previous.index.draw_count == len(table) - 2
+    assert_index_matches(snapshot, table)
+    # The previous snapshot is untouched for requests still holding it
+    assert_index_matches(previous, table[2:])
+
+    latest = (await client.get(f"{API}/draws/latest")).json()["data"]["draw"]
+    assert latest["date"] == draw_rows[0]["date"]
+
+async def test_edited_draw_is_reindexed(table, client):
+    table[3] = dict(table[3], prize_1st="999999", updated_at="2024-12-18T00:00:00")
+    snapshot = await refresh()
+
+    assert_index_matches(snapshot, table)
+    assert snapshot.by_date[DrawRecord.from_row(table[3]).date].prize_1st == "999999"
+
+async def test_deleted_draw_reloads_everything(table, client):
+    full_loads = DB_REQUEST_DURATION.count("supabase", "get_all_draws")
+    del table[5]
+    table[0] = dict(table[0], updated_at="2024-12-18T00:00:00")
+    snapshot = await refresh()
+
+    assert DB_REQUEST_DURATION.count("supabase", "get_all_draws") == full_loads + 1
+    assert len(snapshot.draws) == len(table)
+    assert_index_matches(snapshot, table)
+
+async def test_version_skips_rows_without_updated_at(database, draw_rows):
+    rows = database.tables["lottery_draws"]
+    rows[10] = dict(rows[10], updated_at=None)
+    rows[3] = dict(rows[3], updated_at="2025-01-01T00:00:00")
+    rows[7] = dict(rows[7], updated_at="2025-01-01T00:00:00")
+    db = create_fake_client(database)
+    try:
+        version = await SupabaseDrawRepository(db).get_version()
+    finally:
+        await db.aclose()
+    # The newest stamp wins over the NULL one, and the newer date breaks the tie
+    assert version == (len(draw_rows), "2025-01-01T00:00:00", draw_rows[3]["date"])
@@ -0,0 +1,175 @@
+"""
+The shared draw store: PackedPrizeIndex against PrizeIndex, publishing and mapping
+Usage: python -m pytest tests/test_draw_store.py
+"""
+
+import os
+import random
+import stat
+import time
+
+import pytest
+
+from app.models.draw_record import DrawRecord
+from app.services import lottery_service
+from app.services.draw_store import SharedDrawStore
+from app.services.lottery_service import PRIZE_AMOUNTS, DrawCache, DrawSnapshot
+from app.services.prize_index import PackedPrizeIndex, PrizeIndex
+from app.services.snapshot_file import MappedDraws
+from app.services.vector_matcher import VectorMatcher
+from conftest import API
+
+VERSION = (429, "2024-12-17T00:00:00", "2024-12-16")
+
+def numbers_to_check(draws, count=3000):
+    """Random tickets, winners of every tier, and keys of odd shapes"""
+    rng = random.Random(17)
+    numbers = [f"{rng.randrange(10 ** 6):06d}" for _ in range(count)]
+    for draw in draws[:40]:
+        numbers += [draw.prize_1st, *draw.nearby_1st, *draw.prize_2nd, *draw.prize_4th[:3]]
+    return numbers + ["12", "123", "1234", "12345678", "abc123", "00", "000000", "x", "７７７"]
+
+@pytest.fixture(scope="module")
+def odd_draws(draws):
+    """The dataset plus a draw whose keys the packed arrays cannot encode"""
+    odd = DrawRecord.from_row({
+        "id": 0, "date": "2025-01-01", "prize_1st": "abc123", "prize_2digits": 5,
+        "prize_2nd": ["12345678901234567", "097863"], "prize_pre_3digit": ["x12"],
+    })
+    return [odd, *draws]
+
+def test_packed_index_matches_prize_index(odd_draws):
+    expected = PrizeIndex(odd_draws)
+    arrays, unpacked = PackedPrizeIndex.pack(odd_draws)
+    packed = PackedPrizeIndex([draw.date for draw in odd_draws], arrays, unpacked)
+    assert unpacked
+
+    for number in numbers_to_check(odd_draws) + ["abc123", "12345678901234567"]:
+        assert packed.matches(number) == expected.matches(number), number
+        assert packed.all_matches(number) == expected.all_matches(number), number
+
+def test_store_round_trip(odd_draws, tmp_path):
+    store = SharedDrawStore(str(tmp_path))
+    assert store.stamp() is None
+    store.publish(odd_draws, VERSION)
+
+    stamp, draws, version, index, vector_arrays = store.load()
+    assert stamp == store.stamp()
+    assert version == VERSION
+    assert [draw.to_dict() for draw in draws] == [draw.to_dict() for draw in odd_draws]
+
+    expected = PrizeIndex(odd_draws)
+    for number in numbers_to_check(odd_draws, count=500):
+        assert index.all_matches(number) == expected.all_matches(number), number
+
+    tickets = [number for number in numbers_to_check(odd_draws) if len(number) == 6 and number.isdigit()]
+    built = VectorMatcher(odd_draws, PRIZE_AMOUNTS).best_matches(tickets)
+    mapped = VectorMatcher(draws, PRIZE_AMOUNTS, arrays=vector_arrays).best_matches(tickets)
+    assert (built[0] == mapped[0]).all() and (built[1] == mapped[1]).all()
+
+def test_loaded_draws_decode_on_access(odd_draws, tmp_path):
+    store = SharedDrawStore(str(tmp_path))
+    store.publish(odd_draws, VERSION)
+    draws = store.load()[1]
+    assert isinstance(draws, MappedDraws)
+    assert draws.dates == [draw.date for draw in odd_draws]
+    assert draws[0].to_dict() == odd_draws[0].to_dict()
+    assert draws[-1].to_dict() == odd_draws[-1].to_dict()
+    assert [draw.date for draw in draws[5:8]] == draws.dates[5:8]
+    with pytest.raises(IndexError):
+        draws[len(odd_draws)]
+
+    snapshot = DrawSnapshot(draws, VERSION)
+    assert snapshot.by_date[odd_draws[3].date].to_dict() == odd_draws[3].to_dict()
+    assert odd_draws[3].date in snapshot.by_date and len(snapshot.by_date) == len(odd_draws)
+
+def test_mapped_arrays_are_read_only(draws, tmp_path):
+    store = SharedDrawStore(str(tmp_path))
+    store.publish(draws, VERSION)
+    _, _, _, index, vector_arrays = store.load()
+    assert not index._keys.flags.writeable
+    assert not any(array.flags.writeable for array in vector_arrays.values())
+
+def test_published_file_is_readable_by_other_users(draws, tmp_path):
+    store = SharedDrawStore(str(tmp_path))
+    store.publish(draws, VERSION)
+    assert stat.S_IMODE(os.stat(store.path).st_mode) == 0o644
+
+def test_republishing_changes_the_stamp(draws, tmp_path):
+    store = SharedDrawStore(str(tmp_path))
+    store.publish(draws[1:], (428, "2024-12-02T00:00:00", "2024-12-01"))
+    before = store.stamp()
+    store.publish(draws, VERSION)
+    assert store.stamp() != before
+    assert store.load()[2] == VERSION
+
+def test_one_loader_at_a_time(tmp_path):
+    leader = SharedDrawStore(str(tmp_path))
+    follower = SharedDrawStore(str(tmp_path))
+    assert leader.try_lead()
+    assert leader.try_lead()
+    assert not follower.try_lead()
+
+@pytest.mark.anyio
+async def test_cache_publishes_and_followers_map_it(draws, tmp_path):
+    loader = DrawCache(shared_store=SharedDrawStore(str(tmp_path)))
+    published = await loader.publish(DrawSnapshot(draws, VERSION))
+    assert published.shared
+    assert isinstance(published.index, PackedPrizeIndex)
+
+    follower = DrawCache(shared_store=SharedDrawStore(str(tmp_path)))
+    snapshot = follower.follow_store()
+    assert snapshot.shared and snapshot.version == VERSION
+    assert [draw.date for draw in snapshot.draws] == [draw.date for draw in draws]
+
+@pytest.fixture
+def shared_cache(tmp_path, monkeypatch):
+    """Serve draws through a shared store in a temporary directory"""
+    cache = DrawCache(shared_store=SharedDrawStore(str(tmp_path)))
+    monkeypatch.setattr(lottery_service, "_draw_cache", cache)
+    return cache
+
+@pytest.mark.anyio
+async def test_api_serves_from_the_shared_store(shared_cache, client, draws):
+    latest = (await client.get(f"{API}/draws/latest")).json()["data"]["draw"]
+    assert latest["date"] == draws[0].date.isoformat()
+
+    assert os.path.exists(shared_cache.shared_store.path)
+    assert shared_cache.snapshot.shared
+    assert isinstance(shared_cache.snapshot.index, PackedPrizeIndex)
+
+    response = await client.post(f"{API}/check/bulk", json={"tickets": [draws[0].prize_1st]})
+    assert response.json()["data"]["results"][0]["date"] == draws[0].date.isoformat()
+
+@pytest.fixture
+def follower_cache(draws, tmp_path, monkeypatch):
+    """Follow a store whose loader, another process in effect, published an old version and went quiet"""
+    loader = SharedDrawStore(str(tmp_path))
+    assert loader.try_lead()
+    loader.publish(draws[1:], (428, "2024-12-02T00:00:00", "2024-12-01"))
+    loader.mark_polled()
+    cache = DrawCache(shared_store=SharedDrawStore(str(tmp_path)))
+    monkeypatch.setattr(lottery_service, "_draw_cache", cache)
+    return cache
+
+@pytest.mark.anyio
+async def test_follower_stands_in_for_a_quiet_loader(follower_cache, client, database, draws):
+    # The loader polled recently: follow its publication without asking the database
+    before = database.requests
+    latest = (await client.get(f"{API}/draws/latest")).json()["data"]["draw"]
+    assert latest["date"] == draws[1].date.isoformat()
+    assert database.requests == before
+
+    # Only the follower gets traffic; once the loader has been quiet for a poll interval it checks itself
+    store = follower_cache.shared_store
+    quiet = time.time() - 2 * follower_cache.poll_seconds
+    os.utime(store.lock_path, (quiet, quiet))
+    follower_cache._polled_at -= 2 * follower_cache.poll_seconds
+    latest = (await client.get(f"{API}/draws/latest")).json()["data"]["draw"]
+    assert latest["date"] == draws[0].date.isoformat()
+    assert database.requests > before
+    assert store.polled_within(follower_cache.poll_seconds)
+    assert not store.try_lead()
+
+    # ...and publishes what it found for the other workers
+    assert store.load()[1].dates[0] == draws[0].date
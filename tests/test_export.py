@@ -0,0 +1,60 @@
+"""
+GET /draws/export in both formats
+Usage: python -m pytest tests/test_export.py
+"""
+
+import json
+
+import pytest
+
+from benchmarks.fake_postgrest import load_draws
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+DRAW_FIELDS = (
+    "date", "prize_1st", "prize_pre_3digit", "prize_sub_3digits", "prize_2digits",
+    "nearby_1st", "prize_2nd", "prize_3rd", "prize_4th", "prize_5th",
+)
+
+def draw_fields(row):
+    return {field: row[field] for field in DRAW_FIELDS}
+
+async def test_ndjson_holds_every_draw(client, draw_rows):
+    response = await client.get(f"{API}/draws/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="lottery_draws.ndjson"'
+
+    lines = response.text.splitlines()
+    assert [draw_fields(json.loads(line)) for line in lines] == [draw_fields(row) for row in draw_rows]
+
+async def test_ndjson_lines_match_draw_by_date(client, draw_rows):
+    response = await client.get(f"{API}/draws/export")
+    line = json.loads(response.text.splitlines()[5])
+    single = (await client.get(f"{API}/draws/{draw_rows[5]['date']}")).json()["data"]["draw"]
+    assert draw_fields(line) == draw_fields(single)
+
+async def test_csv_reads_back_as_the_dataset(client, draw_rows, tmp_path):
+    response = await client.get(f"{API}/draws/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.text.splitlines()[0] == ",".join(DRAW_FIELDS)
+
+    # The export uses the dataset's own format, so the dataset loader reads it back
+    exported = tmp_path / "lottery_draws.csv"
+    exported.write_bytes(response.content)
+    assert [draw_fields(row) for row in load_draws(str(exported))] == [draw_fields(row) for row in draw_rows]
+
+async def test_export_etag_depends_on_format(client):
+    ndjson = await client.get(f"{API}/draws/export")
+    csv = await client.get(f"{API}/draws/export", params={"format": "csv"})
+    assert ndjson.headers["etag"] != csv.headers["etag"]
+
+    again = await client.get(f"{API}/draws/export", headers={"If-None-Match": ndjson.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+
+async def test_unknown_format_is_rejected(client):
+    response = await client.get(f"{API}/draws/export", params={"format": "xml"})
+    assert response.status_code == 422
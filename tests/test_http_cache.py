@@ -0,0 +1,119 @@
+"""
+ETags, conditional GETs and Cache-Control of the draw endpoints
+Usage: python -m pytest tests/test_http_cache.py
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.core.http_cache import (
+    BANGKOK, HISTORICAL_CACHE_CONTROL, LATEST_MAX_MAX_AGE, LATEST_MIN_MAX_AGE,
+    draw_cache_control, draw_window, etag_matches, latest_cache_control, make_etag,
+)
+from app.main import app
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+CACHED_PATHS = [
+    "/draws",
+    "/draws?page=2&size=10",
+    "/draws/latest",
+    "/draws/2024-12-16",
+    "/numbers/097863/wins",
+]
+
+def max_age(cache_control):
+    return int(cache_control.rsplit("max-age=", 1)[1])
+
+def test_etags_identify_their_parts():
+    assert make_etag("draws", (429, "x"), 1) == make_etag("draws", (429, "x"), 1)
+    assert make_etag("draws", (429, "x"), 1) != make_etag("draws", (429, "x"), 2)
+    assert make_etag("draws").startswith('"') and make_etag("draws").endswith('"')
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ('"other"', False),
+    ("*", True),
+])
+def test_if_none_match(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+def test_latest_cache_control_lasts_until_the_next_draw_window():
+    # Mid-month, after the 1 January draw: never longer than a day
+    now = datetime(2025, 1, 5, 12, 0, tzinfo=BANGKOK)
+    assert max_age(latest_cache_control(date(2025, 1, 1), now)) == LATEST_MAX_MAX_AGE
+    # The window around the 16th opens at midnight on the 14th
+    now = datetime(2025, 1, 13, 18, 0, tzinfo=BANGKOK)
+    assert max_age(latest_cache_control(date(2025, 1, 1), now)) == 6 * 3600
+    # Inside the window, before its draw
+    now = datetime(2025, 1, 14, 9, 0, tzinfo=BANGKOK)
+    assert max_age(latest_cache_control(date(2025, 1, 1), now)) == LATEST_MIN_MAX_AGE
+    # Results still arriving on the draw day itself
+    now = datetime(2025, 1, 16, 20, 0, tzinfo=BANGKOK)
+    assert max_age(latest_cache_control(date(2025, 1, 16), now)) == LATEST_MIN_MAX_AGE
+    # The window's draw is in, so caching lasts until the next window
+    now = datetime(2025, 1, 17, 9, 0, tzinfo=BANGKOK)
+    assert max_age(latest_cache_control(date(2025, 1, 16), now)) == LATEST_MAX_MAX_AGE
+
+@pytest.mark.parametrize("now, newest", [
+    # Draws held on the 30th, 17th and 2nd instead of the 1st or 16th
+    (datetime(2024, 12, 30, 10, 0, tzinfo=BANGKOK), date(2024, 12, 16)),
+    (datetime(2024, 1, 17, 9, 0, tzinfo=BANGKOK), date(2024, 1, 1)),
+    (datetime(2025, 5, 2, 8, 0, tzinfo=BANGKOK), date(2025, 4, 16)),
+])
+def test_off_schedule_draw_days_are_cached_briefly(now, newest):
+    assert max_age(latest_cache_control(newest, now)) == LATEST_MIN_MAX_AGE
+    assert max_age(latest_cache_control(None, now)) == LATEST_MIN_MAX_AGE
+
+def test_off_schedule_draw_is_not_historical_until_superseded():
+    # The 30 December draw stood in for 1 January
+    now = datetime(2025, 1, 5, 12, 0, tzinfo=BANGKOK)
+    assert draw_cache_control(date(2024, 12, 30), date(2024, 12, 30), now) != HISTORICAL_CACHE_CONTROL
+    assert draw_cache_control(date(2024, 12, 16), date(2024, 12, 30), now) == HISTORICAL_CACHE_CONTROL
+
+def test_every_dataset_draw_falls_in_a_draw_window(draws):
+    assert all(draw_window(draw.date) is not None for draw in draws)
+
+@pytest.mark.parametrize("path", CACHED_PATHS)
+async def test_matching_etag_is_not_modified(client, database, path):
+    response = await client.get(f"{API}{path}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "max-age=" in response.headers["cache-control"]
+
+    before = database.requests
+    again = await client.get(f"{API}{path}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["cache-control"] == response.headers["cache-control"]
+    assert database.requests == before
+
+@pytest.mark.parametrize("path", CACHED_PATHS)
+async def test_stale_etag_gets_the_body(client, path):
+    response = await client.get(f"{API}{path}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+async def test_pages_have_their_own_etags(client):
+    first = await client.get(f"{API}/draws", params={"size": 10})
+    second = await client.get(f"{API}/draws", params={"size": 10, "page": 2})
+    assert first.headers["etag"] != second.headers["etag"]
+
+async def test_new_draw_changes_the_etag(client, database, draw_rows):
+    before = await client.get(f"{API}/draws/latest")
+
+    newer = dict(draw_rows[0], id=len(draw_rows) + 1, date="2025-01-01", updated_at="2025-01-01T15:00:00")
+    database.tables["lottery_draws"].insert(0, newer)
+    await app.state.container.lottery_service.refresh_draws()
+
+    after = await client.get(f"{API}/draws/latest", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["data"]["draw"]["date"] == "2025-01-01"
@@ -0,0 +1,86 @@
+"""
+GET /metrics after serving requests: counter and histogram series in the Prometheus text format
+Usage: python -m pytest tests/test_metrics.py
+"""
+
+import pytest
+
+from app.core.metrics import CONTENT_TYPE, Counter, Histogram
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+DRAW_ROUTE = f"{API}/draws/{{draw_date}}"
+
+async def scrape(client):
+    """Every sample of /metrics as {'name{labels}': value}"""
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(CONTENT_TYPE)
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            series, _, value = line.rpartition(" ")
+            samples[series] = float(value)
+    return samples, response.text
+
+def http_series(suffix, route, status="200", le=None):
+    bucket = f',le="{le}"' if le is not None else ""
+    return f'http_request_duration_seconds{suffix}{{method="GET",route="{route}",status="{status}"{bucket}}}'
+
+async def test_request_shows_up_in_the_latency_histogram(client, draws):
+    before, _ = await scrape(client)
+    for draw in draws[:3]:
+        response = await client.get(f"{API}/draws/{draw.date.isoformat()}")
+        assert response.status_code == 200
+    samples, text = await scrape(client)
+
+    count = http_series("_count", DRAW_ROUTE)
+    assert samples[count] == before.get(count, 0) + 3
+    assert samples[http_series("_sum", DRAW_ROUTE)] > 0
+    # Buckets are cumulative and end at the count
+    buckets = [value for series, value in samples.items() if series.startswith(http_series("_bucket", DRAW_ROUTE)[:-1])]
+    assert buckets == sorted(buckets)
+    assert samples[http_series("_bucket", DRAW_ROUTE, le="+Inf")] == samples[count]
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+async def test_unknown_paths_share_one_series(client):
+    await client.get(f"{API}/no-such-thing")
+    samples, _ = await scrape(client)
+    assert samples[http_series("_count", "unmatched", status="404")] >= 1
+    assert not any("no-such-thing" in series for series in samples)
+
+async def test_checked_tickets_are_counted(client, draws):
+    series = 'lottery_tickets_checked_total{call="check_numbers"}'
+    before, _ = await scrape(client)
+    response = await client.post(f"{API}/check", json={"numbers": [draws[0].prize_1st, "123456"]})
+    assert response.status_code == 200
+    samples, text = await scrape(client)
+    assert samples[series] == before.get(series, 0) + 2
+    assert "# TYPE lottery_tickets_checked_total counter" in text
+
+async def test_cache_lookups_are_counted(client, draws):
+    hit = 'cache_requests_total{cache="draw_snapshot",result="hit"}'
+    before, _ = await scrape(client)
+    await client.get(f"{API}/draws/latest")
+    samples, _ = await scrape(client)
+    assert samples[hit] > before.get(hit, 0)
+
+def test_label_values_are_escaped():
+    counter = Counter("test_total", "Escaping", ("path",))
+    counter.inc('a"b\\c\nd')
+    assert counter.collect() == ['test_total{path="a\\"b\\\\c\\nd"} 1']
+
+def test_histogram_lines():
+    histogram = Histogram("test_seconds", "Buckets", ("op",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "read")
+    histogram.observe(0.5, "read")
+    histogram.observe(5, "read")
+    assert histogram.collect() == [
+        'test_seconds_bucket{op="read",le="0.1"} 1',
+        'test_seconds_bucket{op="read",le="1"} 2',
+        'test_seconds_bucket{op="read",le="+Inf"} 3',
+        'test_seconds_sum{op="read"} 5.55',
+        'test_seconds_count{op="read"} 3',
+    ]
+    assert histogram.count("read") == 3
@@ -0,0 +1,118 @@
+"""
+Keyset cursors of GET /draws and GET /search, and search totals across page boundaries
+Usage: python -m pytest tests/test_pagination.py
+"""
+
+import pytest
+
+from app.services import lottery_service
+from app.services.lottery_service import DrawCache
+from app.services.pagination import decode_cursor, encode_cursor, next_cursor
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+async def walk(client, path, **params):
+    """Dates of every draw reached by following next_cursor from the first page"""
+    dates, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = await client.get(f"{API}{path}", params=query)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        dates += [draw["date"] for draw in data["draws"]]
+        cursor = data["pagination"]["next_cursor"]
+        if cursor is None:
+            return dates
+
+def test_cursor_round_trip(draws):
+    for draw in draws[:20]:
+        assert decode_cursor(encode_cursor(draw.date)) == draw.date
+
+@pytest.mark.parametrize("cursor", ["zzz", "", "MjAyNC0xMy0wMQ"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_no_cursor_after_the_last_page(draws):
+    assert next_cursor(draws[:3], has_more=False) is None
+    assert next_cursor([], has_more=True) is None
+    assert decode_cursor(next_cursor(draws[:3], has_more=True)) == draws[2].date
+
+async def test_cursor_walk_visits_every_draw_once(client, draws):
+    dates = await walk(client, "/draws", size=37)
+    assert dates == [draw.date.isoformat() for draw in draws]
+
+async def test_cursor_pages_match_numbered_pages(client):
+    first = (await client.get(f"{API}/draws", params={"size": 10})).json()["data"]
+    second = (await client.get(f"{API}/draws", params={"size": 10, "page": 2})).json()["data"]
+    after = (await client.get(
+        f"{API}/draws", params={"size": 10, "cursor": first["pagination"]["next_cursor"]}
+    )).json()["data"]
+    assert after["draws"] == second["draws"]
+
+async def test_search_cursor_stays_within_the_filter(client, draws):
+    dates = await walk(client, "/search", start_date="2020-01-01", end_date="2023-12-31", size=25)
+    expected = [
+        draw.date.isoformat() for draw in draws
+        if "2020-01-01" <= draw.date.isoformat() <= "2023-12-31"
+    ]
+    assert dates == expected
+
+async def test_invalid_cursor_is_a_bad_request(client):
+    response = await client.get(f"{API}/draws", params={"cursor": "zzz"})
+    assert response.status_code == 400
+    assert response.json()["success"] is False
+
+@pytest.fixture(params=["cache", "database"])
+def search_source(request, monkeypatch):
+    """Serve searches from the draw cache, or straight from the PostgREST stand-in"""
+    if request.param == "database":
+        monkeypatch.setattr(lottery_service, "_draw_cache", DrawCache(enabled=False))
+    return request.param
+
+START, END = "2021-01-01", "2022-12-31"
+
+def in_range(draws, start=START, end=END):
+    return [draw.date.isoformat() for draw in draws if start <= draw.date.isoformat() <= end]
+
+async def search_page(client, **params):
+    response = await client.get(f"{API}/search", params=dict({"start_date": START, "end_date": END}, **params))
+    assert response.status_code == 200
+    data = response.json()["data"]
+    return [draw["date"] for draw in data["draws"]], data["pagination"]
+
+@pytest.mark.parametrize("size", [1, 7, 48, 49])
+async def test_search_totals_and_next_pages(search_source, client, draws, size):
+    expected = in_range(draws)
+    assert len(expected) == 48
+    pages = -(-len(expected) // size)
+    for page in range(1, pages + 2):
+        dates, pagination = await search_page(client, size=size, page=page)
+        assert dates == expected[(page - 1) * size:page * size]
+        assert pagination["total"] == len(expected)
+        assert pagination["pages"] == pages
+        # A next page exactly while draws remain past this one
+        assert (pagination["next_cursor"] is not None) == (page * size < len(expected))
+
+async def test_search_cursor_pages_cross_the_range_end(search_source, client, draws):
+    expected = in_range(draws)
+    dates, pagination = await search_page(client, size=40)
+    dates_after, pagination_after = await search_page(client, size=40, cursor=pagination["next_cursor"])
+    assert dates + dates_after == expected
+    assert pagination_after["next_cursor"] is None and pagination_after["page"] is None
+    # Counting is skipped on cursor pages unless the cache has it for free
+    assert pagination_after["total"] == (len(expected) if search_source == "cache" else None)
+
+async def test_search_with_no_matches(search_source, client):
+    dates, pagination = await search_page(client, start_date="1990-01-01", end_date="1990-12-31")
+    assert dates == []
+    assert pagination["total"] == 0 and pagination["pages"] == 0
+    assert pagination["next_cursor"] is None
+
+async def test_open_ended_search_counts_to_the_oldest_draw(search_source, client, draws):
+    response = await client.get(f"{API}/search", params={"start_date": "2023-01-01", "size": 10, "page": 2})
+    pagination = response.json()["data"]["pagination"]
+    expected = [draw for draw in draws if draw.date.isoformat() >= "2023-01-01"]
+    assert pagination["total"] == len(expected)
+    assert (pagination["next_cursor"] is not None) == (20 < len(expected))
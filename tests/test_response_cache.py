@@ -0,0 +1,74 @@
+"""
+ResponseCache: LRU order, byte accounting and entries too big to keep
+Usage: python -m pytest tests/test_response_cache.py
+"""
+
+import pytest
+
+from app.core.metrics import CACHE_REQUESTS
+from app.core.response_cache import CachedResponse, ResponseCache
+from app.main import app
+from conftest import API
+
+def entry(size, tag="x"):
+    return CachedResponse(tag.encode() * size, f'"{tag}"')
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = ResponseCache(max_bytes=30)
+    for key in "abc":
+        cache.put(key, entry(10, key))
+    assert cache.get("a") is not None  # a is now the most recent
+
+    cache.put("d", entry(10, "d"))
+    assert cache.get("b") is None
+    assert [key for key in "acd" if cache.get(key) is not None] == ["a", "c", "d"]
+
+def test_eviction_frees_enough_bytes_for_a_big_entry():
+    cache = ResponseCache(max_bytes=30)
+    for key in "abc":
+        cache.put(key, entry(10, key))
+    cache.put("big", entry(25))
+    assert len(cache) == 1 and cache.size == 25
+    assert cache.get("big").body == b"x" * 25
+
+def test_size_tracks_replaced_and_cleared_entries():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", entry(10))
+    cache.put("b", entry(20))
+    assert cache.size == 30
+    cache.put("a", entry(5))
+    assert cache.size == 25 and len(cache) == 2
+    assert cache.get("a").body == b"x" * 5
+    cache.clear()
+    assert cache.size == 0 and len(cache) == 0
+
+def test_oversize_entry_is_not_kept_and_evicts_nothing():
+    cache = ResponseCache(max_bytes=30)
+    cache.put("a", entry(10))
+    cache.put("huge", entry(31))
+    assert cache.get("huge") is None
+    assert cache.get("a") is not None and cache.size == 10
+
+def test_zero_bytes_disables_the_cache():
+    cache = ResponseCache(max_bytes=0)
+    cache.put("a", entry(1))
+    assert cache.get("a") is None and cache.size == 0
+
+def test_lookups_are_counted():
+    cache = ResponseCache()
+    hits, misses = CACHE_REQUESTS.value("response", "hit"), CACHE_REQUESTS.value("response", "miss")
+    cache.get("a")
+    cache.put("a", entry(1))
+    cache.get("a")
+    assert CACHE_REQUESTS.value("response", "hit") == hits + 1
+    assert CACHE_REQUESTS.value("response", "miss") == misses + 1
+
+@pytest.mark.anyio
+async def test_repeat_page_is_served_from_the_cache(client):
+    cache = app.state.container.lottery_controller.response_cache
+    first = await client.get(f"{API}/draws", params={"size": 5})
+    assert len(cache) == 1
+    hits = CACHE_REQUESTS.value("response", "hit")
+    second = await client.get(f"{API}/draws", params={"size": 5})
+    assert second.content == first.content
+    assert CACHE_REQUESTS.value("response", "hit") == hits + 1
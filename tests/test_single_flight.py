@@ -0,0 +1,90 @@
+"""
+SingleFlight: concurrent callers of one key share a single call
+Usage: python -m pytest tests/test_single_flight.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+class Call:
+    """Counts its calls and blocks each one until ``release``"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.released = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.released.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def release(self):
+        self.released.set()
+
+async def start(flights, key, fn, count):
+    """``count`` callers of ``key``, left waiting on the shared call"""
+    tasks = [asyncio.ensure_future(flights.do(key, fn)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+async def test_concurrent_callers_share_one_call():
+    flights, call = SingleFlight(), Call(result=["draw"])
+    tasks = await start(flights, "latest", call, 5)
+    call.release()
+    results = await asyncio.gather(*tasks)
+    assert call.calls == 1
+    assert all(result is results[0] for result in results)
+
+async def test_the_error_reaches_every_caller():
+    flights, call = SingleFlight(), Call(error=RuntimeError("database down"))
+    tasks = await start(flights, "latest", call, 4)
+    call.release()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert call.calls == 1
+    assert all(isinstance(result, RuntimeError) and str(result) == "database down" for result in results)
+
+async def test_the_key_is_released_after_a_failure():
+    flights, failing = SingleFlight(), Call(error=RuntimeError("database down"))
+    failing.release()
+    with pytest.raises(RuntimeError):
+        await flights.do("latest", failing)
+    await asyncio.sleep(0)
+
+    working = Call(result="draw")
+    working.release()
+    assert await flights.do("latest", working) == "draw"
+    assert failing.calls == 1 and working.calls == 1
+
+async def test_later_calls_run_again():
+    flights, call = SingleFlight(), Call(result="draw")
+    call.release()
+    assert await flights.do("latest", call) == "draw"
+    await asyncio.sleep(0)
+    assert await flights.do("latest", call) == "draw"
+    assert call.calls == 2
+
+async def test_keys_do_not_share_calls():
+    flights, first, second = SingleFlight(), Call(result=1), Call(result=2)
+    tasks = await start(flights, "a", first, 2) + await start(flights, "b", second, 2)
+    first.release()
+    second.release()
+    assert await asyncio.gather(*tasks) == [1, 1, 2, 2]
+    assert first.calls == second.calls == 1
+
+async def test_a_cancelled_caller_does_not_cancel_the_others():
+    flights, call = SingleFlight(), Call(result="draw")
+    leaving, staying = await start(flights, "latest", call, 2)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    call.release()
+    assert await staying == "draw"
+    assert leaving.cancelled() and call.calls == 1
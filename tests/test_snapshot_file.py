@@ -0,0 +1,117 @@
+"""
+Round trips through the local draw snapshot file, and cold starts from it
+Usage: python -m pytest tests/test_snapshot_file.py
+"""
+
+import httpx
+import pytest
+
+from app.container import ServiceContainer
+from app.core.metrics import DB_REQUEST_DURATION
+from app.main import app
+from app.models.draw_record import DrawRecord
+from app.repositories import SupabaseDrawRepository
+from app.services import lottery_service
+from app.services.lottery_service import DrawCache
+from app.services.snapshot_file import read_snapshot_file, write_snapshot_file
+from benchmarks.fake_postgrest import create_fake_client
+from conftest import API
+
+VERSION = (429, "2024-12-17T00:00:00", "2024-12-16")
+
+def as_dicts(draws):
+    return [draw.to_dict() for draw in draws]
+
+def test_dataset_round_trip(draws, tmp_path):
+    path = str(tmp_path / "draws.snap")
+    write_snapshot_file(path, draws, VERSION)
+    loaded, version = read_snapshot_file(path)
+
+    assert version == VERSION
+    assert as_dicts(loaded) == as_dicts(draws)
+    assert [(draw.id, draw.created_at, draw.updated_at) for draw in loaded] == [
+        (draw.id, draw.created_at, draw.updated_at) for draw in draws
+    ]
+
+def test_values_the_arrays_cannot_hold_survive(tmp_path):
+    odd = [
+        DrawRecord.from_row({
+            "id": 1, "date": "2024-01-16", "prize_1st": "12345", "prize_2digits": None,
+            "prize_2nd": ["000001", "99999x"], "prize_pre_3digit": ["007"], "nearby_1st": [],
+        }),
+        DrawRecord.from_row({
+            "id": 2, "date": "2024-01-01", "prize_1st": "000000", "prize_2digits": 0,
+            "prize_5th": ["0123456"], "prize_sub_3digits": ["12", "345"],
+        }),
+        DrawRecord.from_row({
+            "id": 3, "date": "2023-12-30", "prize_1st": None, "prize_2digits": 7,
+        }),
+    ]
+    path = str(tmp_path / "odd.snap")
+    write_snapshot_file(path, odd, None)
+    loaded, version = read_snapshot_file(path)
+
+    assert version is None
+    assert as_dicts(loaded) == as_dicts(odd)
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "empty.snap")
+    write_snapshot_file(path, [], (0, None, None))
+    assert read_snapshot_file(path) == ([], (0, None, None))
+
+def test_rewrite_replaces_the_file(draws, tmp_path):
+    path = str(tmp_path / "draws.snap")
+    write_snapshot_file(path, draws, VERSION)
+    write_snapshot_file(path, draws[:5], (5, None, None))
+
+    loaded, version = read_snapshot_file(path)
+    assert version == (5, None, None)
+    assert as_dicts(loaded) == as_dicts(draws[:5])
+    assert [entry.name for entry in tmp_path.iterdir()] == ["draws.snap"]
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "draws.snap"
+    path.write_bytes(b"date,prize_1st\n2024-12-16,097863\n")
+    with pytest.raises(ValueError):
+        read_snapshot_file(str(path))
+
+def test_cache_seeds_from_the_file(draws, tmp_path):
+    path = str(tmp_path / "draws.snap")
+    write_snapshot_file(path, draws, VERSION)
+
+    cache = DrawCache(snapshot_path=path)
+    cache.seed_from_file()
+    assert cache.snapshot.from_file
+    assert cache.snapshot.version == VERSION
+    assert as_dicts(cache.snapshot.draws) == as_dicts(draws)
+
+@pytest.mark.parametrize("contents", [None, b"not a snapshot"])
+def test_cache_starts_empty_without_a_usable_file(tmp_path, contents):
+    path = tmp_path / "draws.snap"
+    if contents is not None:
+        path.write_bytes(contents)
+
+    cache = DrawCache(snapshot_path=str(path))
+    cache.seed_from_file()
+    assert cache.snapshot is None
+
+@pytest.mark.anyio
+async def test_cold_start_serves_the_file(draws, database, tmp_path, monkeypatch):
+    path = str(tmp_path / "draws.snap")
+    db = create_fake_client(database)
+    repository = SupabaseDrawRepository(db)
+    write_snapshot_file(path, draws, await repository.get_version())
+    monkeypatch.setattr(lottery_service, "_draw_cache", DrawCache(snapshot_path=path))
+
+    full_loads = DB_REQUEST_DURATION.count("supabase", "get_all_draws")
+    app.state.container = ServiceContainer(repository)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(f"{API}/draws/latest")
+    finally:
+        app.state.container = None
+        await db.aclose()
+
+    assert response.json()["data"]["draw"]["date"] == draws[0].date.isoformat()
+    # The file was current, so the draws were never read from the database
+    assert DB_REQUEST_DURATION.count("supabase", "get_all_draws") == full_loads
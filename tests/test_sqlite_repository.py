@@ -0,0 +1,132 @@
+"""
+SqliteDrawRepository against the dataset in a temporary database file
+Usage: python -m pytest tests/test_sqlite_repository.py
+"""
+
+import shutil
+import time
+from datetime import date
+
+import pytest
+
+from app.models.number_wins import number_win_rows
+from app.repositories import sqlite_repository
+from app.repositories.base import LIST_TIER_COLUMNS
+from app.repositories.sqlite_repository import SqliteDrawRepository
+
+pytestmark = pytest.mark.anyio
+
+COLUMNS = ("date", "prize_1st", "prize_2digits", *LIST_TIER_COLUMNS)
+
+def draw_fields(row):
+    """The columns a write sets, as the repository reads them back"""
+    return {column: list(row[column]) if column in LIST_TIER_COLUMNS else row[column] for column in COLUMNS}
+
+def win_keys(rows):
+    return sorted((row["number"], str(row["date"]), row["tier"]) for row in rows)
+
+@pytest.fixture(scope="module")
+def dataset_db(draw_rows, tmp_path_factory):
+    """A database file holding the dataset, written once and copied by each test"""
+    path = str(tmp_path_factory.mktemp("sqlite") / "draws.db")
+    repository = SqliteDrawRepository(path)
+    repository._upsert_draws(draw_rows)
+    repository.connection.close()
+    repository._executor.shutdown()
+    return path
+
+@pytest.fixture
+async def repository(dataset_db, tmp_path):
+    path = str(tmp_path / "draws.db")
+    shutil.copy(dataset_db, path)
+    repository = SqliteDrawRepository(path)
+    try:
+        yield repository
+    finally:
+        await repository.close()
+
+async def test_rows_read_back_as_written(repository, draw_rows):
+    assert [draw_fields(row) for row in await repository.get_all_draws()] == [draw_fields(row) for row in draw_rows]
+    latest = await repository.get_latest_draw()
+    assert draw_fields(latest) == draw_fields(draw_rows[0])
+    assert await repository.get_draw_by_date(date(1990, 1, 1)) is None
+
+async def test_upsert_rewrites_an_edited_draw(repository, draw_rows):
+    before = await repository.get_draw_by_date(date.fromisoformat(draw_rows[5]["date"]))
+    time.sleep(0.002)
+    edited = dict(draw_rows[5], prize_2nd=["111111", "222222"], prize_5th=[], prize_1st="123456")
+    await repository.upsert_draws([edited])
+
+    after = await repository.get_draw_by_date(date.fromisoformat(edited["date"]))
+    assert draw_fields(after) == draw_fields(edited)
+    assert after["id"] == before["id"] and after["updated_at"] > before["updated_at"]
+    # The old prize numbers leave the win history with the prize rows
+    stored = await repository.get_number_wins([row["number"] for row in number_win_rows([draw_rows[5], edited])])
+    assert win_keys(row for row in stored if row["date"] == edited["date"]) == win_keys(number_win_rows([edited]))
+
+@pytest.mark.parametrize("offset", [0, 7, 40])
+async def test_page_counts_and_offsets_within_the_range(repository, draw_rows, offset):
+    start, end = date(2021, 1, 1), date(2022, 12, 31)
+    in_range = [row for row in draw_rows if start.isoformat() <= row["date"] <= end.isoformat()]
+    rows, total = await repository.get_draws_page(start_date=start, end_date=end, limit=10, offset=offset)
+    assert total == len(in_range)
+    assert [row["date"] for row in rows] == [row["date"] for row in in_range[offset:offset + 10]]
+
+async def test_page_before_a_date_ignores_the_offset(repository, draw_rows):
+    before = date.fromisoformat(draw_rows[20]["date"])
+    rows, total = await repository.get_draws_page(before=before, limit=5, offset=99, count=False)
+    assert total is None
+    assert [row["date"] for row in rows] == [row["date"] for row in draw_rows[21:26]]
+
+    rows, total = await repository.get_draws_page(before=before, limit=5)
+    assert total == len(draw_rows) - 21
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 429, 430])
+async def test_iteration_crosses_chunk_boundaries(repository, draw_rows, chunk_size):
+    assert len(draw_rows) == 429
+    dates = [row["date"] async for row in repository.iter_draws(chunk_size)]
+    assert dates == [row["date"] for row in draw_rows]
+
+async def test_version_tracks_writes(draw_rows, tmp_path):
+    repository = SqliteDrawRepository(str(tmp_path / "draws.db"))
+    try:
+        assert await repository.get_version() == (0, None, None)
+        await repository.upsert_draws(draw_rows[1:])
+        count, updated_at, newest = await repository.get_version()
+        assert count == len(draw_rows) - 1
+
+        time.sleep(0.002)
+        await repository.upsert_draws([draw_rows[0]])
+        version = await repository.get_version()
+        assert version[0] == len(draw_rows)
+        assert version[1] > updated_at and version[2] == draw_rows[0]["date"]
+
+        # Only the draws written after a version come back as updated since it
+        time.sleep(0.002)
+        await repository.upsert_draws([draw_rows[3], draw_rows[40]])
+        changed = await repository.get_draws_updated_since(version[1])
+        assert [row["date"] for row in changed] == [draw_rows[3]["date"], draw_rows[40]["date"]]
+        assert await repository.get_draws_updated_since((await repository.get_version())[1]) == []
+    finally:
+        await repository.close()
+
+async def test_reads_bind_draw_ids_in_chunks(repository, draw_rows, monkeypatch):
+    monkeypatch.setattr(sqlite_repository, "_CHUNK_SIZE", 50)
+    rows = await repository.get_draws_updated_since("")
+    assert [draw_fields(row) for row in rows] == [draw_fields(row) for row in draw_rows]
+
+async def test_missing_win_history_is_backfilled_in_chunks(dataset_db, draw_rows, tmp_path, monkeypatch):
+    path = str(tmp_path / "draws.db")
+    shutil.copy(dataset_db, path)
+    repository = SqliteDrawRepository(path)
+    repository.connection.execute("DELETE FROM lottery_number_wins")
+    repository.connection.commit()
+    await repository.close()
+
+    monkeypatch.setattr(sqlite_repository, "_CHUNK_SIZE", 100)
+    repository = SqliteDrawRepository(path)
+    try:
+        (count,) = repository.connection.execute("SELECT COUNT(*) FROM lottery_number_wins").fetchone()
+        assert count == len(number_win_rows(draw_rows))
+    finally:
+        await repository.close()
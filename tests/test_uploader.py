@@ -0,0 +1,218 @@
+"""
+The CSV uploader (scripts/lottery_uploader.py) against the PostgREST stand-in
+Usage: python -m pytest tests/test_uploader.py
+"""
+
+import csv
+import itertools
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from app.models.number_wins import number_win_rows
+from benchmarks.fake_postgrest import FakePostgrest, create_fake_sync_client
+from conftest import DATASET, ROOT
+from scripts import lottery_uploader
+
+class FakeSupabase:
+    """The part of the Supabase client the uploader uses, answered by the stand-in"""
+
+    def __init__(self, transport):
+        self.postgrest = create_fake_sync_client(transport)
+
+    def table(self, name):
+        return self.postgrest.from_(name)
+
+@pytest.fixture
+def store():
+    """Empty lottery tables"""
+    return FakePostgrest({"lottery_draws": [], "lottery_number_wins": []})
+
+@pytest.fixture
+def uploader(store, monkeypatch):
+    monkeypatch.setattr(lottery_uploader, "get_supabase_config", lambda: ("http://postgrest.local", "key"))
+    monkeypatch.setattr(lottery_uploader, "create_client", lambda url, key: FakeSupabase(store))
+    return lottery_uploader.LotteryUploader()
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """The newest 30 draws of the dataset"""
+    path = tmp_path / "draws.csv"
+    with open(DATASET, encoding="utf-8") as dataset:
+        path.write_text("".join(itertools.islice(dataset, 31)), encoding="utf-8")
+    return str(path)
+
+def win_keys(rows):
+    return sorted((row["number"], str(row["date"]), row["tier"]) for row in rows)
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_upload_writes_draws_and_win_history(uploader, store, csv_path, bulk):
+    assert uploader.upload_csv(csv_path, bulk=bulk, chunk_size=7) is True
+    assert len(store.tables["lottery_draws"]) == 30
+    assert win_keys(store.tables["lottery_number_wins"]) == win_keys(number_win_rows(store.tables["lottery_draws"]))
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_failed_win_history_is_written_on_the_next_run(uploader, store, csv_path, bulk):
+    store.failing.add(("POST", "lottery_number_wins"))
+    assert uploader.upload_csv(csv_path, bulk=bulk, chunk_size=7) is False
+    # Draws without their win rows are taken out again, so the next run does not skip them
+    assert store.tables["lottery_draws"] == []
+
+    store.failing.clear()
+    assert uploader.upload_csv(csv_path, bulk=bulk, chunk_size=7) is True
+    assert len(store.tables["lottery_draws"]) == 30
+    assert win_keys(store.tables["lottery_number_wins"]) == win_keys(number_win_rows(store.tables["lottery_draws"]))
+
+def test_draws_that_cannot_be_removed_point_to_the_rebuild(uploader, store, csv_path, capsys):
+    store.failing.update({("POST", "lottery_number_wins"), ("DELETE", "lottery_draws")})
+    assert uploader.upload_csv(csv_path, chunk_size=7) is False
+    assert "scripts/build_win_history.py" in capsys.readouterr().out
+
+    store.failing.clear()
+    assert uploader.rebuild_number_wins() == (30, len(number_win_rows(store.tables["lottery_draws"])))
+    assert win_keys(store.tables["lottery_number_wins"]) == win_keys(number_win_rows(store.tables["lottery_draws"]))
+
+def dataset_row(**changes):
+    """The newest dataset row as the CSV reader yields it, with ``changes``"""
+    with open(DATASET, newline="", encoding="utf-8") as dataset:
+        return dict(next(csv.DictReader(dataset)), **changes)
+
+def write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+@pytest.mark.parametrize("cell, expected", [
+    ("['097862', '097864']", ["097862", "097864"]),
+    ('["290", "742"]', ["290", "742"]),
+    ("[ '290' ,'742', ]", ["290", "742"]),
+    ("[]", []),
+    ("", []),
+    (None, []),
+    (["123456"], ["123456"]),
+])
+def test_parse_array_field(uploader, cell, expected):
+    assert uploader.parse_array_field(cell) == expected
+
+@pytest.mark.parametrize("cell", ["['097862', 097864]", "097862", "['097862'"])
+def test_parse_array_field_rejects_malformed_cells(uploader, cell):
+    with pytest.raises(ValueError):
+        uploader.parse_array_field(cell)
+
+def test_prepare_record_reports_dropped_values(uploader):
+    problems = []
+    record = uploader.prepare_record(dataset_row(date=" 2024-12-16 ", prize_5th="['123456', '0003', 'xxxxxx']"), problems)
+    assert record["date"] == "2024-12-16"
+    assert record["prize_5th"] == ["123456"]
+    # The unpublished-number placeholder is expected; the 4-digit value is not
+    assert len(problems) == 1 and "'0003'" in problems[0]
+
+    problems = []
+    uploader.prepare_record(dataset_row(prize_4th="['xxxxxx']"), problems)
+    assert problems == []
+
+@pytest.mark.parametrize("changes", [{"prize_1st": "97863"}, {"prize_2digits": "123"}, {"date": "2024-13-01"}])
+def test_prepare_record_rejects_bad_rows(uploader, changes):
+    with pytest.raises(ValueError):
+        uploader.prepare_record(dataset_row(**changes))
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_dropped_values_are_errors_not_success(uploader, store, tmp_path, bulk):
+    path = write_rows(tmp_path / "draws.csv", [dataset_row(prize_5th="['123456', '0003']")])
+    assert uploader.upload_csv(path, bulk=bulk) is False
+    # The draw is still uploaded, without the value
+    assert [row["prize_5th"] for row in store.tables["lottery_draws"]] == [["123456"]]
+    assert uploader.upload_csv(path, bulk=bulk) is True
+
+def test_bulk_splits_rows_into_chunks(uploader, csv_path):
+    chunks = []
+    uploader.upload_chunk = lambda chunk: chunks.append([record["date"] for record in chunk]) or len(chunk)
+    rows = lottery_uploader._CountingIterator(uploader.iter_rows(csv_path))
+    assert uploader._upload_bulk(rows, chunk_size=7, max_workers=2) == (30, 0, 0)
+    assert sorted(len(chunk) for chunk in chunks) == [2, 7, 7, 7, 7]
+    assert sorted(date for chunk in chunks for date in chunk) == sorted(row["date"] for row in uploader.iter_rows(csv_path))
+
+def test_bulk_holds_at_most_two_chunks_per_worker(uploader, csv_path):
+    release = threading.Event()
+    uploader.upload_chunk = lambda chunk: release.wait(5) and len(chunk)
+    rows = lottery_uploader._CountingIterator(uploader.iter_rows(csv_path))
+    result = []
+    worker = threading.Thread(target=lambda: result.append(uploader._upload_bulk(rows, chunk_size=3, max_workers=2)))
+    worker.start()
+    time.sleep(0.3)
+    # Two chunks per worker submitted, plus the one being filled when the reader blocked
+    assert rows.count == (2 * 2 + 1) * 3
+    release.set()
+    worker.join(5)
+    assert result == [(30, 0, 0)] and rows.count == 30
+
+def test_failed_chunks_count_as_errors(uploader, store, csv_path):
+    store.failing.add(("POST", "lottery_draws"))
+    rows = lottery_uploader._CountingIterator(uploader.iter_rows(csv_path))
+    assert uploader._upload_bulk(rows, chunk_size=7, max_workers=2) == (0, 0, 30)
+
+def test_incremental_stops_at_the_first_old_rows(uploader, store, csv_path, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    dates = [row["date"] for row in uploader.iter_rows(csv_path)]
+    uploader.write_high_water_mark(state_path, dates[5])
+
+    rows = lottery_uploader._CountingIterator(uploader.iter_rows(csv_path))
+    assert uploader._upload_incremental(rows, state_path) == (5, 2, 0)
+    # Newest first: two rows at or before the mark end the scan
+    assert rows.count == 7
+    assert sorted(row["date"] for row in store.tables["lottery_draws"]) == sorted(dates[:5])
+    assert uploader.read_high_water_mark(state_path) == dates[0]
+
+def test_incremental_reads_an_oldest_first_file_to_the_end(uploader, store, tmp_path):
+    rows = list(reversed(list(uploader.iter_rows(DATASET))[:30]))
+    path = write_rows(tmp_path / "ascending.csv", rows)
+    state_path = str(tmp_path / "state.json")
+    uploader.write_high_water_mark(state_path, rows[24]["date"])
+
+    counted = lottery_uploader._CountingIterator(uploader.iter_rows(path))
+    assert uploader._upload_incremental(counted, state_path) == (5, 25, 0)
+    assert counted.count == 30
+
+def test_incremental_keeps_the_mark_after_a_failed_upload(uploader, store, csv_path, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    dates = [row["date"] for row in uploader.iter_rows(csv_path)]
+    uploader.write_high_water_mark(state_path, dates[5])
+    store.failing.add(("POST", "lottery_draws"))
+    assert uploader.upload_csv(csv_path, incremental=True, state_path=state_path) is False
+    assert uploader.read_high_water_mark(state_path) == dates[5]
+
+def test_incremental_moves_the_mark_past_dropped_values(uploader, tmp_path):
+    path = write_rows(tmp_path / "draws.csv", [dataset_row(prize_5th="['123456', '0003']")])
+    state_path = str(tmp_path / "state.json")
+    uploader.write_high_water_mark(state_path, "2024-12-01")
+    assert uploader.upload_csv(path, incremental=True, state_path=state_path) is False
+    # Retrying would drop the same value again
+    assert uploader.read_high_water_mark(state_path) == "2024-12-16"
+
+def test_missing_file_is_not_a_success(uploader, tmp_path):
+    assert not uploader.upload_csv(str(tmp_path / "missing.csv"))
+
+@pytest.fixture
+def upload_script(uploader, monkeypatch):
+    """scripts/upload_lottery_data.py, run on the stand-in"""
+    monkeypatch.syspath_prepend(os.path.join(ROOT, "scripts"))
+    import upload_lottery_data
+    monkeypatch.setattr(upload_lottery_data, "LotteryUploader", lambda: uploader)
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["upload_lottery_data.py", *args])
+        upload_lottery_data.main()
+    return run
+
+def test_script_exits_cleanly_on_success(upload_script, csv_path):
+    upload_script(csv_path)
+
+def test_script_exits_with_an_error_on_bad_rows(upload_script, tmp_path):
+    path = write_rows(tmp_path / "draws.csv", [dataset_row(), dataset_row(date="2024-12-01", prize_1st="x")])
+    with pytest.raises(SystemExit) as exit_info:
+        upload_script("--row-by-row", path)
+    assert exit_info.value.code == 1
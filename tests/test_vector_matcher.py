@@ -0,0 +1,93 @@
+"""
+The NumPy VectorMatcher against the per-draw DrawMatcher
+Usage: python -m pytest tests/test_vector_matcher.py
+"""
+
+import random
+
+import pytest
+
+from app.models.draw_record import DrawRecord
+from app.services.draw_matcher import DrawMatcher
+from app.services.lottery_service import PRIZE_AMOUNTS
+from app.services.prize_index import TIER_ORDER, TIER_RANK
+from app.services.vector_matcher import VectorMatcher
+
+def tickets(draws, count=3000, seed=11):
+    """Random tickets plus a number from every tier of recent draws"""
+    rng = random.Random(seed)
+    numbers = [f"{rng.randrange(10 ** 6):06d}" for _ in range(count)]
+    for draw in draws[:40]:
+        numbers += [draw.prize_1st, *draw.nearby_1st, *draw.prize_2nd, *draw.prize_3rd[:2], *draw.prize_5th[:2]]
+        numbers += [draw.prize_pre_3digit[0] + "123", "456" + draw.prize_sub_3digits[0]]
+        numbers += [f"1234{draw.prize_2digits:02d}"]
+    return numbers
+
+def reference(draws, matchers, number, amounts, dates=None):
+    """(draw position, tier rank) of the best win: highest prize, then newest draw, else (-1, -1)"""
+    best, best_key = (-1, -1), None
+    for position, (draw, matcher) in enumerate(zip(draws, matchers)):
+        if dates is not None and draw.date not in dates:
+            continue
+        tier = matcher.match(number)
+        if tier is None:
+            continue
+        key = (amounts[tier], draw.date)
+        if best_key is None or key > best_key:
+            best, best_key = (position, TIER_RANK[tier]), key
+    return best
+
+@pytest.fixture(scope="module")
+def matchers(draws):
+    return [DrawMatcher(draw) for draw in draws]
+
+def assert_same(matcher, draws, matchers, numbers, amounts, dates=None):
+    positions, ranks = matcher.best_matches(numbers, dates)
+    for i, number in enumerate(numbers):
+        expected = reference(draws, matchers, number, amounts, dates[i] if dates else None)
+        assert (positions[i], ranks[i]) == expected, number
+
+def test_best_matches_agree_with_draw_matcher(draws, matchers):
+    numbers = tickets(draws)
+    assert_same(VectorMatcher(draws, PRIZE_AMOUNTS), draws, matchers, numbers, PRIZE_AMOUNTS)
+
+def test_date_limits_agree_with_draw_matcher(draws, matchers):
+    rng = random.Random(5)
+    numbers = tickets(draws, count=1000)
+    dates = [
+        None if rng.random() < 0.3 else {draw.date for draw in rng.sample(draws, rng.randrange(1, 4))}
+        for _ in numbers
+    ]
+    assert_same(VectorMatcher(draws, PRIZE_AMOUNTS), draws, matchers, numbers, PRIZE_AMOUNTS, dates)
+
+def test_amounts_out_of_rank_order_agree(draws, matchers):
+    # The last 2 digits paying more than a 3-digit prize takes the sorting path
+    amounts = dict(PRIZE_AMOUNTS, **{"2digits": 5000})
+    matcher = VectorMatcher(draws, amounts)
+    assert not matcher._scored
+    assert_same(matcher, draws, matchers, tickets(draws, count=1000), amounts)
+
+def test_prebuilt_arrays_give_the_same_matches(draws):
+    numbers = tickets(draws, count=500)
+    built = VectorMatcher(draws, PRIZE_AMOUNTS).best_matches(numbers)
+    given = VectorMatcher(draws, PRIZE_AMOUNTS, arrays=VectorMatcher.build_arrays(draws)).best_matches(numbers)
+    assert (built[0] == given[0]).all() and (built[1] == given[1]).all()
+
+def test_number_in_two_tiers_wins_the_first():
+    draw = DrawRecord.from_row({
+        "id": 1,
+        "date": "2024-01-16",
+        "prize_1st": "111111",
+        "prize_2nd": ["111111", "222222"],
+        "prize_5th": ["222222"],
+        "prize_2digits": 0,
+    })
+    positions, ranks = VectorMatcher([draw], PRIZE_AMOUNTS).best_matches(["111111", "222222", "000000"])
+    assert [TIER_ORDER[rank] if rank >= 0 else None for rank in ranks.tolist()] == [
+        DrawMatcher(draw).match(number) for number in ("111111", "222222", "000000")
+    ]
+    assert positions.tolist() == [0, 0, -1]
+
+def test_empty_batch():
+    positions, ranks = VectorMatcher([], PRIZE_AMOUNTS).best_matches([])
+    assert len(positions) == len(ranks) == 0
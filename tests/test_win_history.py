@@ -0,0 +1,96 @@
+"""
+GET /numbers/{number}/wins from the prize index and from the lottery_number_wins table
+Usage: python -m pytest tests/test_win_history.py
+"""
+
+import random
+
+import pytest
+
+from app.models.number_wins import number_win_rows, ticket_keys
+from app.models.prize_tiers import EXACT_TIER_FIELDS, TIER_FIELDS, TIER_LABELS, TIER_RANK
+from app.repositories import SqliteDrawRepository
+from app.services import lottery_service
+from app.services.lottery_service import PRIZE_AMOUNTS, DrawCache
+from conftest import API
+
+pytestmark = pytest.mark.anyio
+
+def reference_wins(draws, number):
+    """Every (draw date, tier) ``number`` wins, newest first, by scanning every draw"""
+    wins = set()
+    for draw in draws:
+        for tier, field in EXACT_TIER_FIELDS:
+            values = getattr(draw, field)
+            if number in ((values,) if isinstance(values, str) else values):
+                wins.add((draw.date, tier))
+        if len(number) >= 3:
+            if number[:3] in draw.prize_pre_3digit or number[-3:] in draw.prize_pre_3digit:
+                wins.add((draw.date, "pre_3digit"))
+            if any(number[i:i + 3] in draw.prize_sub_3digits for i in range(len(number) - 2)):
+                wins.add((draw.date, "sub_3digits"))
+        if draw.prize_2digits and number[-2:] == str(draw.prize_2digits).zfill(2):
+            wins.add((draw.date, "2digits"))
+    return sorted(wins, key=lambda win: (-win[0].toordinal(), TIER_RANK[win[1]]))
+
+def sample_numbers(draws):
+    rng = random.Random(23)
+    numbers = [f"{rng.randrange(10 ** 6):06d}" for _ in range(60)]
+    numbers += [draw.prize_1st for draw in draws[:10]] + [draw.prize_2nd[0] for draw in draws[:10]]
+    return numbers + ["12", "123", "0978", "97863", "00"]
+
+@pytest.fixture(params=["prize index", "wins table"])
+def source(request, monkeypatch):
+    """Serve win history from the warm cache, or from lottery_number_wins with the cache off"""
+    if request.param == "wins table":
+        monkeypatch.setattr(lottery_service, "_draw_cache", DrawCache(enabled=False))
+    return request.param
+
+async def test_wins_match_a_scan_of_every_draw(source, client, draws):
+    for number in sample_numbers(draws):
+        response = await client.get(f"{API}/numbers/{number}/wins")
+        assert response.status_code == 200
+        data = response.json()["data"]
+
+        expected = reference_wins(draws, number)
+        assert data["wins"] == [
+            {"date": draw_date.isoformat(), "prize_type": TIER_LABELS[tier], "prize_amount": PRIZE_AMOUNTS[tier]}
+            for draw_date, tier in expected
+        ], number
+        assert data["win_count"] == len(expected)
+        assert data["draws_won"] == len({draw_date for draw_date, _ in expected})
+        assert data["total_winnings"] == sum(PRIZE_AMOUNTS[tier] for _, tier in expected)
+
+async def test_first_prize_is_listed_first(client, draws):
+    latest = draws[0]
+    data = (await client.get(f"{API}/numbers/{latest.prize_1st}/wins")).json()["data"]
+    assert data["wins"][0] == {
+        "date": latest.date.isoformat(),
+        "prize_type": TIER_LABELS["1st_prize"],
+        "prize_amount": PRIZE_AMOUNTS["1st_prize"],
+    }
+
+@pytest.mark.parametrize("number", ["12ab", "1", "１２３"])
+async def test_invalid_numbers_are_rejected(client, number):
+    response = await client.get(f"{API}/numbers/{number}/wins")
+    assert response.status_code == 400
+
+def test_win_rows_cover_every_tier(draw_rows):
+    rows = number_win_rows(draw_rows[:1])
+    assert {row["tier"] for row in rows} == {tier for tier, _ in TIER_FIELDS}
+    assert {"number": f"{draw_rows[0]['prize_2digits']:02d}", "date": draw_rows[0]["date"], "tier": "2digits"} in rows
+    assert len(rows) == len({(row["number"], row["date"], row["tier"]) for row in rows})
+
+async def test_sqlite_wins_table_matches_the_rows(draw_rows, tmp_path):
+    repository = SqliteDrawRepository(str(tmp_path / "draws.db"))
+    try:
+        await repository.upsert_draws(draw_rows)
+        keys = ticket_keys("097863")
+        stored = await repository.get_number_wins(keys)
+    finally:
+        await repository.close()
+
+    expected = [row for row in number_win_rows(draw_rows) if row["number"] in keys]
+    assert sorted(stored, key=lambda row: (row["number"], row["date"], row["tier"])) == sorted(
+        expected, key=lambda row: (row["number"], row["date"], row["tier"])
+    )
@@ -43,6 +43,31 @@ def create_lottery_table():
         CREATE INDEX IF NOT EXISTS idx_lottery_draws_date ON lottery_draws(date);
         """
         
+        # Stamp updated_at on every update; the API's version check relies on it
+        create_trigger_sql = """
+        CREATE OR REPLACE FUNCTION set_lottery_draws_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS lottery_draws_set_updated_at ON lottery_draws;
+        CREATE TRIGGER lottery_draws_set_updated_at
+            BEFORE UPDATE ON lottery_draws
+            FOR EACH ROW EXECUTE FUNCTION set_lottery_draws_updated_at();
+        """
+        
+        # Derived win history, one row per (winning key, draw, tier)
+        create_wins_sql = """
+        CREATE TABLE IF NOT EXISTS lottery_number_wins (
+            number TEXT NOT NULL,
+            date DATE NOT NULL REFERENCES lottery_draws(date) ON DELETE CASCADE,
+            tier TEXT NOT NULL,
+            PRIMARY KEY (number, date, tier)
+        );
+        """
+        
         print("📋 Creating lottery_draws table...")
         
         # Execute table creation
@@ -53,6 +78,14 @@ def create_lottery_table():
         result2 = supabase.rpc('exec_sql', {'sql': create_index_sql}).execute()
         print("✅ Index created successfully!")
         
+        # Execute updated_at trigger creation
+        supabase.rpc('exec_sql', {'sql': create_trigger_sql}).execute()
+        print("✅ updated_at trigger created successfully!")
+        
+        # Execute win history table creation
+        supabase.rpc('exec_sql', {'sql': create_wins_sql}).execute()
+        print("✅ Win history table created successfully!")
+        
         # Verify table exists
         print("🔍 Verifying table creation...")
         test_result = supabase.table('lottery_draws').select('count').execute()
@@ -76,6 +109,8 @@ def create_lottery_table():
             print("\n" + "="*50)
             print(create_table_sql)
             print(create_index_sql)
+            print(create_trigger_sql)
+            print(create_wins_sql)
             print("="*50)
             return False
         else:
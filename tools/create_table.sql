@@ -20,5 +20,27 @@ CREATE TABLE IF NOT EXISTS lottery_draws (
 -- Create index on date for faster lookups
 CREATE INDEX IF NOT EXISTS idx_lottery_draws_date ON lottery_draws(date);
 
+-- Keep updated_at current on every update, so API caches notice edited draws
+CREATE OR REPLACE FUNCTION set_lottery_draws_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS lottery_draws_set_updated_at ON lottery_draws;
+CREATE TRIGGER lottery_draws_set_updated_at
+    BEFORE UPDATE ON lottery_draws
+    FOR EACH ROW EXECUTE FUNCTION set_lottery_draws_updated_at();
+
+-- Every (winning key, draw, tier), for one-lookup win history of a number.
+-- Filled by the uploader alongside lottery_draws (scripts/build_win_history.py backfills it)
+CREATE TABLE IF NOT EXISTS lottery_number_wins (
+    number TEXT NOT NULL,
+    date DATE NOT NULL REFERENCES lottery_draws(date) ON DELETE CASCADE,
+    tier TEXT NOT NULL,
+    PRIMARY KEY (number, date, tier)
+);
+
 -- Verify table was created
 SELECT 'Table created successfully!' as status; 
\ No newline at end of file